@@ -268,6 +268,7 @@ SCAN_INTERVAL_SECONDS: int = 60           # full universe scan cycle
 POSITION_CHECK_SECONDS: int = 10          # open position monitoring (halted mode)
 TICK_CHECK_SECONDS: int = 5               # fast tick surveillance between full cycles
 DAILY_SUMMARY_HOUR_UTC: int = 21          # send daily summary at 21:00 UTC
+SCAN_ANALYSIS_WORKERS: int = 0            # >0 = per-TF analysis in a process pool (rates still fetched serially)
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  WATCHLIST — The Professional Stalking Screen
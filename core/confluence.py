@@ -17,6 +17,8 @@
 
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from typing import Optional
 
@@ -38,11 +40,12 @@ from core.smart_money import analyze_smart_money
 from core.pristine import (
     classify_candle,
     classify_last_n_candles,
-    find_pivots,
+    find_pivot_arrays,
     classify_pivots_major_minor,
     determine_trend_from_pivots,
     classify_stage,
     analyze_retracement,
+    compute_indicators,
     classify_volume,
     detect_sweet_sour_spot,
     detect_pristine_setup,
@@ -64,6 +67,23 @@ TRADING_TFS = ["H1", "M15"]
 ENTRY_TFS = ["M5", "M15"]
 
 
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def _analysis_pool() -> ProcessPoolExecutor | None:
+    """Shared worker pool for per-TF analysis, or None to run in-process."""
+    global _POOL
+    workers = cfg.SCAN_ANALYSIS_WORKERS
+    if workers <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=workers)
+            log.info(f"Timeframe analysis pool started ({workers} workers)")
+        return _POOL
+
+
 @dataclass
 class TimeframeAnalysis:
     """Analysis results for a single timeframe."""
@@ -126,9 +146,22 @@ def analyze_timeframe(
     timeframe: str,
 ) -> TimeframeAnalysis:
     """Run full analysis on a single symbol/timeframe pair."""
+    return analyze_timeframe_frame(symbol, timeframe, mt5.get_rates(symbol, timeframe))
+
+
+def analyze_timeframe_frame(
+    symbol: str,
+    timeframe: str,
+    df: pd.DataFrame | None,
+) -> TimeframeAnalysis:
+    """
+    analyze_timeframe() on already-fetched rates.
+
+    Pure function of its arguments (no MT5 calls), so it can run in a
+    worker process — see _analysis_pool().
+    """
     tfa = TimeframeAnalysis(symbol=symbol, timeframe=timeframe)
 
-    df = mt5.get_rates(symbol, timeframe)
     # FIXED: require enough bars for the slowest indicator (200-period EMA)
     min_bars = max(cfg.EMA_TREND + 50, cfg.ICHI_SENKOU_B + cfg.ICHI_KIJUN + 10, 100)
     if df is None or len(df) < min_bars:
@@ -141,19 +174,21 @@ def analyze_timeframe(
     # ── PRISTINE ANALYSIS (primary — Ch. 1, 2, 5, 6, 10) ────────────────
 
     # Pivots & pivot-based trend (Ch. 10)
-    pivots = find_pivots(df)
-    pivots = classify_pivots_major_minor(pivots)
-    tfa.pivots = pivots
+    pivots = classify_pivots_major_minor(find_pivot_arrays(df))
+    tfa.pivots = pivots.to_dicts()
 
     pivot_trend = determine_trend_from_pivots(pivots)
     tfa.pivot_trend = pivot_trend
 
     # Stage classification (Ch. 1)
-    stage = classify_stage(df, pivot_trend=pivot_trend)
+    ind = compute_indicators(df)
+    stage = classify_stage(df, pivot_trend=pivot_trend, ind=ind)
     tfa.stage = stage
 
     # Full Pristine trend determination
-    pristine_result = determine_trend_pristine(df)
+    pristine_result = determine_trend_pristine(
+        df, pivots=pivots, pivot_trend=pivot_trend, ind=ind,
+    )
     tfa.pristine_trend = pristine_result
 
     # Use Pristine trend as the PRIMARY trend
@@ -163,11 +198,11 @@ def analyze_timeframe(
     # Retracement analysis (Ch. 6)
     direction = 1 if pivot_trend["trend"] == "uptrend" else (-1 if pivot_trend["trend"] == "downtrend" else 0)
     if direction != 0:
-        tfa.retracement = analyze_retracement(df, pivots, direction)
+        tfa.retracement = analyze_retracement(df, pivots, direction, ind=ind)
 
     # Volume classification (Ch. 5)
     if direction != 0:
-        tfa.volume_class = classify_volume(df, pivots, direction)
+        tfa.volume_class = classify_volume(df, pivots, direction, ind=ind)
 
     # Candle classification (Ch. 2)
     tfa.candle_class = classify_last_n_candles(df, n=5)
@@ -232,9 +267,19 @@ def analyze_symbol(mt5_conn: MT5Connector, symbol: str) -> SymbolAnalysis:
     sa = SymbolAnalysis(symbol=symbol)
 
     # Analyze each timeframe
-    for tf in TF_HIERARCHY:
-        tfa = analyze_timeframe(mt5_conn, symbol, tf)
-        sa.timeframes[tf] = tfa
+    pool = _analysis_pool()
+    if pool is None:
+        for tf in TF_HIERARCHY:
+            sa.timeframes[tf] = analyze_timeframe(mt5_conn, symbol, tf)
+    else:
+        # Rates are fetched serially (MT5 Python API is not thread-safe);
+        # the CPU-bound per-TF analysis fans out to the worker processes.
+        futures = {
+            tf: pool.submit(analyze_timeframe_frame, symbol, tf, mt5_conn.get_rates(symbol, tf))
+            for tf in TF_HIERARCHY
+        }
+        for tf in TF_HIERARCHY:
+            sa.timeframes[tf] = futures[tf].result()
 
     # ── PRISTINE: Stage-based bias (Ch. 1) ─────────────────────────────────
     # The higher TF stage is the PRIMARY direction gate.
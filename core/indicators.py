@@ -410,7 +410,12 @@ def compute_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
 #  TREND DETERMINATION
 # ═════════════════════════════════════════════════════════════════════════════
 
-def determine_trend_pristine(df: pd.DataFrame) -> dict:
+def determine_trend_pristine(
+    df: pd.DataFrame,
+    pivots=None,
+    pivot_trend: dict | None = None,
+    ind=None,
+) -> dict:
     """
     Primary trend determination using the Pristine Method (Ch. 1, 10).
 
@@ -426,13 +431,17 @@ def determine_trend_pristine(df: pd.DataFrame) -> dict:
         retracement        : dict from pristine.analyze_retracement
         stage_data         : dict from pristine.classify_stage
         pivots             : list of pivot dicts
+
+    Callers that already ran the pivot pipeline on *df* pass *pivots*
+    (classified, list or Pivots), *pivot_trend* and *ind* to skip redoing it.
     """
     from core.pristine import (
-        find_pivots,
+        find_pivot_arrays,
         classify_pivots_major_minor,
         determine_trend_from_pivots,
         classify_stage,
         analyze_retracement,
+        compute_indicators,
     )
 
     result = {
@@ -445,16 +454,18 @@ def determine_trend_pristine(df: pd.DataFrame) -> dict:
         return result
 
     # Step 1: Find pivots
-    pivots = find_pivots(df)
-    pivots = classify_pivots_major_minor(pivots)
-    result["pivots"] = pivots
+    if pivots is None:
+        pivots = classify_pivots_major_minor(find_pivot_arrays(df))
+    result["pivots"] = pivots.to_dicts() if hasattr(pivots, "to_dicts") else list(pivots)
 
     # Step 2: Determine trend from pivots (Ch. 10)
-    pv_trend = determine_trend_from_pivots(pivots)
+    pv_trend = pivot_trend if pivot_trend is not None else determine_trend_from_pivots(pivots)
     result["pivot_trend"] = pv_trend
 
     # Step 3: Classify stage (Ch. 1)
-    stage_data = classify_stage(df, pivot_trend=pv_trend)
+    if ind is None:
+        ind = compute_indicators(df)
+    stage_data = classify_stage(df, pivot_trend=pv_trend, ind=ind)
     result["stage_data"] = stage_data
     result["stage"] = stage_data.get("stage", 1)
     result["tradeable"] = stage_data.get("tradeable", False)
@@ -463,7 +474,7 @@ def determine_trend_pristine(df: pd.DataFrame) -> dict:
     # Step 4: Retracement quality (Ch. 6)
     direction = 1 if pv_trend["trend"] == "uptrend" else (-1 if pv_trend["trend"] == "downtrend" else 0)
     if direction != 0:
-        result["retracement"] = analyze_retracement(df, pivots, direction)
+        result["retracement"] = analyze_retracement(df, pivots, direction, ind=ind)
 
     # Map to standard trend labels used by the rest of the system
     if stage_data.get("stage") == 2:
@@ -19,6 +19,7 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from utils.accel import HAVE_NUMBA, njit
 from utils.logger import get_logger
 
 log = get_logger("patterns")
@@ -217,20 +218,37 @@ def find_swing_points(df: pd.DataFrame, lookback: int = 5) -> tuple[list, list]:
     Find swing highs and swing lows.
     A swing high is a bar whose high is higher than *lookback* bars on each side.
     """
-    highs = []
-    lows = []
     high_vals = df["high"].values
     low_vals = df["low"].values
+    high_pos, low_pos = swing_positions(high_vals, low_vals, lookback)
 
-    for i in range(lookback, len(df) - lookback):
+    # One index take per side instead of a Timestamp boxed per bar
+    highs = list(zip(df.index[high_pos], high_vals[high_pos]))
+    lows = list(zip(df.index[low_pos], low_vals[low_pos]))
+    return highs, lows
+
+
+def swing_positions(
+    high_vals: np.ndarray,
+    low_vals: np.ndarray,
+    lookback: int = 5,
+) -> tuple[list[int], list[int]]:
+    """
+    Bar positions of the swing highs and lows find_swing_points() reports.
+
+    Only bars with a full window on both sides are tested, so the swings of
+    a prefix df.iloc[:m] are exactly these positions below m - lookback.
+    """
+    high_pos = []
+    low_pos = []
+    for i in range(lookback, len(high_vals) - lookback):
         # Swing high
         if high_vals[i] == max(high_vals[i - lookback: i + lookback + 1]):
-            highs.append((df.index[i], high_vals[i]))
+            high_pos.append(i)
         # Swing low
         if low_vals[i] == min(low_vals[i - lookback: i + lookback + 1]):
-            lows.append((df.index[i], low_vals[i]))
-
-    return highs, lows
+            low_pos.append(i)
+    return high_pos, low_pos
 
 
 def detect_double_top_bottom(
@@ -396,6 +414,271 @@ def scan_chart_patterns(df: pd.DataFrame, lookback: int = 5) -> list[dict]:
     return patterns
 
 
+# ═════════════════════════════════════════════════════════════════════════════
+#  BULK SCANNER — per-bar pattern flags over the whole series
+# ═════════════════════════════════════════════════════════════════════════════
+#  Backtests need every bar classified, not just the last one.  Calling the
+#  row-based detectors bar-by-bar costs a Python dispatch per pattern per bar;
+#  the bulk scanner produces one uint16 bit-field per bar instead.  Flags are
+#  SHAPE-ONLY — the same conditions as the detectors above, without the
+#  trend context scan_candlestick_patterns() adds (hammer vs hanging man).
+#
+#  The bulk path works in float32: every test is a ratio or a compare, the
+#  loop is memory-bound, and half the bytes is ~2x the throughput.  The
+#  thresholds are float32 too so Numba / NumPy never promote back to
+#  float64 mid-expression.  The row detectors stay float64.
+
+CDL_DOJI = 1 << 0
+CDL_HAMMER = 1 << 1
+CDL_INVERTED_HAMMER = 1 << 2
+CDL_MARUBOZU_BULL = 1 << 3
+CDL_MARUBOZU_BEAR = 1 << 4
+CDL_ENGULFING_BULL = 1 << 5
+CDL_ENGULFING_BEAR = 1 << 6
+CDL_PIERCING_LINE = 1 << 7
+CDL_DARK_CLOUD_COVER = 1 << 8
+CDL_TWEEZER_BOTTOM = 1 << 9
+CDL_TWEEZER_TOP = 1 << 10
+CDL_MORNING_STAR = 1 << 11
+CDL_EVENING_STAR = 1 << 12
+CDL_THREE_SOLDIERS = 1 << 13
+CDL_THREE_CROWS = 1 << 14
+
+_F32_HALF = np.float32(0.5)
+_F32_TWO = np.float32(2.0)
+_F32_5PCT = np.float32(0.05)      # doji / marubozu / tweezer tolerance
+_F32_30PCT = np.float32(0.3)      # small wick / star body
+
+CANDLE_FLAG_NAMES: dict[int, str] = {
+    CDL_DOJI: "doji",
+    CDL_HAMMER: "hammer",
+    CDL_INVERTED_HAMMER: "inverted_hammer",
+    CDL_MARUBOZU_BULL: "bullish_marubozu",
+    CDL_MARUBOZU_BEAR: "bearish_marubozu",
+    CDL_ENGULFING_BULL: "bullish_engulfing",
+    CDL_ENGULFING_BEAR: "bearish_engulfing",
+    CDL_PIERCING_LINE: "piercing_line",
+    CDL_DARK_CLOUD_COVER: "dark_cloud_cover",
+    CDL_TWEEZER_BOTTOM: "tweezer_bottom",
+    CDL_TWEEZER_TOP: "tweezer_top",
+    CDL_MORNING_STAR: "morning_star",
+    CDL_EVENING_STAR: "evening_star",
+    CDL_THREE_SOLDIERS: "three_white_soldiers",
+    CDL_THREE_CROWS: "three_black_crows",
+}
+
+
+@njit(cache=True)
+def _scan_candles_kernel(o, h, l, c, flags):
+    """Compiled single-pass scanner: writes one bit-field per bar into *flags*."""
+    n = o.shape[0]
+    for i in range(n):
+        f = 0
+        body = abs(c[i] - o[i])
+        rng = h[i] - l[i]
+        uw = h[i] - max(c[i], o[i])
+        lw = min(c[i], o[i]) - l[i]
+        bull = c[i] > o[i]
+        bear = c[i] < o[i]
+
+        # Single candle
+        if rng > 0 and body / rng < _F32_5PCT:
+            f |= CDL_DOJI
+        if body > 0:
+            if lw >= _F32_TWO * body and uw <= body * _F32_30PCT:
+                f |= CDL_HAMMER
+            if uw >= _F32_TWO * body and lw <= body * _F32_30PCT:
+                f |= CDL_INVERTED_HAMMER
+        if rng > 0 and uw / rng < _F32_5PCT and lw / rng < _F32_5PCT:
+            f |= CDL_MARUBOZU_BULL if bull else CDL_MARUBOZU_BEAR
+
+        # Two candle
+        if i >= 1:
+            p = i - 1
+            p_bull = c[p] > o[p]
+            p_bear = c[p] < o[p]
+            if p_bear and bull and o[i] <= c[p] and c[i] >= o[p]:
+                f |= CDL_ENGULFING_BULL
+            if p_bull and bear and o[i] >= c[p] and c[i] <= o[p]:
+                f |= CDL_ENGULFING_BEAR
+            p_mid = (o[p] + c[p]) * _F32_HALF
+            if p_bear and bull and o[i] < l[p] and c[i] > p_mid:
+                f |= CDL_PIERCING_LINE
+            if p_bull and bear and o[i] > h[p] and c[i] < p_mid:
+                f |= CDL_DARK_CLOUD_COVER
+            avg_range = ((h[p] - l[p]) + rng) * _F32_HALF
+            if avg_range != 0:
+                tol = avg_range * _F32_5PCT
+                if abs(l[p] - l[i]) <= tol and p_bear and bull:
+                    f |= CDL_TWEEZER_BOTTOM
+                if abs(h[p] - h[i]) <= tol and p_bull and bear:
+                    f |= CDL_TWEEZER_TOP
+
+            # Three candle
+            if i >= 2:
+                q = i - 2
+                q_bull = c[q] > o[q]
+                q_bear = c[q] < o[q]
+                avg_body = (abs(c[q] - o[q]) + body) * _F32_HALF
+                small_mid = abs(c[p] - o[p]) < avg_body * _F32_30PCT
+                q_mid = (o[q] + c[q]) * _F32_HALF
+                if avg_body != 0:
+                    if q_bear and small_mid and bull and c[i] > q_mid:
+                        f |= CDL_MORNING_STAR
+                    if q_bull and small_mid and bear and c[i] < q_mid:
+                        f |= CDL_EVENING_STAR
+                if (q_bull and p_bull and bull
+                        and c[p] > c[q] and c[i] > c[p]
+                        and o[p] > o[q] and o[i] > o[p]):
+                    f |= CDL_THREE_SOLDIERS
+                if (q_bear and p_bear and bear
+                        and c[p] < c[q] and c[i] < c[p]
+                        and o[p] < o[q] and o[i] < o[p]):
+                    f |= CDL_THREE_CROWS
+        flags[i] = f
+
+
+def _two_candle_signals(o, h, l, c) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Engulfing, piercing/dark-cloud and tweezer over the whole series.
+
+    Takes float32 arrays.  Returns three int8 arrays (+1 / -1 / 0, same
+    convention as the row detectors) aligned to the bars; bar 0 has no
+    previous candle → 0.
+    """
+    assert o.dtype == np.float32, "bulk scanner expects float32 OHLC arrays"
+    n = len(o)
+    engulf = np.zeros(n, dtype=np.int8)
+    pierce = np.zeros(n, dtype=np.int8)
+    tweezer = np.zeros(n, dtype=np.int8)
+    if n < 2:
+        return engulf, pierce, tweezer
+
+    # prev = bar i-1, curr = bar i → results land on [1:]
+    po, ph, pl, pc = o[:-1], h[:-1], l[:-1], c[:-1]
+    co, ch, cl, cc = o[1:], h[1:], l[1:], c[1:]
+    p_bull, p_bear = pc > po, pc < po
+    c_bull, c_bear = cc > co, cc < co
+    bear_bull = p_bear & c_bull
+    bull_bear = p_bull & c_bear
+
+    p_mid = (po + pc) * _F32_HALF
+    avg_range = ((ph - pl) + (ch - cl)) * _F32_HALF
+    tol = avg_range * _F32_5PCT
+    has_range = avg_range != 0
+
+    engulf[1:] = (bear_bull & (co <= pc) & (cc >= po)).view(np.int8) \
+        - (bull_bear & (co >= pc) & (cc <= po)).view(np.int8)
+    pierce[1:] = (bear_bull & (co < pl) & (cc > p_mid)).view(np.int8) \
+        - (bull_bear & (co > ph) & (cc < p_mid)).view(np.int8)
+    tweezer[1:] = (has_range & bear_bull & (np.abs(pl - cl) <= tol)).view(np.int8) \
+        - (has_range & bull_bear & (np.abs(ph - ch) <= tol)).view(np.int8)
+    return engulf, pierce, tweezer
+
+
+def detect_two_candle_patterns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorised detect_engulfing / detect_piercing_dark_cloud / detect_tweezer
+    for every bar of *df*.
+
+    Returns a DataFrame on df's index with int8 columns ``engulfing``,
+    ``piercing_dark_cloud`` and ``tweezer`` (+1 bullish, -1 bearish, 0 none)
+    — ready to join onto the OHLC frame for backtests.
+    """
+    if df is None or len(df) == 0:
+        return pd.DataFrame(
+            {k: np.zeros(0, dtype=np.int8)
+             for k in ("engulfing", "piercing_dark_cloud", "tweezer")},
+        )
+
+    engulf, pierce, tweezer = _two_candle_signals(
+        df["open"].to_numpy(dtype=np.float32),
+        df["high"].to_numpy(dtype=np.float32),
+        df["low"].to_numpy(dtype=np.float32),
+        df["close"].to_numpy(dtype=np.float32),
+    )
+    return pd.DataFrame(
+        {"engulfing": engulf, "piercing_dark_cloud": pierce, "tweezer": tweezer},
+        index=df.index,
+    )
+
+
+def _scan_candles_numpy(o, h, l, c) -> np.ndarray:
+    """Vectorised fallback of _scan_candles_kernel (no Numba)."""
+    assert o.dtype == np.float32, "bulk scanner expects float32 OHLC arrays"
+    n = len(o)
+    flags = np.zeros(n, dtype=np.uint16)
+    if n == 0:
+        return flags
+
+    body = np.abs(c - o)
+    rng = h - l
+    uw = h - np.maximum(c, o)
+    lw = np.minimum(c, o) - l
+    bull = c > o
+    bear = c < o
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        doji = (rng > 0) & (body / rng < _F32_5PCT)
+        maru = (rng > 0) & (uw / rng < _F32_5PCT) & (lw / rng < _F32_5PCT)
+    has_body = body > 0
+    flags[doji] |= CDL_DOJI
+    flags[has_body & (lw >= _F32_TWO * body) & (uw <= body * _F32_30PCT)] |= CDL_HAMMER
+    flags[has_body & (uw >= _F32_TWO * body) & (lw <= body * _F32_30PCT)] |= CDL_INVERTED_HAMMER
+    flags[maru & bull] |= CDL_MARUBOZU_BULL
+    flags[maru & ~bull] |= CDL_MARUBOZU_BEAR
+
+    if n >= 2:
+        engulf, pierce, tweezer = _two_candle_signals(o, h, l, c)
+        flags[engulf > 0] |= CDL_ENGULFING_BULL
+        flags[engulf < 0] |= CDL_ENGULFING_BEAR
+        flags[pierce > 0] |= CDL_PIERCING_LINE
+        flags[pierce < 0] |= CDL_DARK_CLOUD_COVER
+        flags[tweezer > 0] |= CDL_TWEEZER_BOTTOM
+        flags[tweezer < 0] |= CDL_TWEEZER_TOP
+
+    if n >= 3:
+        # c1 = bar i-2, c2 = bar i-1, c3 = bar i, aligned on flags[2:]
+        o1, c1, o2, c2, o3, c3 = o[:-2], c[:-2], o[1:-1], c[1:-1], o[2:], c[2:]
+        b1, b2, b3 = bull[:-2], bull[1:-1], bull[2:]
+        s1, s2, s3 = bear[:-2], bear[1:-1], bear[2:]
+        avg_body = (body[:-2] + body[2:]) * _F32_HALF
+        small_mid = body[1:-1] < avg_body * _F32_30PCT
+        mid1 = (o1 + c1) * _F32_HALF
+        three = flags[2:]
+        star = avg_body != 0
+        three[star & s1 & small_mid & b3 & (c3 > mid1)] |= CDL_MORNING_STAR
+        three[star & b1 & small_mid & s3 & (c3 < mid1)] |= CDL_EVENING_STAR
+        three[b1 & b2 & b3 & (c2 > c1) & (c3 > c2) & (o2 > o1) & (o3 > o2)] |= CDL_THREE_SOLDIERS
+        three[s1 & s2 & s3 & (c2 < c1) & (c3 < c2) & (o2 < o1) & (o3 < o2)] |= CDL_THREE_CROWS
+
+    return flags
+
+
+def scan_candle_flags(df: pd.DataFrame) -> np.ndarray:
+    """
+    Classify EVERY bar of *df* in one pass.
+
+    Returns a uint16 array (one entry per bar) of OR-ed ``CDL_*`` flags;
+    use ``CANDLE_FLAG_NAMES`` to decode.  Bar i's two/three-candle flags
+    use bars i-1 / i-2 exactly like the row-based detectors (evaluated on
+    float32 prices).
+    """
+    if df is None or len(df) == 0:
+        return np.zeros(0, dtype=np.uint16)
+
+    o = np.ascontiguousarray(df["open"].to_numpy(dtype=np.float32))
+    h = np.ascontiguousarray(df["high"].to_numpy(dtype=np.float32))
+    l = np.ascontiguousarray(df["low"].to_numpy(dtype=np.float32))
+    c = np.ascontiguousarray(df["close"].to_numpy(dtype=np.float32))
+
+    if HAVE_NUMBA:
+        flags = np.zeros(len(o), dtype=np.uint16)
+        _scan_candles_kernel(o, h, l, c, flags)
+        return flags
+    return _scan_candles_numpy(o, h, l, c)
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 #  PRISTINE CONTEXT-AWARE PATTERN SCORING  (Ch. 2, 3, 13)
 # ═════════════════════════════════════════════════════════════════════════════
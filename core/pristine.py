@@ -21,14 +21,30 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 import config as cfg
+from utils.accel import HAVE_NUMBA, move_mean, njit
+from utils.frame_cache import MISSING, FrameCache
 from utils.logger import get_logger
 
 log = get_logger("pristine")
 
+# Per-frame memoisation: one scan asks the same frame for candle classes,
+# pivots and MAs several times (stage, retracement, volume, bar-by-bar).
+_CANDLE_CACHE = FrameCache(maxsize=32)
+_PIVOT_CACHE = FrameCache(maxsize=32)
+_MA_CACHE = FrameCache(maxsize=32)
+_IND_CACHE = FrameCache(maxsize=32)
+_STAGE_CACHE = FrameCache(maxsize=32)
+_ARRAY_CACHE = FrameCache(maxsize=32)
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  CONSTANTS
@@ -56,6 +72,67 @@ STAGE_CONVERGENCE_PCT: float = 1.5  # MAs within 1.5% = converging
 PIVOT_LOOKBACK: int = 5         # bars each side for swing detection
 
 
+# ═════════════════════════════════════════════════════════════════════════════
+#  RESULT RECORDS
+# ═════════════════════════════════════════════════════════════════════════════
+# Trend / stage / retracement results are built on every poll for every
+# timeframe.  They are slotted, frozen records rather than dicts, but keep
+# the read-only dict interface (``r["trend"]``, ``r.get(...)``, ``in``,
+# ``dict(r)``, ``==`` against a dict) the rest of the system relies on.
+
+class _Record(Mapping):
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class TrendState(_Record):
+    """determine_trend_from_pivots() result (Ch. 10)."""
+    trend: str = "range"
+    strength: str = "weak"
+    last_ph: float = 0.0
+    last_pl: float = 0.0
+    hph_count: int = 0
+    hpl_count: int = 0
+    lph_count: int = 0
+    lpl_count: int = 0
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class StageState(_Record):
+    """classify_stage() result (Ch. 1)."""
+    stage: int = 1
+    confidence: float = 0.0
+    tradeable: bool = False
+    allowed_direction: str | None = None
+    description: str = "Insufficient data"
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RetracementState(_Record):
+    """analyze_retracement() result (Ch. 6)."""
+    retracement_pct: float = 0.0
+    quality: str = "unknown"
+    impulse_start: float = 0.0
+    impulse_end: float = 0.0
+    current_price: float = 0.0
+    near_ma20: bool = False
+    near_ma40: bool = False
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 #  1. CANDLE CLASSIFICATION  (Chapter 2)
 # ═════════════════════════════════════════════════════════════════════════════
@@ -90,77 +167,174 @@ def classify_candle(df: pd.DataFrame, idx: int = -1) -> dict:
     if actual_idx < 10 or actual_idx >= len(df):
         return _empty_candle_class()
 
-    row = df.iloc[actual_idx]
-    o, h, l, c = row["open"], row["high"], row["low"], row["close"]
-    bar_range = h - l
-    body = abs(c - o)
-    is_bull = c > o
+    return _classify_at(_candle_columns(df), actual_idx)
 
-    if bar_range == 0:
-        return _empty_candle_class()
+
+def classify_candles(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorised classify_candle() over EVERY bar of *df* (Ch. 2).
+
+    One NumPy pass instead of a slice + .iloc + .mean() per bar — the shape
+    bar-by-bar analysis and backtests need.  Returns a DataFrame on df's
+    index with classify_candle()'s keys as columns (ratios unrounded).
+    Bars classify_candle() cannot classify — the first 10 (no lookback)
+    and zero-range bars — carry the neutral _empty_candle_class() values.
+
+    Memoised per frame: treat the returned DataFrame as read-only.
+    """
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=list(_CANDLE_KEYS))
+
+    cached = _CANDLE_CACHE.get(df)
+    if cached is not MISSING:
+        return cached
+
+    n = len(df)
+    o, h, l, c, _ = _as_arrays(df)
 
     # Average body and range over the prior 10 bars (not including current)
-    lookback_slice = df.iloc[max(0, actual_idx - 10):actual_idx]
-    avg_body = (lookback_slice["close"] - lookback_slice["open"]).abs().mean()
-    avg_range = (lookback_slice["high"] - lookback_slice["low"]).mean()
+    body = np.abs(c - o)
+    bar_range = h - l
+    avg_body = np.empty(n)
+    avg_range = np.empty(n)
+    avg_body[0] = avg_range[0] = np.nan
+    avg_body[1:] = move_mean(body, 10)[:-1]
+    avg_range[1:] = move_mean(bar_range, 10)[:-1]
+
+    if HAVE_NUMBA:
+        codes = _candle_core(o, h, l, c, avg_body, avg_range, WRB_BODY_RATIO,
+                             NRB_BODY_RATIO, COG_THRESHOLD, TAIL_RATIO)
+    else:
+        codes = _candle_codes(o, h, l, c, avg_body, avg_range)
+    type_code, cog_code, tail_code, bias, body_ratio, range_ratio, is_bullish = codes
+
+    # Explicit object dtype: keep None (not NaN) for "no COG / no tail"
+    return _CANDLE_CACHE.put(df, pd.DataFrame({
+        "type": pd.Series(_TYPE_NAMES[type_code], index=df.index, dtype=object),
+        "cog": pd.Series(_COG_NAMES[cog_code], index=df.index, dtype=object),
+        "tail": pd.Series(_TAIL_NAMES[tail_code], index=df.index, dtype=object),
+        "bias": bias,
+        "body_ratio": body_ratio,
+        "range_ratio": range_ratio,
+        "is_bullish": is_bullish,
+    }, index=df.index))
+
+
+# Label tables for the integer codes produced by the candle cores below
+_TYPE_NAMES = np.array(["normal", "NRB", "WRB"], dtype=object)
+_COG_NAMES = np.array([None, "bullish", "bearish"], dtype=object)
+_TAIL_NAMES = np.array([None, "demand_rejection", "supply_rejection"], dtype=object)
 
-    if avg_body == 0:
-        avg_body = body if body > 0 else 1e-10
-    if avg_range == 0:
-        avg_range = bar_range if bar_range > 0 else 1e-10
 
-    body_ratio = body / avg_body
-    range_ratio = bar_range / avg_range
+@njit(cache=True)
+def _candle_core(o, h, l, c, avg_body, avg_range,
+                 wrb_ratio, nrb_ratio, cog_threshold, tail_ratio):
+    """
+    classify_candles() per-bar rules in one pass, as integer codes.
+
+    Returns (type, cog, tail) indices into the label tables, then bias,
+    body_ratio, range_ratio and is_bullish.  The thresholds are arguments
+    so the same kernel serves other instruments' tuning.
+    """
+    n = len(o)
+    type_code = np.zeros(n, np.int8)
+    cog_code = np.zeros(n, np.int8)
+    tail_code = np.zeros(n, np.int8)
+    bias = np.zeros(n, np.int8)
+    body_ratio = np.ones(n)
+    range_ratio = np.ones(n)
+    is_bullish = np.ones(n, np.bool_)
+    for i in range(10, n):
+        bar_range = h[i] - l[i]
+        if bar_range == 0:
+            continue
+        body = abs(c[i] - o[i])
+        ab = avg_body[i]
+        if ab == 0:
+            ab = body if body > 0 else 1e-10
+        ar = avg_range[i]
+        if ar == 0:
+            ar = bar_range if bar_range > 0 else 1e-10
+        br = body / ab
+        body_ratio[i] = br
+        range_ratio[i] = bar_range / ar
+        bull = c[i] > o[i]
+        is_bullish[i] = bull
+
+        b = 0
+        if br >= wrb_ratio:
+            type_code[i] = 2
+            b = 1 if bull else -1
+        elif br <= nrb_ratio:
+            type_code[i] = 1
+
+        close_position = (c[i] - l[i]) / bar_range
+        if close_position >= 1 - cog_threshold:
+            cog_code[i] = 1
+            if b == 0:
+                b = 1
+        elif close_position <= cog_threshold:
+            cog_code[i] = 2
+            if b == 0:
+                b = -1
+
+        if body > 0:
+            upper_wick = h[i] - max(o[i], c[i])
+            lower_wick = min(o[i], c[i]) - l[i]
+            if upper_wick >= tail_ratio * body and lower_wick < body * 0.3:
+                tail_code[i] = 2
+                b -= 1
+            elif lower_wick >= tail_ratio * body and upper_wick < body * 0.3:
+                tail_code[i] = 1
+                b += 1
+        bias[i] = min(1, max(-1, b))
+    return type_code, cog_code, tail_code, bias, body_ratio, range_ratio, is_bullish
+
+
+def _candle_codes(o, h, l, c, avg_body, avg_range) -> tuple[np.ndarray, ...]:
+    """_candle_core() as whole-array NumPy passes (no-numba fallback)."""
+    n = len(o)
+    body = np.abs(c - o)
+    bar_range = h - l
+    is_bull = c > o
+    avg_body = np.where(avg_body == 0, np.where(body > 0, body, 1e-10), avg_body)
+    avg_range = np.where(avg_range == 0, np.where(bar_range > 0, bar_range, 1e-10), avg_range)
+
+    valid = (np.arange(n) >= 10) & (bar_range != 0)
+    body_ratio = np.where(valid, body / avg_body, 1.0)
+    range_ratio = np.where(valid, bar_range / avg_range, 1.0)
 
     # ── Type classification ──────────────────────────────────────────────
-    if body_ratio >= WRB_BODY_RATIO:
-        bar_type = "WRB"
-    elif body_ratio <= NRB_BODY_RATIO:
-        bar_type = "NRB"
-    else:
-        bar_type = "normal"
+    type_code = np.zeros(n, dtype=np.int8)
+    type_code[valid & (body_ratio <= NRB_BODY_RATIO)] = 1   # NRB
+    is_wrb = valid & (body_ratio >= WRB_BODY_RATIO)
+    type_code[is_wrb] = 2                                   # WRB
 
     # ── Closing On Gap (COG) ─────────────────────────────────────────────
-    close_position = (c - l) / bar_range  # 0 = closed at low, 1 = closed at high
-    cog = None
-    if close_position >= (1 - COG_THRESHOLD):
-        cog = "bullish"
-    elif close_position <= COG_THRESHOLD:
-        cog = "bearish"
+    with np.errstate(divide="ignore", invalid="ignore"):
+        close_position = (c - l) / bar_range  # 0 = closed at low, 1 = closed at high
+    cog_bull = valid & (close_position >= (1 - COG_THRESHOLD))
+    cog_bear = valid & ~cog_bull & (close_position <= COG_THRESHOLD)
+    cog_code = cog_bull + 2 * cog_bear.astype(np.int8)
 
     # ── Tail analysis ────────────────────────────────────────────────────
-    upper_wick = h - max(o, c)
-    lower_wick = min(o, c) - l
-    tail = None
-    if body > 0:
-        if upper_wick >= TAIL_RATIO * body and lower_wick < body * 0.3:
-            tail = "supply_rejection"   # sellers tried, failed → bearish tail
-        elif lower_wick >= TAIL_RATIO * body and upper_wick < body * 0.3:
-            tail = "demand_rejection"   # buyers stepped in → bullish tail (hammer)
+    upper_wick = h - np.maximum(o, c)
+    lower_wick = np.minimum(o, c) - l
+    has_body = valid & (body > 0)
+    supply = has_body & (upper_wick >= TAIL_RATIO * body) & (lower_wick < body * 0.3)
+    demand = has_body & ~supply & (lower_wick >= TAIL_RATIO * body) & (upper_wick < body * 0.3)
+    # supply = sellers tried, failed → bearish tail; demand = hammer
+    tail_code = demand + 2 * supply.astype(np.int8)
 
     # ── Composite bias ───────────────────────────────────────────────────
-    bias = 0
-    if bar_type == "WRB":
-        bias = 1 if is_bull else -1
-    elif cog == "bullish":
-        bias += 1
-    elif cog == "bearish":
-        bias -= 1
-    if tail == "demand_rejection":
-        bias += 1
-    elif tail == "supply_rejection":
-        bias -= 1
-    bias = max(-1, min(1, bias))  # clamp
+    # WRB direction overrides COG; tails add on top.  Branch-free signs:
+    wrb_sign = is_wrb * (2 * is_bull.astype(np.int8) - 1)
+    cog_sign = cog_bull.astype(np.int8) - cog_bear
+    tail_sign = demand.astype(np.int8) - supply
+    bias = wrb_sign + cog_sign * (wrb_sign == 0) + tail_sign
+    bias = np.clip(bias, -1, 1)  # clamp
 
-    return {
-        "type": bar_type,
-        "cog": cog,
-        "tail": tail,
-        "bias": bias,
-        "body_ratio": round(body_ratio, 2),
-        "range_ratio": round(range_ratio, 2),
-        "is_bullish": is_bull,
-    }
+    return type_code, cog_code, tail_code, bias, body_ratio, range_ratio, is_bull | ~valid
 
 
 def classify_last_n_candles(df: pd.DataFrame, n: int = 5) -> list[dict]:
@@ -170,10 +344,33 @@ def classify_last_n_candles(df: pd.DataFrame, n: int = 5) -> list[dict]:
     """
     if df is None or len(df) < n + 10:
         return []
-    results = []
-    for offset in range(n, 0, -1):
-        results.append(classify_candle(df, idx=-offset))
-    return results
+    if len(df) < 12:
+        return [_empty_candle_class() for _ in range(n)]
+    cols = _candle_columns(df)
+    return [_classify_at(cols, len(df) - offset) for offset in range(n, 0, -1)]
+
+
+_CANDLE_KEYS = ("type", "cog", "tail", "bias", "body_ratio", "range_ratio", "is_bullish")
+
+
+def _candle_columns(df: pd.DataFrame) -> tuple[np.ndarray, ...]:
+    """classify_candles() columns as bare arrays, in _CANDLE_KEYS order."""
+    classes = classify_candles(df)
+    return tuple(classes[k].to_numpy() for k in _CANDLE_KEYS)
+
+
+def _classify_at(cols: tuple[np.ndarray, ...], i: int) -> dict:
+    """classify_candle() dict for bar *i* from _candle_columns() arrays."""
+    bar_type, cog, tail, bias, body_ratio, range_ratio, is_bullish = cols
+    return {
+        "type": bar_type[i],
+        "cog": cog[i],
+        "tail": tail[i],
+        "bias": int(bias[i]),
+        "body_ratio": round(float(body_ratio[i]), 2),
+        "range_ratio": round(float(range_ratio[i]), 2),
+        "is_bullish": bool(is_bullish[i]),
+    }
 
 
 def _empty_candle_class() -> dict:
@@ -187,6 +384,151 @@ def _empty_candle_class() -> dict:
 #  2. PIVOT DETECTION & CLASSIFICATION  (Chapter 10)
 # ═════════════════════════════════════════════════════════════════════════════
 
+@dataclass
+class Pivots:
+    """
+    Pivot sequence as parallel arrays (structure-of-arrays), chronological.
+
+    The pivot consumers below accept either this or the legacy list of
+    pivot dicts; to_dicts() / from_dicts() convert at the boundary.
+    """
+    idx: np.ndarray          # int64 bar positions
+    price: np.ndarray        # float64
+    is_high: np.ndarray      # bool — True = pivot high, False = pivot low
+    is_major: np.ndarray     # bool
+    time: pd.Index | None = None
+
+    def __len__(self) -> int:
+        return len(self.idx)
+
+    @classmethod
+    def from_dicts(cls, pivots: list[dict]) -> Pivots:
+        n = len(pivots)
+        return cls(
+            idx=np.fromiter((p.get("idx", 0) for p in pivots), dtype=np.int64, count=n),
+            price=np.fromiter((p["price"] for p in pivots), dtype=np.float64, count=n),
+            is_high=np.fromiter((p["type"] == "high" for p in pivots), dtype=bool, count=n),
+            is_major=np.fromiter((bool(p.get("major", False)) for p in pivots), dtype=bool, count=n),
+            time=pd.Index([p.get("time") for p in pivots]),
+        )
+
+    def to_dicts(self) -> list[dict]:
+        times = self.time if self.time is not None else [None] * len(self)
+        return [
+            {"type": "high" if hi else "low", "price": price, "time": t,
+             "idx": i, "major": major}
+            for hi, price, t, i, major in zip(
+                self.is_high.tolist(), self.price.tolist(), times,
+                self.idx.tolist(), self.is_major.tolist(),
+            )
+        ]
+
+
+def _as_pivots(pivots: Pivots | list[dict] | None) -> Pivots:
+    if isinstance(pivots, Pivots):
+        return pivots
+    return Pivots.from_dicts(pivots or [])
+
+
+@njit(cache=True)
+def _find_pivots_kernel(highs, lows, lookback):
+    """
+    Pivot scan in one pass: chronological bar positions and is-high flags.
+
+    Same rule as the rolling fallback — a bar qualifies when no bar in its
+    centred 2L+1 window is more extreme (ties allowed, any NaN in the
+    window disqualifies).  A bar that is both emits the high first.
+    """
+    n = len(highs)
+    out_idx = np.empty(2 * n, np.int64)
+    out_high = np.empty(2 * n, np.bool_)
+    k = 0
+    for i in range(lookback, n - lookback):
+        is_ph = highs[i] == highs[i]
+        is_pl = lows[i] == lows[i]
+        for j in range(i - lookback, i + lookback + 1):
+            if not highs[j] <= highs[i]:
+                is_ph = False
+            if not lows[j] >= lows[i]:
+                is_pl = False
+        if is_ph:
+            out_idx[k] = i
+            out_high[k] = True
+            k += 1
+        if is_pl:
+            out_idx[k] = i
+            out_high[k] = False
+            k += 1
+    return out_idx[:k], out_high[:k]
+
+
+def find_pivot_arrays(df: pd.DataFrame, lookback: int | None = None) -> Pivots:
+    """
+    find_pivots() as a Pivots structure-of-arrays (no per-pivot dicts).
+
+    Memoised per frame — the returned arrays are shared, don't mutate them.
+    """
+    lookback = lookback or PIVOT_LOOKBACK
+    if df is None or len(df) < lookback * 3:
+        return _as_pivots(None)
+
+    cached = _PIVOT_CACHE.get(df, lookback)
+    if cached is not MISSING:
+        return cached
+
+    _, highs_v, lows_v, _, _ = _as_arrays(df)
+    return _PIVOT_CACHE.put(
+        df, pivots_from_arrays(highs_v, lows_v, lookback, df.index), lookback)
+
+
+def pivots_from_arrays(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    lookback: int | None = None,
+    index: pd.Index | None = None,
+) -> Pivots:
+    """
+    find_pivot_arrays() on bare high/low arrays (no frame, no memoisation).
+
+    *index* (the bar timestamps) fills Pivots.time when given.
+    """
+    lookback = lookback or PIVOT_LOOKBACK
+    highs_v = np.asarray(highs, dtype=np.float64)
+    lows_v = np.asarray(lows, dtype=np.float64)
+    if len(highs_v) < lookback * 3:
+        return _as_pivots(None)
+
+    # The scan stays in float64: float32 rounding can merge distinct tick
+    # prices (BTC at 0.01 ticks) and create false ties at the window extreme.
+    if HAVE_NUMBA:
+        all_idx, is_high = _find_pivots_kernel(highs_v, lows_v, lookback)
+    else:
+        # A bar is a pivot when it equals the extreme of its centred 2L+1
+        # window; edge bars have no full window and never qualify, and a
+        # NaN anywhere in the window propagates through max/min.
+        window = 2 * lookback + 1
+        centre = slice(lookback, len(highs_v) - lookback)
+        rmax = sliding_window_view(highs_v, window).max(axis=1)
+        rmin = sliding_window_view(lows_v, window).min(axis=1)
+        ph_idx = np.flatnonzero(highs_v[centre] == rmax) + lookback
+        pl_idx = np.flatnonzero(lows_v[centre] == rmin) + lookback
+
+        # Chronological merge; a stable sort keeps the high before the low
+        # when one bar is both.
+        all_idx = np.concatenate([ph_idx, pl_idx])
+        order = np.argsort(all_idx, kind="stable")
+        all_idx = all_idx[order]
+        is_high = order < len(ph_idx)
+
+    return Pivots(
+        idx=all_idx,
+        price=np.where(is_high, highs_v[all_idx], lows_v[all_idx]),
+        is_high=is_high,
+        is_major=np.zeros(len(all_idx), dtype=bool),
+        time=index[all_idx] if index is not None else None,
+    )
+
+
 def find_pivots(df: pd.DataFrame, lookback: int | None = None) -> list[dict]:
     """
     Identify pivot highs and pivot lows from OHLC data (Ch. 10).
@@ -201,42 +543,55 @@ def find_pivots(df: pd.DataFrame, lookback: int | None = None) -> list[dict]:
     Major/minor classification is done in a second pass by
     classify_pivots_major_minor().
     """
-    lookback = lookback or PIVOT_LOOKBACK
-    if df is None or len(df) < lookback * 3:
-        return []
-
-    highs_v = df["high"].values
-    lows_v = df["low"].values
-    pivots = []
-
-    for i in range(lookback, len(df) - lookback):
-        window_h = highs_v[i - lookback: i + lookback + 1]
-        window_l = lows_v[i - lookback: i + lookback + 1]
-
-        if highs_v[i] == window_h.max():
-            pivots.append({
-                "type": "high",
-                "price": float(highs_v[i]),
-                "time": df.index[i],
-                "idx": i,
-                "major": False,
-            })
-
-        if lows_v[i] == window_l.min():
-            pivots.append({
-                "type": "low",
-                "price": float(lows_v[i]),
-                "time": df.index[i],
-                "idx": i,
-                "major": False,
-            })
-
-    # Sort chronologically
-    pivots.sort(key=lambda p: p["idx"])
-    return pivots
+    return find_pivot_arrays(df, lookback).to_dicts()
+
+
+@njit(cache=True)
+def _major_kernel(price, is_high):
+    """_major_mask() as one sequential pass over the dense pivot arrays."""
+    n = len(price)
+    major = np.zeros(n, np.bool_)
+    for want_high in (True, False):
+        p1 = 0.0
+        p2 = 0.0
+        seen = 0
+        for i in range(n):
+            if is_high[i] != want_high:
+                continue
+            p = price[i]
+            if seen == 0:
+                major[i] = True  # first pivot = major by default
+            elif seen >= 2:
+                if want_high:
+                    major[i] = p > max(p1, p2)
+                else:
+                    major[i] = p < min(p1, p2)
+            p2 = p1
+            p1 = p
+            seen += 1
+    return major
+
+
+def _major_mask(price: np.ndarray, is_high: np.ndarray) -> np.ndarray:
+    """Major flags: beyond the previous 2 same-type pivots; first is major."""
+    if HAVE_NUMBA:
+        return _major_kernel(price, is_high)
+    major = np.zeros(len(price), dtype=bool)
+    for mask, beyond, extreme in ((is_high, np.greater, np.maximum),
+                                  (~is_high, np.less, np.minimum)):
+        pos = np.flatnonzero(mask)
+        if len(pos) == 0:
+            continue
+        p = price[pos]
+        m = np.zeros(len(p), dtype=bool)
+        m[0] = True  # first pivot = major by default
+        if len(p) > 2:
+            m[2:] = beyond(p[2:], extreme(p[1:-1], p[:-2]))
+        major[pos] = m
+    return major
 
 
-def classify_pivots_major_minor(pivots: list[dict]) -> list[dict]:
+def classify_pivots_major_minor(pivots: Pivots | list[dict]) -> Pivots | list[dict]:
     """
     Walk the pivot sequence and classify each as Major or Minor (Ch. 10).
 
@@ -246,125 +601,122 @@ def classify_pivots_major_minor(pivots: list[dict]) -> list[dict]:
 
     The book says: "Major pivots change the direction of the higher
     timeframe.  Minor pivots are noise within the trend."
+
+    A Pivots input returns a new Pivots; a list of dicts is annotated in
+    place and returned.
     """
-    if not pivots:
+    if pivots is None or len(pivots) == 0:
         return pivots
 
-    prev_highs: list[float] = []
-    prev_lows: list[float] = []
-
-    for pv in pivots:
-        if pv["type"] == "high":
-            # Major if higher than last 2 pivot highs
-            if len(prev_highs) >= 2 and pv["price"] > max(prev_highs[-2:]):
-                pv["major"] = True
-            elif len(prev_highs) == 0:
-                pv["major"] = True  # first pivot = major by default
-            prev_highs.append(pv["price"])
-        else:  # "low"
-            # Major if lower than last 2 pivot lows
-            if len(prev_lows) >= 2 and pv["price"] < min(prev_lows[-2:]):
-                pv["major"] = True
-            elif len(prev_lows) == 0:
-                pv["major"] = True
-            prev_lows.append(pv["price"])
+    if isinstance(pivots, Pivots):
+        return replace(pivots, is_major=pivots.is_major | _major_mask(pivots.price, pivots.is_high))
 
+    soa = Pivots.from_dicts(pivots)
+    for i in np.flatnonzero(_major_mask(soa.price, soa.is_high)).tolist():
+        pivots[i]["major"] = True
     return pivots
 
 
-def determine_trend_from_pivots(pivots: list[dict]) -> dict:
-    """
-    The Pristine trend definition (Ch. 10):
-
-    Uptrend:   Higher Pivot Highs (HPH) + Higher Pivot Lows (HPL)
-    Downtrend: Lower Pivot Highs (LPH) + Lower Pivot Lows (LPL)
-    Range:     No consistent pattern
-
-    Returns:
-        trend       : "uptrend" | "downtrend" | "range"
-        strength    : "strong" | "moderate" | "weak"
-        last_ph     : most recent pivot high price
-        last_pl     : most recent pivot low price
-        hph_count   : consecutive higher pivot highs
-        hpl_count   : consecutive higher pivot lows
-        lph_count   : consecutive lower pivot highs
-        lpl_count   : consecutive lower pivot lows
-    """
-    result = {
-        "trend": "range", "strength": "weak",
-        "last_ph": 0.0, "last_pl": 0.0,
-        "hph_count": 0, "hpl_count": 0,
-        "lph_count": 0, "lpl_count": 0,
-    }
-
-    # Separate recent pivot highs and lows
-    p_highs = [p for p in pivots if p["type"] == "high"]
-    p_lows = [p for p in pivots if p["type"] == "low"]
-
-    if len(p_highs) < 2 or len(p_lows) < 2:
-        return result
-
-    result["last_ph"] = p_highs[-1]["price"]
-    result["last_pl"] = p_lows[-1]["price"]
-
-    # Count consecutive higher/lower pivots (from the most recent backward)
+@njit(cache=True)
+def _count_consec(p_highs, p_lows):
+    """Consecutive higher/lower pivot highs and lows, newest first."""
     hph = 0
     for i in range(len(p_highs) - 1, 0, -1):
-        if p_highs[i]["price"] > p_highs[i - 1]["price"]:
+        if p_highs[i] > p_highs[i - 1]:
             hph += 1
         else:
             break
-    result["hph_count"] = hph
 
     hpl = 0
     for i in range(len(p_lows) - 1, 0, -1):
-        if p_lows[i]["price"] > p_lows[i - 1]["price"]:
+        if p_lows[i] > p_lows[i - 1]:
             hpl += 1
         else:
             break
-    result["hpl_count"] = hpl
 
     lph = 0
     for i in range(len(p_highs) - 1, 0, -1):
-        if p_highs[i]["price"] < p_highs[i - 1]["price"]:
+        if p_highs[i] < p_highs[i - 1]:
             lph += 1
         else:
             break
-    result["lph_count"] = lph
 
     lpl = 0
     for i in range(len(p_lows) - 1, 0, -1):
-        if p_lows[i]["price"] < p_lows[i - 1]["price"]:
+        if p_lows[i] < p_lows[i - 1]:
             lpl += 1
         else:
             break
-    result["lpl_count"] = lpl
+
+    return hph, hpl, lph, lpl
+
+
+def determine_trend_from_pivots(pivots: Pivots | list[dict]) -> TrendState:
+    """
+    The Pristine trend definition (Ch. 10):
+
+    Uptrend:   Higher Pivot Highs (HPH) + Higher Pivot Lows (HPL)
+    Downtrend: Lower Pivot Highs (LPH) + Lower Pivot Lows (LPL)
+    Range:     No consistent pattern
+
+    Returns:
+        trend       : "uptrend" | "downtrend" | "range"
+        strength    : "strong" | "moderate" | "weak"
+        last_ph     : most recent pivot high price
+        last_pl     : most recent pivot low price
+        hph_count   : consecutive higher pivot highs
+        hpl_count   : consecutive higher pivot lows
+        lph_count   : consecutive lower pivot highs
+        lpl_count   : consecutive lower pivot lows
+    """
+    # Separate recent pivot highs and lows
+    pv = _as_pivots(pivots)
+    p_highs = pv.price[pv.is_high].tolist()
+    p_lows = pv.price[~pv.is_high].tolist()
+
+    if len(p_highs) < 2 or len(p_lows) < 2:
+        return TrendState()
+
+    # Count consecutive higher/lower pivots (from the most recent backward)
+    if HAVE_NUMBA:
+        hph, hpl, lph, lpl = _count_consec(pv.price[pv.is_high], pv.price[~pv.is_high])
+    else:
+        hph, hpl, lph, lpl = _count_consec(p_highs, p_lows)
 
     # ── Trend determination ──────────────────────────────────────────────
     if hph >= 2 and hpl >= 2:
-        result["trend"] = "uptrend"
-        result["strength"] = "strong" if (hph >= 3 and hpl >= 3) else "moderate"
+        trend = "uptrend"
+        strength = "strong" if (hph >= 3 and hpl >= 3) else "moderate"
     elif lph >= 2 and lpl >= 2:
-        result["trend"] = "downtrend"
-        result["strength"] = "strong" if (lph >= 3 and lpl >= 3) else "moderate"
+        trend = "downtrend"
+        strength = "strong" if (lph >= 3 and lpl >= 3) else "moderate"
     elif hph >= 1 and hpl >= 1:
-        result["trend"] = "uptrend"
-        result["strength"] = "weak"
+        trend = "uptrend"
+        strength = "weak"
     elif lph >= 1 and lpl >= 1:
-        result["trend"] = "downtrend"
-        result["strength"] = "weak"
+        trend = "downtrend"
+        strength = "weak"
     else:
-        result["trend"] = "range"
-        result["strength"] = "weak"
-
-    return result
+        trend = "range"
+        strength = "weak"
+
+    return TrendState(
+        trend=trend, strength=strength,
+        last_ph=p_highs[-1], last_pl=p_lows[-1],
+        hph_count=hph, hpl_count=hpl,
+        lph_count=lph, lpl_count=lpl,
+    )
 
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  3. STAGE CLASSIFICATION  (Chapter 1)
 # ═════════════════════════════════════════════════════════════════════════════
 
-def classify_stage(df: pd.DataFrame, pivot_trend: dict | None = None) -> dict:
+def classify_stage(
+    df: pd.DataFrame,
+    pivot_trend: TrendState | dict | None = None,
+    ind: IndicatorBundle | None = None,
+) -> StageState:
     """
     Determine the current market stage (Ch. 1).
 
@@ -390,22 +742,25 @@ def classify_stage(df: pd.DataFrame, pivot_trend: dict | None = None) -> dict:
         tradeable        : bool
         allowed_direction: "BUY" | "SELL" | None
         description      : str
+
+    Callers that already have the pivot structure should pass its
+    *pivot_trend* (and *ind*) rather than let this rebuild them.
     """
-    result = {
-        "stage": 1, "confidence": 0.0, "tradeable": False,
-        "allowed_direction": None, "description": "Insufficient data",
-    }
+    result = StageState(
+        stage=1, confidence=0.0, tradeable=False,
+        allowed_direction=None, description="Insufficient data",
+    )
 
     if df is None or len(df) < 50:
         return result
 
-    close = df["close"].values
+    close = _as_arrays(df)[3]
     current_price = close[-1]
 
     # ── Compute MAs if not already present ───────────────────────────────
-    ma20 = _safe_ema(df, 20)
-    ma40 = _safe_ema(df, 40)
-    ma200 = _safe_sma(df, 200) if len(df) >= 200 else None
+    if ind is None:
+        ind = compute_indicators(df)
+    ma20, ma40, ma200 = ind.ema20, ind.ema40, ind.sma200
 
     if ma20 is None or ma40 is None:
         return result
@@ -429,9 +784,8 @@ def classify_stage(df: pd.DataFrame, pivot_trend: dict | None = None) -> dict:
 
     # ── Get pivot trend if not supplied ──────────────────────────────────
     if pivot_trend is None:
-        pvs = find_pivots(df)
-        pvs = classify_pivots_major_minor(pvs)
-        pivot_trend = determine_trend_from_pivots(pvs)
+        pivot_trend = determine_trend_from_pivots(
+            classify_pivots_major_minor(find_pivot_arrays(df)))
 
     pv_trend = pivot_trend.get("trend", "range")
 
@@ -447,11 +801,11 @@ def classify_stage(df: pd.DataFrame, pivot_trend: dict | None = None) -> dict:
             conf += 0.1
         if ma200_val is not None and current_price > ma200_val:
             conf += 0.1
-        result = {
-            "stage": 2, "confidence": min(conf, 1.0), "tradeable": True,
-            "allowed_direction": "BUY",
-            "description": "Stage 2 Uptrend — MAs fanning up, HPH+HPL",
-        }
+        result = StageState(
+            stage=2, confidence=min(conf, 1.0), tradeable=True,
+            allowed_direction="BUY",
+            description="Stage 2 Uptrend — MAs fanning up, HPH+HPL",
+        )
         return result
 
     # Stage 4: Downtrend
@@ -464,11 +818,11 @@ def classify_stage(df: pd.DataFrame, pivot_trend: dict | None = None) -> dict:
             conf += 0.1
         if ma200_val is not None and current_price < ma200_val:
             conf += 0.1
-        result = {
-            "stage": 4, "confidence": min(conf, 1.0), "tradeable": True,
-            "allowed_direction": "SELL",
-            "description": "Stage 4 Downtrend — MAs fanning down, LPH+LPL",
-        }
+        result = StageState(
+            stage=4, confidence=min(conf, 1.0), tradeable=True,
+            allowed_direction="SELL",
+            description="Stage 4 Downtrend — MAs fanning down, LPH+LPL",
+        )
         return result
 
     # Stage 1 or 3: Sideways
@@ -482,51 +836,112 @@ def classify_stage(df: pd.DataFrame, pivot_trend: dict | None = None) -> dict:
             prior_slope = (ma20[-30] - ma20[-40]) / ma20[-40] * 100 if ma20[-40] != 0 else 0
 
         if prior_slope < -0.1 or (ma200_val is not None and current_price < ma200_val):
-            result = {
-                "stage": 1, "confidence": 0.6, "tradeable": False,
-                "allowed_direction": None,
-                "description": "Stage 1 Accumulation — sideways after decline",
-            }
+            result = StageState(
+                stage=1, confidence=0.6, tradeable=False,
+                allowed_direction=None,
+                description="Stage 1 Accumulation — sideways after decline",
+            )
         else:
-            result = {
-                "stage": 3, "confidence": 0.6, "tradeable": False,
-                "allowed_direction": None,
-                "description": "Stage 3 Distribution — sideways after advance",
-            }
+            result = StageState(
+                stage=3, confidence=0.6, tradeable=False,
+                allowed_direction=None,
+                description="Stage 3 Distribution — sideways after advance",
+            )
         return result
 
     # Ambiguous — default to whichever is closest
     if ma20_slope > 0:
-        result = {
-            "stage": 2, "confidence": 0.35, "tradeable": True,
-            "allowed_direction": "BUY",
-            "description": "Weak Stage 2 — some upward tendency",
-        }
+        result = StageState(
+            stage=2, confidence=0.35, tradeable=True,
+            allowed_direction="BUY",
+            description="Weak Stage 2 — some upward tendency",
+        )
     elif ma20_slope < 0:
-        result = {
-            "stage": 4, "confidence": 0.35, "tradeable": True,
-            "allowed_direction": "SELL",
-            "description": "Weak Stage 4 — some downward tendency",
-        }
+        result = StageState(
+            stage=4, confidence=0.35, tradeable=True,
+            allowed_direction="SELL",
+            description="Weak Stage 4 — some downward tendency",
+        )
     else:
-        result = {
-            "stage": 1, "confidence": 0.3, "tradeable": False,
-            "allowed_direction": None,
-            "description": "Ambiguous — MAs flat, no clear stage",
-        }
+        result = StageState(
+            stage=1, confidence=0.3, tradeable=False,
+            allowed_direction=None,
+            description="Ambiguous — MAs flat, no clear stage",
+        )
 
     return result
 
 
+def classify_stage_series(df: pd.DataFrame, ind: IndicatorBundle | None = None) -> pd.Series:
+    """
+    classify_stage()'s stage number for EVERY bar of *df*, in one pass.
+
+    Bar i gets the stage classify_stage(df.iloc[:i + 1]) would report (the
+    MAs are causal, and the pivot trend only moves the confidence, never
+    the stage).  Bars with fewer than 50 bars of history get stage 1, as
+    classify_stage's "Insufficient data" result does.  For backtests and
+    per-bar studies; the live path still calls classify_stage().
+
+    Memoised per frame: treat the returned Series as read-only.
+    """
+    if df is None or len(df) == 0:
+        return pd.Series([], dtype=np.int8, name="stage")
+
+    cached = _STAGE_CACHE.get(df)
+    if cached is not MISSING:
+        return cached
+
+    n = len(df)
+    stage = np.ones(n, dtype=np.int8)
+    if ind is None:
+        ind = compute_indicators(df)
+    ma20, ma40 = ind.ema20, ind.ema40
+    if n >= 50 and ma20 is not None and ma40 is not None:
+        close = _as_arrays(df)[3]
+        ma200 = ind.sma200 if ind.sma200 is not None else np.full(n, np.nan)
+
+        def pct_change(a: np.ndarray, lag: int, end_lag: int = 0) -> np.ndarray:
+            # (a[i - end_lag] - a[i - lag]) / a[i - lag] * 100, 0 when undefined
+            out = np.zeros(n)
+            cur, ref = a[lag - end_lag:n - end_lag], a[:n - lag]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[lag:] = np.where(ref != 0, (cur - ref) / ref * 100, 0)
+            return out
+
+        ma20_slope = pct_change(ma20, 10)
+        ma40_slope = pct_change(ma40, 10)
+        prior_slope = pct_change(ma20, 39, end_lag=29)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spread = np.where(ma40 != 0, np.abs(ma20 - ma40) / ma40 * 100, 0)
+
+        above_20 = close > ma20
+        above_40 = close > ma40
+        ma20_above_40 = ma20 > ma40
+        s2 = above_20 & above_40 & ma20_above_40 & (ma20_slope > 0.1) & (ma40_slope >= 0)
+        s4 = ~above_20 & ~above_40 & ~ma20_above_40 & (ma20_slope < -0.1) & (ma40_slope <= 0)
+        converging = spread < STAGE_CONVERGENCE_PCT
+        after_decline = (prior_slope < -0.1) | (close < ma200)
+
+        labels = np.select(
+            [s2, s4, converging & after_decline, converging, ma20_slope > 0, ma20_slope < 0],
+            [2, 4, 1, 3, 2, 4],
+            default=1,
+        )
+        stage[49:] = labels[49:]
+
+    return _STAGE_CACHE.put(df, pd.Series(stage, index=df.index, name="stage"))
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 #  4. RETRACEMENT ANALYSIS  (Chapter 6)
 # ═════════════════════════════════════════════════════════════════════════════
 
 def analyze_retracement(
     df: pd.DataFrame,
-    pivots: list[dict],
+    pivots: Pivots | list[dict],
     direction: int,
-) -> dict:
+    ind: IndicatorBundle | None = None,
+) -> RetracementState:
     """
     Measure pullback quality (Ch. 6).
 
@@ -541,56 +956,41 @@ def analyze_retracement(
       near_ma20: Pullback to 20 EMA area (Ch. 6 "textbook setup")
       near_ma40: Pullback to 40 EMA area (deeper but acceptable)
     """
-    result = {
-        "retracement_pct": 0.0,
-        "quality": "unknown",
-        "impulse_start": 0.0,
-        "impulse_end": 0.0,
-        "current_price": 0.0,
-        "near_ma20": False,
-        "near_ma40": False,
-    }
-
     if not pivots or df is None or len(df) < 20:
-        return result
+        return RetracementState()
 
     current_price = df["close"].iloc[-1]
-    result["current_price"] = current_price
+    no_impulse = RetracementState(current_price=current_price)
 
-    p_highs = [p for p in pivots if p["type"] == "high"]
-    p_lows = [p for p in pivots if p["type"] == "low"]
+    pv = _as_pivots(pivots)
+    hi_idx, hi_price = pv.idx[pv.is_high], pv.price[pv.is_high]
+    lo_idx, lo_price = pv.idx[~pv.is_high], pv.price[~pv.is_high]
 
-    if direction == 1 and len(p_highs) >= 1 and len(p_lows) >= 1:
+    if direction == 1 and len(hi_idx) >= 1 and len(lo_idx) >= 1:
         # For an uptrend pullback: impulse = last pivot low → last pivot high
         # Find the most recent pivot high THEN the pivot low before it
-        last_ph = p_highs[-1]
-        prior_lows = [p for p in p_lows if p["idx"] < last_ph["idx"]]
-        if not prior_lows:
-            return result
-        last_pl = prior_lows[-1]
+        # Pivot indices are chronological: the last low before the high
+        pos = np.searchsorted(lo_idx, hi_idx[-1]) - 1
+        if pos < 0:
+            return no_impulse
 
-        impulse_start = last_pl["price"]
-        impulse_end = last_ph["price"]
+        impulse_start = float(lo_price[pos])
+        impulse_end = float(hi_price[-1])
 
-    elif direction == -1 and len(p_highs) >= 1 and len(p_lows) >= 1:
+    elif direction == -1 and len(hi_idx) >= 1 and len(lo_idx) >= 1:
         # For a downtrend pullback: impulse = last pivot high → last pivot low
-        last_pl = p_lows[-1]
-        prior_highs = [p for p in p_highs if p["idx"] < last_pl["idx"]]
-        if not prior_highs:
-            return result
-        last_ph = prior_highs[-1]
-
-        impulse_start = last_ph["price"]
-        impulse_end = last_pl["price"]
+        pos = np.searchsorted(hi_idx, lo_idx[-1]) - 1
+        if pos < 0:
+            return no_impulse
+
+        impulse_start = float(hi_price[pos])
+        impulse_end = float(lo_price[-1])
     else:
-        return result
+        return no_impulse
 
     impulse_range = abs(impulse_end - impulse_start)
     if impulse_range == 0:
-        return result
-
-    result["impulse_start"] = impulse_start
-    result["impulse_end"] = impulse_end
+        return no_impulse
 
     # How far has price pulled back from the impulse end?
     if direction == 1:
@@ -599,35 +999,44 @@ def analyze_retracement(
         pullback = current_price - impulse_end   # positive means price pulled back up
 
     ret_pct = max(0, pullback / impulse_range)
-    result["retracement_pct"] = round(ret_pct, 3)
 
     # Quality label
     if ret_pct < 0:
-        result["quality"] = "none"  # price hasn't pulled back (still extending)
+        quality = "none"  # price hasn't pulled back (still extending)
     elif ret_pct < RET_PRISTINE:
-        result["quality"] = "pristine"
+        quality = "pristine"
     elif ret_pct < RET_HEALTHY:
-        result["quality"] = "healthy"
+        quality = "healthy"
     elif ret_pct < RET_DEEP:
-        result["quality"] = "deep"
+        quality = "deep"
     elif ret_pct < RET_MAX_GATE:
-        result["quality"] = "failing"
+        quality = "failing"
     else:
-        result["quality"] = "broken"
+        quality = "broken"
 
     # ── MA proximity check (Ch. 6 — "pullback to the 20 EMA area") ──────
-    ma20 = _safe_ema(df, 20)
-    ma40 = _safe_ema(df, 40)
+    if ind is None:
+        ind = compute_indicators(df)
+    ma20, ma40 = ind.ema20, ind.ema40
 
+    near_ma20 = near_ma40 = False
     if ma20 is not None and len(df) > 0:
-        atr_est = _estimate_atr(df)
+        atr_est = ind.atr
         if atr_est > 0:
             dist_20 = abs(current_price - ma20[-1])
             dist_40 = abs(current_price - ma40[-1]) if ma40 is not None else float("inf")
-            result["near_ma20"] = dist_20 <= atr_est * 1.0
-            result["near_ma40"] = dist_40 <= atr_est * 1.0
-
-    return result
+            near_ma20 = dist_20 <= atr_est * 1.0
+            near_ma40 = dist_40 <= atr_est * 1.0
+
+    return RetracementState(
+        retracement_pct=round(ret_pct, 3),
+        quality=quality,
+        impulse_start=impulse_start,
+        impulse_end=impulse_end,
+        current_price=current_price,
+        near_ma20=near_ma20,
+        near_ma40=near_ma40,
+    )
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -636,8 +1045,9 @@ def analyze_retracement(
 
 def classify_volume(
     df: pd.DataFrame,
-    pivots: list[dict],
+    pivots: Pivots | list[dict],
     direction: int,
+    ind: IndicatorBundle | None = None,
 ) -> dict:
     """
     Classify volume behaviour (Ch. 5).
@@ -662,10 +1072,8 @@ def classify_volume(
     # Check for "volume" directly instead of the dead "tick_volume" branch.
     if df is None or len(df) < 30 or "volume" not in df.columns:
         return result
-    vol_col = "volume"
 
-    vol = df[vol_col].values
-    close = df["close"].values
+    _, _, _, close, vol = _as_arrays(df)
 
     # Current volume vs average
     avg_vol_20 = np.mean(vol[-21:-1]) if len(vol) > 21 else np.mean(vol[:-1])
@@ -697,17 +1105,15 @@ def classify_volume(
 
     # ── Pullback volume analysis ─────────────────────────────────────────
     # Find the most recent pullback phase (bars moving against trend)
-    pullback_vols = []
-    impulse_vols = []
-
-    for i in range(len(close) - 1, max(len(close) - 20, 1), -1):
-        bar_direction = 1 if close[i] > close[i - 1] else -1
-        if bar_direction != direction:
-            pullback_vols.append(vol[i])
-        else:
-            impulse_vols.append(vol[i])
-
-    if pullback_vols and impulse_vols:
+    # Last 19 bar-to-bar moves, newest first
+    if ind is None:
+        ind = compute_indicators(df)
+    seg_vol = vol[-19:][::-1]
+    is_impulse = ind.close_chg_dir[-19:][::-1] == direction
+    pullback_vols = seg_vol[~is_impulse]
+    impulse_vols = seg_vol[is_impulse]
+
+    if len(pullback_vols) and len(impulse_vols):
         avg_pb_vol = np.mean(pullback_vols)
         avg_imp_vol = np.mean(impulse_vols)
 
@@ -721,9 +1127,13 @@ def classify_volume(
                 result["pullback_vol_trend"] = "flat"
 
     # ── Impulse volume trend ─────────────────────────────────────────────
-    if impulse_vols and len(impulse_vols) >= 3:
-        first_half = np.mean(impulse_vols[len(impulse_vols)//2:])
-        second_half = np.mean(impulse_vols[:len(impulse_vols)//2])
+    if len(impulse_vols) >= 3:
+        # impulse_vols is newest-first: "first_half" is the OLDER half.
+        # Both means from one prefix sum (m >= 1 here).
+        cs = np.cumsum(impulse_vols)
+        m = len(impulse_vols) // 2
+        first_half = (cs[-1] - cs[m - 1]) / (len(impulse_vols) - m)
+        second_half = cs[m - 1] / m
         if second_half > first_half * 1.1:
             result["impulse_vol_trend"] = "expanding"
         elif second_half < first_half * 0.8:
@@ -746,6 +1156,8 @@ def bar_by_bar_assessment(
     df: pd.DataFrame,
     direction: int,
     entry_idx: int | None = None,
+    ind: IndicatorBundle | None = None,
+    last_candle: dict | None = None,
 ) -> dict:
     """
     Real-time bar-by-bar trade health assessment (Ch. 7).
@@ -759,6 +1171,9 @@ def bar_by_bar_assessment(
       Widening ranges against: Increasing counter-pressure → exit.
       Close position: Where bars close relative to their range.
 
+    *last_candle* — classify_candle(df, -1) if the caller already has it
+    (e.g. candle_class[-1] from the timeframe analysis).
+
     Returns:
         health       : "strong" | "ok" | "warning" | "exit"
         rbi_count    : red bars ignored (bullish context)
@@ -780,32 +1195,25 @@ def bar_by_bar_assessment(
     if start >= len(df) - 1:
         return result
 
-    analysis_df = df.iloc[start:]
-    if len(analysis_df) < 2:
+    _, h, l, c, _ = _as_arrays(df)
+    closes, highs, lows = c[start:], h[start:], l[start:]
+    if len(closes) < 2:
         return result
 
-    closes = analysis_df["close"].values
-    opens = analysis_df["open"].values
-    highs = analysis_df["high"].values
-    lows = analysis_df["low"].values
-
     reasons = []
 
     # ── Count RBI / GBI ──────────────────────────────────────────────────
-    rbi = 0
-    gbi = 0
-    for i in range(1, len(closes) - 1):
-        bar_bullish = closes[i] > opens[i]
-        next_bar_bullish = closes[i + 1] > opens[i + 1]
-
-        if not bar_bullish and next_bar_bullish:
-            # Red bar followed by green that closes above red's high
-            if closes[i + 1] > highs[i]:
-                rbi += 1
-        elif bar_bullish and not next_bar_bullish:
-            # Green bar followed by red that closes below green's low
-            if closes[i + 1] < lows[i]:
-                gbi += 1
+    # Pairs (bar i, bar i+1) for i = 1 … n-2; the first bar is context only.
+    if ind is None:
+        ind = compute_indicators(df)
+    bar_dir = ind.body_dir[start:]
+    bar_bull = bar_dir > 0
+    pb = bar_bull[1:-1]
+    nb = bar_bull[2:]
+    # Red bar followed by green that closes above red's high
+    rbi = int(((~pb) & nb & (closes[2:] > highs[1:-1])).sum())
+    # Green bar followed by red that closes below green's low
+    gbi = int((pb & (~nb) & (closes[2:] < lows[1:-1])).sum())
 
     result["rbi_count"] = rbi
     result["gbi_count"] = gbi
@@ -816,23 +1224,20 @@ def bar_by_bar_assessment(
         reasons.append(f"{gbi} Green Bars Ignored — buyers failing")
 
     # ── Consecutive bars against ─────────────────────────────────────────
-    bars_against = 0
-    for i in range(len(closes) - 1, 0, -1):
-        bar_dir = 1 if closes[i] > opens[i] else -1
-        if bar_dir == -direction:
-            bars_against += 1
-        else:
-            break
+    against = (bar_dir[1:] == -direction)[::-1]
+    bars_against = len(against) if against.all() else int(np.argmax(~against))
 
     result["bars_against"] = bars_against
     if bars_against >= 3:
         reasons.append(f"{bars_against} consecutive bars against position")
 
     # ── Range trend (narrowing/widening) ─────────────────────────────────
-    if len(analysis_df) >= 5:
-        ranges = highs - lows
-        recent_3 = np.mean(ranges[-3:])
-        older_3 = np.mean(ranges[-6:-3]) if len(ranges) >= 6 else np.mean(ranges[:-3])
+    if len(closes) >= 5:
+        recent_3 = ind.roll3_range[-1]
+        if len(closes) >= 6:
+            older_3 = ind.roll3_range[-4]
+        else:
+            older_3 = np.mean(highs[:-3] - lows[:-3])
 
         if older_3 > 0:
             ratio = recent_3 / older_3
@@ -844,28 +1249,25 @@ def bar_by_bar_assessment(
                 reasons.append("Bar ranges widening — increasing volatility")
 
     # ── Check WRB against position ───────────────────────────────────────
-    last_candle = classify_candle(df, idx=-1)
-    if last_candle["type"] == "WRB" and last_candle["bias"] == -direction:
+    if last_candle is None:
+        last_candle = classify_candle(df, idx=-1)
+    wrb_against = last_candle["type"] == "WRB" and last_candle["bias"] == -direction
+    if wrb_against:
         reasons.append("WRB against position — strong counter-pressure")
 
     # ── Determine overall health ─────────────────────────────────────────
-    danger_score = 0
-    if bars_against >= 3:
-        danger_score += 2
-    if bars_against >= 5:
-        danger_score += 3
-    if last_candle["type"] == "WRB" and last_candle["bias"] == -direction:
-        danger_score += 2
-    if result["range_trend"] == "widening" and bars_against >= 2:
-        danger_score += 1
-
-    # Positive signals
-    if direction == 1 and rbi >= 2:
-        danger_score -= 1
-    if direction == -1 and gbi >= 2:
-        danger_score -= 1
-    if result["range_trend"] == "narrowing":
-        danger_score -= 1
+    # Each term is a 0/1 bool: danger adds, ignored bars / compression subtract
+    widening = result["range_trend"] == "widening"
+    narrowing = result["range_trend"] == "narrowing"
+    danger_score = (
+        2 * (bars_against >= 3)
+        + 3 * (bars_against >= 5)
+        + 2 * wrb_against
+        + (widening and bars_against >= 2)
+        - (direction == 1 and rbi >= 2)
+        - (direction == -1 and gbi >= 2)
+        - narrowing
+    )
 
     if danger_score >= 5:
         result["health"] = "exit"
@@ -880,6 +1282,60 @@ def bar_by_bar_assessment(
     return result
 
 
+# ═════════════════════════════════════════════════════════════════════════════
+#  S/R LEVELS AS ARRAYS  (Chapter 3)
+# ═════════════════════════════════════════════════════════════════════════════
+# structures.find_sr_levels() returns level dicts sorted strongest first;
+# the sweet-spot, setup and BBF checks below scan them as parallel arrays.
+
+# Kind codes are bit flags (SR = S | R), so "acts as support" and "acts as
+# resistance" are one AND each instead of an ("S", "SR") membership test.
+KIND_NONE: int = 0
+KIND_S: int = 1
+KIND_R: int = 2
+KIND_SR: int = KIND_S | KIND_R
+_KIND_CODES = {"S": KIND_S, "R": KIND_R, "SR": KIND_SR}
+
+
+@dataclass
+class SRLevels:
+    """S/R levels as parallel arrays (structure-of-arrays), strongest first."""
+    prices: np.ndarray       # float64
+    kinds: np.ndarray        # int8 — KIND_S / KIND_R / KIND_SR / KIND_NONE
+    touches: np.ndarray      # int64
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @classmethod
+    def from_list(cls, levels: list[dict], limit: int | None = None) -> SRLevels:
+        levels = levels[:limit]
+        n = len(levels)
+        return cls(
+            prices=np.fromiter((lv.get("price", 0) for lv in levels), dtype=np.float64, count=n),
+            kinds=np.fromiter((_KIND_CODES.get(lv.get("kind"), KIND_NONE) for lv in levels),
+                              dtype=np.int8, count=n),
+            touches=np.fromiter((lv.get("touches", 0) for lv in levels), dtype=np.int64, count=n),
+        )
+
+    def head(self, limit: int) -> SRLevels:
+        return SRLevels(self.prices[:limit], self.kinds[:limit], self.touches[:limit])
+
+    @property
+    def is_support(self) -> np.ndarray:
+        return (self.kinds & KIND_S) != 0
+
+    @property
+    def is_resistance(self) -> np.ndarray:
+        return (self.kinds & KIND_R) != 0
+
+
+def _as_sr_levels(levels: SRLevels | list[dict] | None, limit: int) -> SRLevels:
+    if isinstance(levels, SRLevels):
+        return levels.head(limit)
+    return SRLevels.from_list(levels or [], limit)
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 #  7. SWEET SPOT / SOUR SPOT  (Chapter 12)
 # ═════════════════════════════════════════════════════════════════════════════
@@ -904,7 +1360,7 @@ def detect_sweet_sour_spot(
         "stage": dict (from classify_stage),
         "pivot_trend": dict (from determine_trend_from_pivots),
         "retracement": dict (from analyze_retracement),
-        "sr_levels": list (S/R levels),
+        "sr_levels": list | SRLevels (S/R levels),
         "candle_class": list (from classify_last_n_candles),
         "current_price": float,
         "atr": float,
@@ -917,33 +1373,59 @@ def detect_sweet_sour_spot(
         macro_stage      : int (higher TF stage)
         micro_retracement: str (entry TF retracement quality)
     """
-    result = {
-        "type": "neutral", "score": 0.0, "reasons": [],
-        "macro_stage": 0, "micro_retracement": "unknown",
-    }
-
     htf = tf_analyses.get(higher_tf, {})
     ttf = tf_analyses.get(trend_tf, {})
     etf = tf_analyses.get(entry_tf, {})
 
     if not htf or not ttf:
-        return result
+        return {
+            "type": "neutral", "score": 0.0, "reasons": [],
+            "macro_stage": 0, "micro_retracement": "unknown",
+        }
+
+    # The analyses only change when a bar closes, so the scan asks the same
+    # question every tick.  Reduce them to the scalars the classifier reads
+    # and memoise on those.
+    htf_sr = htf.get("sr_levels", [])
+    levels = _as_sr_levels(htf_sr, 5)  # strongest levels
+    etf_candles = etf.get("candle_class", [])
+    last_candle = etf_candles[-1] if etf_candles else None
+
+    key = (
+        direction, entry_tf, trend_tf, higher_tf,
+        htf.get("stage", {}).get("stage", 0),
+        ttf.get("pivot_trend", {}).get("trend", "range"),
+        etf.get("retracement", {}).get("quality", "unknown"),
+        etf.get("current_price", 0),
+        etf.get("atr", 0),
+        tuple(levels.prices.tolist()),
+        tuple(levels.kinds.tolist()),
+        last_candle is not None,
+        last_candle.get("bias") if last_candle is not None else None,
+        last_candle.get("type") if last_candle is not None else None,
+    )
+    spot_type, score, reasons, macro_stage, ret_quality = _sweet_spot_cached(key)
+    return {
+        "type": spot_type, "score": score, "reasons": list(reasons),
+        "macro_stage": macro_stage, "micro_retracement": ret_quality,
+    }
+
+
+@lru_cache(maxsize=4096)
+def _sweet_spot_cached(key: tuple) -> tuple:
+    """Classifier body of detect_sweet_sour_spot over its reduced inputs."""
+    (direction, entry_tf, trend_tf, higher_tf, macro_stage, ttf_trend,
+     ret_quality, etf_price, etf_atr, sr_prices, sr_kinds,
+     has_candle, candle_bias, candle_type) = key
 
     reasons = []
     score = 0.0
 
     # ── Higher TF stage check ────────────────────────────────────────────
-    htf_stage = htf.get("stage", {})
-    macro_stage = htf_stage.get("stage", 0)
-    result["macro_stage"] = macro_stage
-
-    stage_ok = False
     if direction == 1 and macro_stage == 2:
-        stage_ok = True
         score += 0.3
         reasons.append(f"{higher_tf} in Stage 2 (uptrend) — aligned with BUY")
     elif direction == -1 and macro_stage == 4:
-        stage_ok = True
         score += 0.3
         reasons.append(f"{higher_tf} in Stage 4 (downtrend) — aligned with SELL")
     elif macro_stage in (1, 3):
@@ -954,9 +1436,6 @@ def detect_sweet_sour_spot(
         reasons.append(f"{higher_tf} Stage {macro_stage} against trade direction")
 
     # ── Trading TF pivot trend alignment ─────────────────────────────────
-    ttf_pv = ttf.get("pivot_trend", {})
-    ttf_trend = ttf_pv.get("trend", "range")
-
     if (direction == 1 and ttf_trend == "uptrend") or \
        (direction == -1 and ttf_trend == "downtrend"):
         score += 0.2
@@ -969,10 +1448,6 @@ def detect_sweet_sour_spot(
         reasons.append(f"{trend_tf} pivot trend = {ttf_trend} — conflicts with direction")
 
     # ── Entry TF retracement quality ─────────────────────────────────────
-    etf_ret = etf.get("retracement", {})
-    ret_quality = etf_ret.get("quality", "unknown")
-    result["micro_retracement"] = ret_quality
-
     if ret_quality in ("pristine", "healthy"):
         score += 0.2
         reasons.append(f"{entry_tf} retracement = {ret_quality} — good pullback")
@@ -987,57 +1462,49 @@ def detect_sweet_sour_spot(
         reasons.append(f"{entry_tf} retracement = broken — trend is over")
 
     # ── Sour spot: approaching major higher-TF S/R against direction ─────
-    htf_sr = htf.get("sr_levels", [])
-    etf_price = etf.get("current_price", 0)
-    etf_atr = etf.get("atr", 0)
-
-    if htf_sr and etf_price > 0 and etf_atr > 0:
+    if sr_prices and etf_price > 0 and etf_atr > 0:
         sour_proximity = etf_atr * 1.5  # 1.5 ATR = danger zone
-        for level in htf_sr[:5]:  # check strongest levels
-            lvl_price = level.get("price", 0)
-            dist = abs(etf_price - lvl_price)
-            if dist < sour_proximity:
-                kind = level.get("kind", "")
-                # Buying into resistance or selling into support = sour spot
-                if direction == 1 and lvl_price > etf_price and kind in ("R", "SR"):
-                    score -= 0.3
-                    reasons.append(
-                        f"{higher_tf} resistance at {lvl_price:.5f} "
-                        f"({dist/etf_atr:.1f} ATR away) — SOUR SPOT"
-                    )
-                    break
-                elif direction == -1 and lvl_price < etf_price and kind in ("S", "SR"):
-                    score -= 0.3
-                    reasons.append(
-                        f"{higher_tf} support at {lvl_price:.5f} "
-                        f"({dist/etf_atr:.1f} ATR away) — SOUR SPOT"
-                    )
-                    break
+        prices = np.array(sr_prices, dtype=np.float64)
+        kinds = np.array(sr_kinds, dtype=np.int8)
+        dist = np.abs(etf_price - prices)
+        # Buying into resistance or selling into support = sour spot
+        if direction == 1:
+            against = (prices > etf_price) & ((kinds & KIND_R) != 0)
+        else:
+            against = (direction == -1) & (prices < etf_price) & ((kinds & KIND_S) != 0)
+        hits = (dist < sour_proximity) & against
+        if hits.any():
+            k = int(hits.argmax())  # first (strongest) level in the zone
+            score -= 0.3
+            reasons.append(
+                f"{higher_tf} {'resistance' if direction == 1 else 'support'} "
+                f"at {prices[k]:.5f} "
+                f"({dist[k]/etf_atr:.1f} ATR away) — SOUR SPOT"
+            )
 
     # ── Candle confirmation at entry TF ──────────────────────────────────
-    etf_candles = etf.get("candle_class", [])
-    if etf_candles:
-        last_candle = etf_candles[-1]
-        if last_candle.get("bias") == direction:
+    if has_candle:
+        if candle_bias == direction:
             score += 0.1
             reasons.append(f"{entry_tf} last candle bias confirms direction")
-        elif last_candle.get("type") == "WRB" and last_candle.get("bias") == -direction:
+        elif candle_type == "WRB" and candle_bias == -direction:
             score -= 0.2
             reasons.append(f"{entry_tf} WRB against direction")
 
     # ── Final classification ─────────────────────────────────────────────
-    score = max(-1.0, min(1.0, score))
-    result["score"] = round(score, 2)
-    result["reasons"] = reasons
+    if score > 1.0:
+        score = 1.0
+    elif score < -1.0:
+        score = -1.0
 
     if score >= 0.4:
-        result["type"] = "sweet_spot"
+        spot_type = "sweet_spot"
     elif score <= -0.2:
-        result["type"] = "sour_spot"
+        spot_type = "sour_spot"
     else:
-        result["type"] = "neutral"
+        spot_type = "neutral"
 
-    return result
+    return spot_type, round(score, 2), tuple(reasons), macro_stage, ret_quality
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -1051,7 +1518,7 @@ def detect_pristine_setup(
     volume_class: dict,
     sweet_spot: dict,
     last_candle: dict,
-    sr_levels: list,
+    sr_levels: SRLevels | list,
     current_price: float,
     direction: int,
 ) -> dict | None:
@@ -1075,51 +1542,54 @@ def detect_pristine_setup(
     """
     criteria_met = []
     criteria_missed = []
+    # Grading needs 5 of 7: once 3 criteria are missed the result is None,
+    # so each later (costlier) criterion is skipped.  Criteria are kept as
+    # (template, *args) and only formatted for a setup that is returned.
 
     # ── 1. Stage Gate (HARD REQUIREMENT) ─────────────────────────────────
     stage_num = stage.get("stage", 0)
     if direction == 1 and stage_num == 2:
-        criteria_met.append("Stage 2 uptrend (higher TF)")
+        criteria_met.append(("Stage 2 uptrend (higher TF)",))
     elif direction == -1 and stage_num == 4:
-        criteria_met.append("Stage 4 downtrend (higher TF)")
+        criteria_met.append(("Stage 4 downtrend (higher TF)",))
     else:
-        criteria_missed.append(f"Stage {stage_num} — wrong stage for {'BUY' if direction == 1 else 'SELL'}")
+        criteria_missed.append(("Stage {} — wrong stage for {}",
+                                stage_num, "BUY" if direction == 1 else "SELL"))
 
     # ── 2. Pivot Trend Gate (HARD REQUIREMENT) ───────────────────────────
     pv_trend = pivot_trend.get("trend", "range")
     if (direction == 1 and pv_trend == "uptrend") or \
        (direction == -1 and pv_trend == "downtrend"):
-        criteria_met.append(f"Pivot trend = {pv_trend}")
+        criteria_met.append(("Pivot trend = {}", pv_trend))
     elif pv_trend == "range":
-        criteria_missed.append(f"Pivot trend = range (need {('uptrend' if direction == 1 else 'downtrend')})")
+        criteria_missed.append(("Pivot trend = range (need {})",
+                                "uptrend" if direction == 1 else "downtrend"))
     else:
-        criteria_missed.append(f"Pivot trend = {pv_trend} (wrong direction)")
+        criteria_missed.append(("Pivot trend = {} (wrong direction)", pv_trend))
 
     # ── 3. Retracement quality ───────────────────────────────────────────
     ret_q = retracement.get("quality", "unknown")
+    ret_pct = retracement.get("retracement_pct", 0)
     if ret_q in ("pristine", "healthy"):
-        criteria_met.append(f"Retracement = {ret_q} ({retracement.get('retracement_pct', 0):.0%})")
+        criteria_met.append(("Retracement = {} ({:.0%})", ret_q, ret_pct))
     elif ret_q == "deep":
-        criteria_met.append(f"Retracement = deep ({retracement.get('retracement_pct', 0):.0%}) — acceptable")
+        criteria_met.append(("Retracement = deep ({:.0%}) — acceptable", ret_pct))
     elif ret_q == "none":
-        criteria_missed.append("No pullback — price still extending")
+        criteria_missed.append(("No pullback — price still extending",))
     else:
-        criteria_missed.append(f"Retracement = {ret_q} — too deep")
+        criteria_missed.append(("Retracement = {} — too deep", ret_q))
+
+    if len(criteria_missed) > 2:
+        return None  # 5/7 (grade B) no longer reachable
 
     # ── 4. Pullback to MA or S/R ─────────────────────────────────────────
     at_ma = retracement.get("near_ma20", False) or retracement.get("near_ma40", False)
     at_sr = False
-    if sr_levels and current_price > 0:
-        for lvl in sr_levels[:5]:
-            lvl_price = lvl.get("price", 0)
-            if direction == 1 and lvl.get("kind") in ("S", "SR"):
-                if current_price > 0 and abs(current_price - lvl_price) / current_price < 0.005:
-                    at_sr = True
-                    break
-            elif direction == -1 and lvl.get("kind") in ("R", "SR"):
-                if current_price > 0 and abs(current_price - lvl_price) / current_price < 0.005:
-                    at_sr = True
-                    break
+    if sr_levels and current_price > 0 and direction in (1, -1):
+        levels = _as_sr_levels(sr_levels, 5)
+        wanted = levels.is_support if direction == 1 else levels.is_resistance
+        near = np.abs(current_price - levels.prices) / current_price < 0.005
+        at_sr = bool((near & wanted).any())
 
     if at_ma or at_sr:
         loc = []
@@ -1127,40 +1597,50 @@ def detect_pristine_setup(
             loc.append("MA area")
         if at_sr:
             loc.append("S/R level")
-        criteria_met.append(f"Pullback to {' + '.join(loc)}")
+        criteria_met.append(("Pullback to {}", " + ".join(loc)))
     else:
-        criteria_missed.append("Pullback not at MA or S/R level")
+        criteria_missed.append(("Pullback not at MA or S/R level",))
+
+    if len(criteria_missed) > 2:
+        return None  # 5/7 (grade B) no longer reachable
 
     # ── 5. Reversal candle signal ────────────────────────────────────────
     candle_bias = last_candle.get("bias", 0)
     candle_type = last_candle.get("type", "normal")
     if candle_bias == direction:
         desc = candle_type
-        if last_candle.get("tail") == "demand_rejection" and direction == 1:
+        candle_tail = last_candle.get("tail")
+        if candle_tail == "demand_rejection" and direction == 1:
             desc = "demand rejection (hammer)"
-        elif last_candle.get("tail") == "supply_rejection" and direction == -1:
+        elif candle_tail == "supply_rejection" and direction == -1:
             desc = "supply rejection"
-        criteria_met.append(f"Reversal candle: {desc}")
+        criteria_met.append(("Reversal candle: {}", desc))
     else:
-        criteria_missed.append("No reversal candle signal")
+        criteria_missed.append(("No reversal candle signal",))
+
+    if len(criteria_missed) > 2:
+        return None  # 5/7 (grade B) no longer reachable
 
     # ── 6. Volume on pullback ────────────────────────────────────────────
     pb_vol = volume_class.get("pullback_vol_trend", "flat")
     if pb_vol == "declining":
-        criteria_met.append("Volume declining on pullback — healthy")
+        criteria_met.append(("Volume declining on pullback — healthy",))
     elif pb_vol == "rising":
-        criteria_missed.append("Volume rising on pullback — danger")
+        criteria_missed.append(("Volume rising on pullback — danger",))
     else:
-        criteria_met.append("Volume neutral on pullback")
+        criteria_met.append(("Volume neutral on pullback",))
+
+    if len(criteria_missed) > 2:
+        return None  # 5/7 (grade B) no longer reachable
 
     # ── 7. Sweet spot ────────────────────────────────────────────────────
     spot_type = sweet_spot.get("type", "neutral")
     if spot_type == "sweet_spot":
-        criteria_met.append("Multi-TF sweet spot confirmed")
+        criteria_met.append(("Multi-TF sweet spot confirmed",))
     elif spot_type == "sour_spot":
-        criteria_missed.append("Multi-TF sour spot — macro resistance ahead")
+        criteria_missed.append(("Multi-TF sour spot — macro resistance ahead",))
     else:
-        criteria_met.append("Multi-TF alignment neutral")
+        criteria_met.append(("Multi-TF alignment neutral",))
 
     # ── Grade ────────────────────────────────────────────────────────────
     met_count = len(criteria_met)
@@ -1178,22 +1658,12 @@ def detect_pristine_setup(
     setup_type = "PBS" if direction == 1 else "PSS"
 
     # ── SL / TP from pivots (Ch. 13) ─────────────────────────────────────
-    sl = 0.0
-    tp = 0.0
-    if direction == 1:
-        # SL below the pullback low (last pivot low)
-        if retracement.get("impulse_start", 0) > 0:
-            sl = retracement["impulse_start"]
-        # TP at the prior pivot high (or beyond)
-        if retracement.get("impulse_end", 0) > 0:
-            tp = retracement["impulse_end"]
-    else:
-        # SL above the pullback high (last pivot high)
-        if retracement.get("impulse_start", 0) > 0:
-            sl = retracement["impulse_start"]
-        # TP at the prior pivot low (or beyond)
-        if retracement.get("impulse_end", 0) > 0:
-            tp = retracement["impulse_end"]
+    # BUY: SL below the pullback low, TP at the prior pivot high (or beyond).
+    # SELL: SL above the pullback high, TP at the prior pivot low.
+    impulse_start = retracement.get("impulse_start", 0)
+    impulse_end = retracement.get("impulse_end", 0)
+    sl = impulse_start if impulse_start > 0 else 0.0
+    tp = impulse_end if impulse_end > 0 else 0.0
 
     return {
         "type": setup_type,
@@ -1201,8 +1671,8 @@ def detect_pristine_setup(
         "entry_price": current_price,
         "stop_loss": sl,
         "take_profit": tp,
-        "criteria_met": criteria_met,
-        "criteria_missed": criteria_missed,
+        "criteria_met": [fmt.format(*args) for fmt, *args in criteria_met],
+        "criteria_missed": [fmt.format(*args) for fmt, *args in criteria_missed],
         "met_count": met_count,
         "total_criteria": total,
     }
@@ -1214,7 +1684,7 @@ def detect_pristine_setup(
 
 def detect_breakout_bar_failure(
     df: pd.DataFrame,
-    sr_levels: list[dict],
+    sr_levels: SRLevels | list[dict],
 ) -> list[dict]:
     """
     Detect Breakout Bar Failure (BBF) — Ch. 13.
@@ -1234,53 +1704,51 @@ def detect_breakout_bar_failure(
     if df is None or len(df) < 5 or not sr_levels:
         return results
 
-    # Check last 3 bars for BBF
-    for offset in range(1, min(4, len(df))):
-        bar = df.iloc[-offset]
-        bar_h = bar["high"]
-        bar_l = bar["low"]
-        bar_c = bar["close"]
-        bar_o = bar["open"]
-
-        candle = classify_candle(df, idx=-offset)
-
-        for level in sr_levels[:10]:  # check strongest 10 levels
-            lvl_price = level.get("price", 0)
-            kind = level.get("kind", "")
-
-            # ── Bearish BBF: broke above resistance but closed below ─────
-            if kind in ("R", "SR") and bar_h > lvl_price and bar_c < lvl_price:
-                strength = 0.85
-                if candle["type"] == "WRB":
-                    strength = 0.95
-                if level.get("touches", 0) >= 3:
-                    strength = min(strength + 0.05, 1.0)
-
-                results.append({
-                    "type": "BBF",
-                    "bias": -1,  # bearish — fade the failed breakout
-                    "level": lvl_price,
-                    "strength": strength,
-                    "bar_offset": offset,
-                    "name": f"BBF at resistance {lvl_price:.5f}",
-                })
-
-            # ── Bullish BBF: broke below support but closed above ────────
-            elif kind in ("S", "SR") and bar_l < lvl_price and bar_c > lvl_price:
-                strength = 0.85
-                if candle["type"] == "WRB":
-                    strength = 0.95
-                if level.get("touches", 0) >= 3:
-                    strength = min(strength + 0.05, 1.0)
-
-                results.append({
-                    "type": "BBF",
-                    "bias": 1,  # bullish — fade the failed breakdown
-                    "level": lvl_price,
-                    "strength": strength,
-                    "bar_offset": offset,
-                    "name": f"BBF at support {lvl_price:.5f}",
-                })
+    # Last 3 bars (offset 1 = newest) against the strongest 10 levels
+    n_bars = min(4, len(df)) - 1
+    _, h, l, c, _ = _as_arrays(df)
+    bar_h = h[::-1][:n_bars, None]
+    bar_l = l[::-1][:n_bars, None]
+    bar_c = c[::-1][:n_bars, None]
+    if len(df) >= 12:
+        is_wrb = _candle_columns(df)[0][::-1][:n_bars] == "WRB"
+    else:
+        is_wrb = np.zeros(n_bars, dtype=bool)  # classify_candle's default
+
+    levels = _as_sr_levels(sr_levels, 10)  # check strongest 10 levels
+    lvl_prices = levels.prices
+    is_res = levels.is_resistance
+    is_sup = levels.is_support
+
+    # ── Bearish BBF: broke above resistance but closed below ─────────────
+    bearish = is_res & (bar_h > lvl_prices) & (bar_c < lvl_prices)
+    # ── Bullish BBF: broke below support but closed above ────────────────
+    bullish = ~bearish & is_sup & (bar_l < lvl_prices) & (bar_c > lvl_prices)
+
+    # One signal per bar and side: the strongest (first) level that failed
+    rows = np.arange(n_bars)
+    first = np.zeros_like(bearish)
+    first[rows, bearish.argmax(axis=1)] = bearish.any(axis=1)
+    first[rows, bullish.argmax(axis=1)] |= bullish.any(axis=1)
+
+    for row, col in zip(*np.nonzero(first)):
+        lvl_price = float(lvl_prices[col])
+        strength = 0.95 if is_wrb[row] else 0.85
+        if levels.touches[col] >= 3:
+            strength += 0.05  # ≤ 1.0: base strength tops out at 0.95
+
+        if bearish[row, col]:
+            bias, name = -1, f"BBF at resistance {lvl_price:.5f}"  # fade the failed breakout
+        else:
+            bias, name = 1, f"BBF at support {lvl_price:.5f}"      # fade the failed breakdown
+        results.append({
+            "type": "BBF",
+            "bias": bias,
+            "level": lvl_price,
+            "strength": strength,
+            "bar_offset": int(row) + 1,
+            "name": name,
+        })
 
     return results
 
@@ -1289,6 +1757,75 @@ def detect_breakout_bar_failure(
 #  10. PRICE VOIDS  (Chapter 3)
 # ═════════════════════════════════════════════════════════════════════════════
 
+@njit(cache=True)
+def _find_voids_core(highs, lows, opens, closes, atr, min_void_atr):
+    """
+    find_price_voids() numeric core: one pass over bars 2 … n-2.
+
+    Returns trimmed parallel arrays (bar idx, void_high, void_low,
+    direction, size in ATR).  No fastmath: NaN ATR must stay detectable.
+    """
+    n = len(highs)
+    out_idx = np.empty(n, np.int64)
+    out_vh = np.empty(n, np.float64)
+    out_vl = np.empty(n, np.float64)
+    out_dir = np.empty(n, np.int8)
+    out_size = np.empty(n, np.float64)
+    k = 0
+    for i in range(2, n - 1):
+        atr_val = atr[i]
+        if np.isnan(atr_val) or atr_val == 0:
+            continue
+        body = abs(closes[i] - opens[i])
+        bar_range = highs[i] - lows[i]
+        if not bar_range >= min_void_atr * atr_val:
+            continue
+        if not body >= bar_range * 0.6:
+            continue
+        if closes[i] > opens[i]:
+            vh, vl, d = lows[i], highs[i - 1], 1
+        else:
+            vh, vl, d = lows[i - 1], highs[i], -1
+        if vh > vl:
+            out_idx[k] = i
+            out_vh[k] = vh
+            out_vl[k] = vl
+            out_dir[k] = d
+            out_size[k] = (vh - vl) / atr_val
+            k += 1
+    return out_idx[:k], out_vh[:k], out_vl[:k], out_dir[:k], out_size[:k]
+
+
+@dataclass
+class PriceVoids:
+    """Price voids as parallel arrays (structure-of-arrays), chronological."""
+    idx: np.ndarray          # int64 position of the void-creating bar
+    void_high: np.ndarray    # float64
+    void_low: np.ndarray     # float64
+    direction: np.ndarray    # int8 — +1 bullish void, -1 bearish
+    size_atr: np.ndarray     # float64, unrounded
+    time: pd.Index | None = None
+
+    def __len__(self) -> int:
+        return len(self.idx)
+
+    @classmethod
+    def empty(cls) -> PriceVoids:
+        return cls(np.empty(0, np.int64), np.empty(0), np.empty(0),
+                   np.empty(0, np.int8), np.empty(0))
+
+    def to_dicts(self) -> list[dict]:
+        times = self.time if self.time is not None else [None] * len(self)
+        return [
+            {"void_high": vh, "void_low": vl, "direction": d, "time": t,
+             "size_atr": round(size, 2)}
+            for vh, vl, d, t, size in zip(
+                self.void_high.tolist(), self.void_low.tolist(),
+                self.direction.tolist(), times, self.size_atr,
+            )
+        ]
+
+
 def find_price_voids(
     df: pd.DataFrame,
     min_void_atr: float = 2.0,
@@ -1305,80 +1842,163 @@ def find_price_voids(
       - If price enters a void, it will likely traverse it quickly
       - Voids above = less resistance; voids below = less support
     """
-    results = []
-    if df is None or len(df) < 20 or "atr" not in df.columns:
-        return results
+    return find_price_void_arrays(df, min_void_atr).to_dicts()
 
-    atr = df["atr"].values
-    highs = df["high"].values
-    lows = df["low"].values
-    closes = df["close"].values
-    opens = df["open"].values
 
-    for i in range(2, len(df) - 1):
-        atr_val = atr[i]
-        if np.isnan(atr_val) or atr_val == 0:
-            continue
+def find_price_void_arrays(
+    df: pd.DataFrame,
+    min_void_atr: float = 2.0,
+) -> PriceVoids:
+    """find_price_voids() as a PriceVoids structure-of-arrays (no per-void dicts)."""
+    if df is None or len(df) < 20 or "atr" not in df.columns:
+        return PriceVoids.empty()
+
+    atr = df["atr"].to_numpy(dtype=np.float64)
+    opens, highs, lows, closes, _ = _as_arrays(df)
+
+    if HAVE_NUMBA:
+        idx, void_high, void_low, dirn, size_atr = _find_voids_core(
+            highs, lows, opens, closes, atr, float(min_void_atr))
+        return PriceVoids(idx, void_high, void_low, dirn, size_atr, df.index[idx])
+
+    # Candidate bars 2 … n-2, each against its prior bar
+    cur = slice(2, len(df) - 1)
+    prev = slice(1, len(df) - 2)
+    atr_c = atr[cur]
+    body = np.abs(closes[cur] - opens[cur])
+    bar_range = highs[cur] - lows[cur]
+    bullish = closes[cur] > opens[cur]
+
+    # A void-creating bar: big body, moves through a range with no overlap
+    strong = (
+        ~np.isnan(atr_c) & (atr_c != 0)
+        & (bar_range >= min_void_atr * atr_c)
+        & (body >= bar_range * 0.6)  # strong body required
+    )
 
-        body = abs(closes[i] - opens[i])
-        bar_range = highs[i] - lows[i]
+    # Bullish: void between prior bar's high and this bar's low.
+    # Bearish: void between this bar's high and prior bar's low.
+    void_high = np.where(bullish, lows[cur], lows[prev])
+    void_low = np.where(bullish, highs[prev], highs[cur])
+    hits = np.flatnonzero(strong & (void_high > void_low))
+
+    return PriceVoids(
+        idx=hits + 2,
+        void_high=void_high[hits],
+        void_low=void_low[hits],
+        direction=np.where(bullish[hits], 1, -1).astype(np.int8),
+        size_atr=(void_high[hits] - void_low[hits]) / atr_c[hits],
+        time=df.index[hits + 2],
+    )
 
-        # A void-creating bar: big body, moves through a range with no overlap
-        if bar_range < min_void_atr * atr_val:
-            continue
-        if body < bar_range * 0.6:  # strong body required
-            continue
 
-        bullish = closes[i] > opens[i]
-
-        # Check for gap / no-overlap with prior bar
-        if bullish:
-            # Void between prior bar's high and this bar's low (or open)
-            void_low = highs[i - 1]
-            void_high = lows[i]  # might overlap
-            if void_high > void_low:
-                results.append({
-                    "void_high": float(void_high),
-                    "void_low": float(void_low),
-                    "direction": 1,
-                    "time": df.index[i],
-                    "size_atr": round((void_high - void_low) / atr_val, 2),
-                })
-        else:
-            void_high = lows[i - 1]
-            void_low = highs[i]
-            if void_high > void_low:
-                results.append({
-                    "void_high": float(void_high),
-                    "void_low": float(void_low),
-                    "direction": -1,
-                    "time": df.index[i],
-                    "size_atr": round((void_high - void_low) / atr_val, 2),
-                })
+# ═════════════════════════════════════════════════════════════════════════════
+#  SHARED INDICATORS
+# ═════════════════════════════════════════════════════════════════════════════
 
-    return results
+@dataclass(frozen=True)
+class IndicatorBundle:
+    """
+    Per-frame MAs, ATR and bar directions shared across the analysis
+    stages (stage, retracement, volume, bar-by-bar).
+
+    Computed once per frame by compute_indicators() and passed down as
+    ``ind=`` so one poll does not rebuild the same arrays in every stage.
+    """
+    ema20: np.ndarray | None
+    ema40: np.ndarray | None
+    sma200: np.ndarray | None
+    atr: float
+    body_dir: np.ndarray         # int8: +1 close > open, else -1
+    close_chg_dir: np.ndarray    # int8: +1 close > prev close, else -1 (bar 0 = 0)
+    roll3_range: np.ndarray      # mean (high - low) of bars i-2 … i (NaN for i < 2)
+
+
+def compute_indicators(df: pd.DataFrame) -> IndicatorBundle:
+    """Build (or fetch the cached) IndicatorBundle for *df*."""
+    if df is not None and len(df):
+        cached = _IND_CACHE.get(df)
+        if cached is not MISSING:
+            return cached
+    if df is not None and len(df):
+        opn, high, low, close, _ = _as_arrays(df)
+        body_dir = np.where(close > opn, 1, -1).astype(np.int8)
+        close_chg_dir = np.zeros(len(close), dtype=np.int8)
+        close_chg_dir[1:] = np.where(close[1:] > close[:-1], 1, -1)
+        # Same summation order as np.mean over a 3-bar slice
+        rng = high - low
+        roll3_range = np.full(len(rng), np.nan)
+        roll3_range[2:] = (rng[:-2] + rng[1:-1] + rng[2:]) / 3
+    else:
+        body_dir = close_chg_dir = np.empty(0, dtype=np.int8)
+        roll3_range = np.empty(0)
+    ind = IndicatorBundle(
+        ema20=_safe_ema(df, 20),
+        ema40=_safe_ema(df, 40),
+        sma200=_safe_sma(df, 200) if df is not None and len(df) >= 200 else None,
+        atr=_estimate_atr(df),
+        body_dir=body_dir,
+        close_chg_dir=close_chg_dir,
+        roll3_range=roll3_range,
+    )
+    if df is not None and len(df):
+        _IND_CACHE.put(df, ind)
+    return ind
 
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  HELPER FUNCTIONS
 # ═════════════════════════════════════════════════════════════════════════════
 
+def _as_arrays(df: pd.DataFrame) -> tuple[np.ndarray, ...]:
+    """
+    (open, high, low, close, volume) as read-only NumPy arrays, once per frame.
+
+    OHLC are float64 (zero-copy for float64 columns); volume keeps its
+    dtype and is None when the frame has no "volume" column.
+    """
+    cached = _ARRAY_CACHE.get(df)
+    if cached is not MISSING:
+        return cached
+    arrays = [df[col].to_numpy(dtype=np.float64, copy=False).view()
+              for col in ("open", "high", "low", "close")]
+    if "volume" in df.columns:
+        arrays.append(df["volume"].to_numpy(copy=False).view())
+    for a in arrays:
+        a.flags.writeable = False  # views shared between callers; df unaffected
+    if len(arrays) == 4:
+        arrays.append(None)
+    return _ARRAY_CACHE.put(df, tuple(arrays))
+
+
 def _safe_ema(df: pd.DataFrame, period: int) -> np.ndarray | None:
     """Compute EMA from close prices, return as numpy array or None."""
     if df is None or len(df) < period:
         return None
     col_name = f"_pristine_ema_{period}"
-    if col_name not in df.columns:
-        vals = df["close"].ewm(span=period, adjust=False).mean().values
-        return vals
-    return df[col_name].values
+    if col_name in df.columns:
+        return df[col_name].to_numpy()
+    cached = _MA_CACHE.get(df, "ema", period)
+    if cached is not MISSING:
+        return cached
+    vals = df["close"].ewm(span=period, adjust=False).mean().to_numpy()
+    vals.flags.writeable = False  # shared between callers
+    return _MA_CACHE.put(df, vals, "ema", period)
 
 
 def _safe_sma(df: pd.DataFrame, period: int) -> np.ndarray | None:
     """Compute SMA from close prices, return as numpy array or None."""
     if df is None or len(df) < period:
         return None
-    return df["close"].rolling(window=period).mean().values
+    col_name = f"_pristine_sma_{period}"
+    if col_name in df.columns:
+        return df[col_name].to_numpy()
+    cached = _MA_CACHE.get(df, "sma", period)
+    if cached is not MISSING:
+        return cached
+    vals = df["close"].rolling(window=period).mean().to_numpy()
+    vals.flags.writeable = False  # shared between callers
+    return _MA_CACHE.put(df, vals, "sma", period)
 
 
 def _estimate_atr(df: pd.DataFrame, period: int = 14) -> float:
@@ -1388,5 +2008,6 @@ def _estimate_atr(df: pd.DataFrame, period: int = 14) -> float:
     if "atr" in df.columns:
         val = df["atr"].iloc[-1]
         return val if not np.isnan(val) else 0.0
-    ranges = df["high"].values[-period:] - df["low"].values[-period:]
+    _, highs, lows, _, _ = _as_arrays(df)
+    ranges = highs[-period:] - lows[-period:]
     return float(np.mean(ranges))
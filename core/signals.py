@@ -11,10 +11,15 @@
 
 from __future__ import annotations
 
+import time
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
+import numpy as np
+
 import config as cfg
 from core.confluence import SymbolAnalysis
 from core.pristine import detect_pristine_setup, classify_candle
@@ -22,10 +27,17 @@ from utils.logger import get_logger
 
 log = get_logger("signals")
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 
-@dataclass
+@dataclass(slots=True)
 class TradeSignal:
-    """A validated, ready-to-execute trade signal."""
+    """
+    A validated, ready-to-execute trade signal.
+
+    Slotted: no per-instance __dict__.  Not frozen — main.py scales
+    risk_factor and appends chart-analysis notes to rationale.
+    """
     symbol: str
     direction: str              # "BUY" or "SELL"
     entry_price: float
@@ -43,11 +55,16 @@ class TradeSignal:
     trigger_level: float = 0.0
     expiry_bar: int = 0
     rationale: list[str] = field(default_factory=list)
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp_ns: int = field(default_factory=time.time_ns)   # creation time, ns since epoch
     pristine_setup: str = ""    # "PBS A+", "PSS A", etc. or empty
     review_band: bool = False   # True if admitted via review-band re-evaluation
     risk_factor: float = 1.0   # tier-based risk scaling (0.5-1.0), further reduced by chart analysis
 
+    @property
+    def timestamp(self) -> datetime:
+        """Creation time (UTC), built on demand from timestamp_ns."""
+        return _EPOCH + timedelta(microseconds=self.timestamp_ns // 1000)
+
     @property
     def risk_pips(self) -> float:
         return abs(self.entry_price - self.stop_loss)
@@ -82,6 +99,24 @@ class TradeSignal:
         }
 
 
+# Piecewise-linear segments of confidence_to_win_probability(): segment i covers
+# [_WP_BREAKS[i-1], _WP_BREAKS[i]) and is base + (confidence - anchor) * slope.
+#   < 55   : flat 0.45
+#   55–65  : deep review (structural override), 0.48 → 0.50.  Conservative —
+#            Kelly sizes these ~30-40% smaller than auto-accept trades.
+#   65–75  : standard review, 0.50 → 0.54 (stays below auto-accept)
+#   75–95  : auto-accept ramps, 0.55 → 0.70
+#   95+    : flat 0.70
+_WP_BREAKS = (55, 65, 75, 80, 85, 90, 95)
+_WP_ANCHOR = (0, 55, 65, 75, 80, 85, 90, 95)
+_WP_BASE = (0.45, 0.48, 0.50, 0.55, 0.58, 0.62, 0.66, 0.70)
+_WP_SLOPE = (0.0, 0.002, 0.004, 0.006, 0.008, 0.008, 0.008, 0.0)
+_WP_BREAKS_ARR = np.array(_WP_BREAKS, dtype=np.float64)
+_WP_ANCHOR_ARR = np.array(_WP_ANCHOR, dtype=np.float64)
+_WP_BASE_ARR = np.array(_WP_BASE)
+_WP_SLOPE_ARR = np.array(_WP_SLOPE)
+
+
 def confidence_to_win_probability(confidence: float) -> float:
     """
     Map confidence score (0-100) to estimated win probability.
@@ -102,25 +137,21 @@ def confidence_to_win_probability(confidence: float) -> float:
     90  → 0.66
     95+ → 0.70
     """
-    if confidence < 55:
-        return 0.45
-    if confidence < 65:
-        # Deep review (structural override): 55→0.48, 64.9→0.50
-        # Conservative — acknowledges structural quality but respects uncertainty.
-        # Kelly will size these ~30-40% smaller than auto-accept trades.
-        return 0.48 + (confidence - 55) * 0.002
-    if confidence < 75:
-        # Standard review: 65→0.50, 74.9→0.54 (linear ramp, stays below auto-accept)
-        return 0.50 + (confidence - 65) * 0.004
-    if confidence < 80:
-        return 0.55 + (confidence - 75) * 0.006
-    if confidence < 85:
-        return 0.58 + (confidence - 80) * 0.008
-    if confidence < 90:
-        return 0.62 + (confidence - 85) * 0.008
-    if confidence < 95:
-        return 0.66 + (confidence - 90) * 0.008
-    return 0.70
+    i = bisect_right(_WP_BREAKS, confidence)
+    slope = _WP_SLOPE[i]
+    if not slope:
+        return _WP_BASE[i]   # flat tails: < 55 and 95+
+    return _WP_BASE[i] + (confidence - _WP_ANCHOR[i]) * slope
+
+
+def confidence_to_win_probability_batch(confidence: np.ndarray) -> np.ndarray:
+    """confidence_to_win_probability() over an array of scores."""
+    conf = np.asarray(confidence, dtype=np.float64)
+    i = np.searchsorted(_WP_BREAKS_ARR, conf, side="right")
+    slope = _WP_SLOPE_ARR[i]
+    with np.errstate(invalid="ignore"):
+        ramp = _WP_BASE_ARR[i] + (conf - _WP_ANCHOR_ARR[i]) * slope
+    return np.where(slope != 0, ramp, _WP_BASE_ARR[i])
 
 
 def generate_signal(sa: SymbolAnalysis) -> Optional[TradeSignal]:
@@ -131,8 +162,46 @@ def generate_signal(sa: SymbolAnalysis) -> Optional[TradeSignal]:
     # ── Gate 1: Must have a direction ────────────────────────────────────
     if sa.trade_direction is None:
         return None
+    is_buy = sa.trade_direction == "BUY"
+    sign = 1 if is_buy else -1
+
+    # ── Gate 2: Spread filter ────────────────────────────────────────────
+    if sa.spread_pips > cfg.MAX_SPREAD_PIPS:
+        log.debug("%s: spread %.1f pips too wide — skip", sa.symbol, sa.spread_pips)
+        return None
+
+    # ── Gate 3: SL/TP validation & Risk/Reward ratio ────────────────────
+    if sa.entry_price == 0 or sa.stop_loss == 0 or sa.take_profit == 0:
+        return None
+
+    # Validate SL and TP are on the correct side of entry: both distances
+    # are signed so that a positive value means the correct side.
+    risk = (sa.entry_price - sa.stop_loss) * sign
+    reward = (sa.take_profit - sa.entry_price) * sign
+    if risk <= 0:
+        log.debug("%s: %s SL (%s) %s entry (%s) — invalid",
+                  sa.symbol, sa.trade_direction, sa.stop_loss,
+                  ">=" if is_buy else "<=", sa.entry_price)
+        return None
+    if reward <= 0:
+        log.debug("%s: %s TP (%s) %s entry (%s) — invalid",
+                  sa.symbol, sa.trade_direction, sa.take_profit,
+                  "<=" if is_buy else ">=", sa.entry_price)
+        return None
+
+    rr_ratio = reward / risk
+    if rr_ratio < cfg.MIN_RISK_REWARD_RATIO:
+        log.debug("%s: R:R %.2f < %s — skip",
+                  sa.symbol, rr_ratio, cfg.MIN_RISK_REWARD_RATIO)
+        return None
 
-    # ── Gate 2: Confidence threshold with review-band re-evaluation ────
+    # ── Gate 4: ATR sanity ───────────────────────────────────────────────
+    if sa.atr <= 0:
+        return None
+
+    # ── Gate 5: Confidence threshold with review-band re-evaluation ────
+    # Runs after the O(1) numeric gates so the review-band re-evaluation
+    # only sees candidates that could actually become signals.
     # FIXED: Do NOT recompute here.  analyze_symbol() already computed
     # the score with full DataFrames.  By now tfa.df has been freed
     # (set to None), so recomputing would skip trend-exhaustion penalties
@@ -149,63 +218,22 @@ def generate_signal(sa: SymbolAnalysis) -> Optional[TradeSignal]:
         if approved:
             review_band_approved = True
             log.info(
-                f"{sa.symbol}: REVIEW BAND APPROVED — score {score:.1f} "
-                f"(below {cfg.CONFIDENCE_THRESHOLD}, above {cfg.CONFIDENCE_REVIEW_BAND}) "
-                f"│ {reason}"
+                "%s: REVIEW BAND APPROVED — score %.1f (below %s, above %s) │ %s",
+                sa.symbol, score, cfg.CONFIDENCE_THRESHOLD,
+                cfg.CONFIDENCE_REVIEW_BAND, reason,
             )
         else:
-            log.debug(
-                f"{sa.symbol}: review band REJECTED — score {score:.1f} │ {reason}"
-            )
+            log.debug("%s: review band REJECTED — score %.1f │ %s",
+                      sa.symbol, score, reason)
             return None
     else:
-        log.debug(
-            f"{sa.symbol}: confidence {score:.1f} < {cfg.CONFIDENCE_REVIEW_BAND} — skip"
-        )
-        return None
-
-    # ── Gate 3: Spread filter ────────────────────────────────────────────
-    if sa.spread_pips > cfg.MAX_SPREAD_PIPS:
-        log.debug(f"{sa.symbol}: spread {sa.spread_pips:.1f} pips too wide — skip")
-        return None
-
-    # ── Gate 4: SL/TP validation & Risk/Reward ratio ────────────────────
-    if sa.entry_price == 0 or sa.stop_loss == 0 or sa.take_profit == 0:
-        return None
-
-    # Validate SL and TP are on the correct side of entry
-    if sa.trade_direction == "BUY":
-        if sa.stop_loss >= sa.entry_price:
-            log.debug(f"{sa.symbol}: BUY SL ({sa.stop_loss}) >= entry ({sa.entry_price}) — invalid")
-            return None
-        if sa.take_profit <= sa.entry_price:
-            log.debug(f"{sa.symbol}: BUY TP ({sa.take_profit}) <= entry ({sa.entry_price}) — invalid")
-            return None
-    else:  # SELL
-        if sa.stop_loss <= sa.entry_price:
-            log.debug(f"{sa.symbol}: SELL SL ({sa.stop_loss}) <= entry ({sa.entry_price}) — invalid")
-            return None
-        if sa.take_profit >= sa.entry_price:
-            log.debug(f"{sa.symbol}: SELL TP ({sa.take_profit}) >= entry ({sa.entry_price}) — invalid")
-            return None
-
-    risk = sa.entry_price - sa.stop_loss if sa.trade_direction == "BUY" else sa.stop_loss - sa.entry_price
-    reward = sa.take_profit - sa.entry_price if sa.trade_direction == "BUY" else sa.entry_price - sa.take_profit
-    if risk <= 0 or reward <= 0:
-        return None
-
-    rr_ratio = reward / risk
-    if rr_ratio < cfg.MIN_RISK_REWARD_RATIO:
-        log.debug(f"{sa.symbol}: R:R {rr_ratio:.2f} < {cfg.MIN_RISK_REWARD_RATIO} — skip")
-        return None
-
-    # ── Gate 5: ATR sanity ───────────────────────────────────────────────
-    if sa.atr <= 0:
+        log.debug("%s: confidence %.1f < %s — skip",
+                  sa.symbol, score, cfg.CONFIDENCE_REVIEW_BAND)
         return None
 
     # ── Detect Pristine Setup (PBS/PSS) ──────────────────────────────────
     pristine_label = ""
-    pbs_result = _detect_pbs_pss(sa)
+    pbs_result = _detect_pbs_pss(sa, sign)
     if pbs_result:
         pristine_label = f"{pbs_result['type']} {pbs_result['quality']}"
         sa.pristine_setup = pbs_result
@@ -240,20 +268,64 @@ def generate_signal(sa: SymbolAnalysis) -> Optional[TradeSignal]:
         risk_factor=tier_risk_factor,
     )
 
-    setup_tag = f"  [{pristine_label}]" if pristine_label else ""
-    band_tag = "  [REVIEW-BAND]" if review_band_approved else ""
     log.info(
-        f"SIGNAL: {signal.direction} {signal.symbol} "
-        f"@ {signal.entry_price:.5f}  SL={signal.stop_loss:.5f}  "
-        f"TP={signal.take_profit:.5f}  R:R={signal.risk_reward_ratio}  "
-        f"Conf={signal.confidence:.1f}  WinP={signal.win_probability:.2f}  "
-        f"RiskF={signal.risk_factor:.2f}"
-        f"{setup_tag}{band_tag}"
+        "SIGNAL: %s %s @ %.5f  SL=%.5f  TP=%.5f  R:R=%s  "
+        "Conf=%.1f  WinP=%.2f  RiskF=%.2f%s%s",
+        signal.direction, signal.symbol, signal.entry_price,
+        signal.stop_loss, signal.take_profit, signal.risk_reward_ratio,
+        signal.confidence, signal.win_probability, signal.risk_factor,
+        f"  [{pristine_label}]" if pristine_label else "",
+        "  [REVIEW-BAND]" if review_band_approved else "",
     )
 
     return signal
 
 
+def generate_signals(sas: list[SymbolAnalysis]) -> list[TradeSignal]:
+    """
+    generate_signal() over a batch of analyses.
+
+    The numeric gates (band, spread, SL/TP sides, R:R, ATR) are evaluated
+    for the whole batch as arrays first; only the survivors go through
+    generate_signal() for the review band, PBS/PSS detection and the
+    rationale.  Each mask term is the negation of the matching rejection
+    test in generate_signal(), so a NaN field never rejects here that
+    would have been accepted there.
+    """
+    cands = [sa for sa in sas if sa.trade_direction is not None]
+    if not cands:
+        return []
+    n = len(cands)
+
+    def column(attr: str) -> np.ndarray:
+        return np.fromiter((getattr(sa, attr) for sa in cands), dtype=np.float64, count=n)
+
+    entry = column("entry_price")
+    sl = column("stop_loss")
+    tp = column("take_profit")
+    sign = np.fromiter((1.0 if sa.trade_direction == "BUY" else -1.0 for sa in cands),
+                       dtype=np.float64, count=n)
+    risk = sign * (entry - sl)
+    reward = sign * (tp - entry)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rr = reward / risk
+        keep = (
+            (column("confluence_score") >= cfg.CONFIDENCE_REVIEW_BAND)
+            & ~(column("spread_pips") > cfg.MAX_SPREAD_PIPS)
+            & (entry != 0) & (sl != 0) & (tp != 0)
+            & ~(risk <= 0) & ~(reward <= 0)
+            & ~(rr < cfg.MIN_RISK_REWARD_RATIO)
+            & ~(column("atr") <= 0)
+        )
+
+    signals = []
+    for i in np.flatnonzero(keep):
+        signal = generate_signal(cands[i])
+        if signal is not None:
+            signals.append(signal)
+    return signals
+
+
 def _passes_review_band(sa: SymbolAnalysis) -> tuple[bool, str]:
     """
     Two-tier second-layer re-evaluation for trades below auto-accept.
@@ -361,22 +433,28 @@ def _passes_review_band(sa: SymbolAnalysis) -> tuple[bool, str]:
         )
 
 
-def _detect_pbs_pss(sa: SymbolAnalysis) -> dict | None:
+def _detect_pbs_pss(sa: SymbolAnalysis, direction_val: int) -> dict | None:
     """
     Attempt to detect a formal Pristine Buy Setup or Pristine Sell Setup.
     Uses the higher-TF stage, trading-TF pivots, and entry-TF conditions.
+    *direction_val* is +1 (BUY) or -1 (SELL).
     """
-    direction_val = 1 if sa.trade_direction == "BUY" else -1
 
-    # Get higher TF stage (D1 preferred)
-    stage = {}
-    for tf in ["D1", "H4"]:
-        tfa = sa.timeframes.get(tf)
-        if tfa and tfa.stage.get("confidence", 0) > stage.get("confidence", 0):
-            stage = tfa.stage
+    tfs = sa.timeframes
+
+    # Get higher TF stage: the more confident of D1/H4, D1 on ties
+    stage, best = {}, 0
+    d1 = tfs.get("D1")
+    h4 = tfs.get("H4")
+    if d1:
+        d1_conf = d1.stage.get("confidence", 0)
+        if d1_conf > best:
+            stage, best = d1.stage, d1_conf
+    if h4 and h4.stage.get("confidence", 0) > best:
+        stage = h4.stage
 
     # Get H1 pivot trend and retracement
-    h1 = sa.timeframes.get("H1")
+    h1 = tfs.get("H1")
     pivot_trend = h1.pivot_trend if h1 else {}
     retracement = h1.retracement if h1 else {}
     volume_class = h1.volume_class if h1 else {}
@@ -385,15 +463,13 @@ def _detect_pbs_pss(sa: SymbolAnalysis) -> dict | None:
     sweet_spot = sa.sweet_spot or {}
 
     # Last candle from entry TF
-    entry_tfa = sa.timeframes.get("M15") or sa.timeframes.get("H1")
+    entry_tfa = tfs.get("M15") or h1
     last_candle = {}
     if entry_tfa and entry_tfa.candle_class:
         last_candle = entry_tfa.candle_class[-1]
 
-    # S/R levels
-    sr_levels = sa.multi_tf_sr or []
-    if not sr_levels and entry_tfa:
-        sr_levels = entry_tfa.sr_levels
+    # S/R levels (read-only downstream, so the source list is passed as is)
+    sr_levels = sa.multi_tf_sr or (entry_tfa.sr_levels if entry_tfa else ())
 
     return detect_pristine_setup(
         stage=stage,
@@ -408,37 +484,55 @@ def _detect_pbs_pss(sa: SymbolAnalysis) -> dict | None:
     )
 
 
+# Higher-TF stage and H1 pivot structure change only when those bars
+# close, so their rationale lines repeat scan after scan.  Memoised on
+# the field values (typed, so 2 and 2.0 don't share a line); the analysis
+# dicts themselves are rebuilt each scan.
+
+@lru_cache(maxsize=4096, typed=True)
+def _stage_reason(tf: str, stage, description, confidence) -> str:
+    return f"{tf} Stage {stage} ({description}) [conf={confidence:.0%}]"
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _pivot_trend_reason(trend, strength, hph_count, hpl_count) -> str:
+    return (
+        f"H1 pivot trend: {trend} ({strength}) — "
+        f"HPH={hph_count} HPL={hpl_count}"
+    )
+
+
 def _build_rationale(sa: SymbolAnalysis, pbs: dict | None = None) -> list[str]:
     """Build a human-readable list of reasons for the trade."""
     reasons = []
+    add = reasons.append  # bound once; ~15 appends per signal
+    tfs = sa.timeframes
+    h1 = tfs.get("H1")
 
     # ── Pristine Method info ─────────────────────────────────────────────
     # Stage info (Ch. 1)
-    for tf in ["D1", "H4"]:
-        tfa = sa.timeframes.get(tf)
+    for tf in ("D1", "H4"):
+        tfa = tfs.get(tf)
         if tfa and tfa.stage:
             st = tfa.stage
-            reasons.append(
-                f"{tf} Stage {st.get('stage', '?')} "
-                f"({st.get('description', '?')}) "
-                f"[conf={st.get('confidence', 0):.0%}]"
-            )
+            add(_stage_reason(
+                tf, st.get("stage", "?"), st.get("description", "?"),
+                st.get("confidence", 0),
+            ))
             break
 
     # Pivot trend (Ch. 10)
-    h1 = sa.timeframes.get("H1")
     if h1 and h1.pivot_trend:
         pv = h1.pivot_trend
-        reasons.append(
-            f"H1 pivot trend: {pv.get('trend', '?')} "
-            f"({pv.get('strength', '?')}) — "
-            f"HPH={pv.get('hph_count', 0)} HPL={pv.get('hpl_count', 0)}"
-        )
+        add(_pivot_trend_reason(
+            pv.get("trend", "?"), pv.get("strength", "?"),
+            pv.get("hph_count", 0), pv.get("hpl_count", 0),
+        ))
 
     # Retracement (Ch. 6)
     if h1 and h1.retracement:
         ret = h1.retracement
-        reasons.append(
+        add(
             f"H1 retracement: {ret.get('quality', '?')} "
             f"({ret.get('retracement_pct', 0):.0%}) "
             f"{'at 20 EMA' if ret.get('near_ma20') else ''}"
@@ -447,35 +541,35 @@ def _build_rationale(sa: SymbolAnalysis, pbs: dict | None = None) -> list[str]:
     # Sweet spot (Ch. 12)
     if sa.sweet_spot:
         ss = sa.sweet_spot
-        reasons.append(
+        add(
             f"Multi-TF: {ss.get('type', '?')} "
             f"(score={ss.get('score', 0):.2f})"
         )
 
     # PBS/PSS info
     if pbs:
-        reasons.append(
+        add(
             f"Pristine Setup: {pbs['type']} {pbs['quality']} "
             f"({pbs.get('met_count', 0)}/{pbs.get('total_criteria', 7)} criteria)"
         )
         for c in pbs.get("criteria_met", [])[:3]:
-            reasons.append(f"  ✓ {c}")
+            add(f"  ✓ {c}")
         for c in pbs.get("criteria_missed", [])[:2]:
-            reasons.append(f"  ✗ {c}")
+            add(f"  ✗ {c}")
 
     # BBF signals (Ch. 13)
     if sa.bbf_signals:
         for bbf in sa.bbf_signals[:2]:
-            reasons.append(f"BBF: {bbf.get('name', '')} (strength={bbf.get('strength', 0):.2f})")
+            add(f"BBF: {bbf.get('name', '')} (strength={bbf.get('strength', 0):.2f})")
 
     # ── Legacy info ──────────────────────────────────────────────────────
-    reasons.append(f"Higher TF bias: {sa.higher_tf_bias}")
-    reasons.append(f"Trading TF bias: {sa.trading_tf_bias}")
+    add(f"Higher TF bias: {sa.higher_tf_bias}")
+    add(f"Trading TF bias: {sa.trading_tf_bias}")
 
     # Key indicators (demoted but still informative)
     if h1 and h1.indicators:
         ind = h1.indicators
-        reasons.append(
+        add(
             f"H1 indicators: RSI={ind.get('rsi', 0):.1f} "
             f"ADX={ind.get('adx', 0):.1f} "
             f"ATR={ind.get('atr', 0):.5f}"
@@ -484,18 +578,18 @@ def _build_rationale(sa: SymbolAnalysis, pbs: dict | None = None) -> list[str]:
     # Volume classification (Ch. 5)
     if h1 and h1.volume_class:
         vc = h1.volume_class
-        reasons.append(
+        add(
             f"Volume: type={vc.get('current_vol_type', '?')} "
             f"pullback={vc.get('pullback_vol_trend', '?')} "
             f"confirms={'yes' if vc.get('vol_confirms_trend') else 'no'}"
         )
 
     # Patterns
-    for tf in ["M15", "H1"]:
-        tfa = sa.timeframes.get(tf)
+    for tf in ("M15", "H1"):
+        tfa = tfs.get(tf)
         if tfa and tfa.candle_patterns:
             names = [p["name"] for p in tfa.candle_patterns if p["bias"] != 0]
             if names:
-                reasons.append(f"{tf} patterns: {', '.join(names)}")
+                add(f"{tf} patterns: {', '.join(names)}")
 
     return reasons
@@ -17,11 +17,25 @@ import numpy as np
 import pandas as pd
 
 import config as cfg
-from core.patterns import find_swing_points
+from core.patterns import swing_positions
+from utils.frame_cache import MISSING, FrameCache
 from utils.logger import get_logger
 
 log = get_logger("smart_money")
 
+_SMC_CACHE = FrameCache(maxsize=32)
+
+
+def _bar_arrays(df: pd.DataFrame) -> tuple:
+    """(open, high, low, close, atr) column arrays; atr is None without one."""
+    atrs = df["atr"].values if "atr" in df.columns else None
+    return df["open"].values, df["high"].values, df["low"].values, df["close"].values, atrs
+
+
+def _swings(bars: tuple) -> tuple[list[int], list[int]]:
+    """Swing high / low bar positions at cfg.SWING_LOOKBACK."""
+    return swing_positions(bars[1], bars[2], cfg.SWING_LOOKBACK)
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  ORDER BLOCKS
@@ -37,68 +51,55 @@ def find_order_blocks(df: pd.DataFrame, lookback: int | None = None) -> list[dic
     These zones act as institutional entry areas where smart money placed
     large orders, creating an imbalance.
     """
+    if df is None:
+        return []
+    return _order_blocks(_bar_arrays(df), df.index, lookback)
+
+
+def _order_blocks(bars: tuple, index: pd.Index, lookback: int | None = None) -> list[dict]:
     lookback = lookback or cfg.ORDER_BLOCK_LOOKBACK
-    if df is None or len(df) < 10 or "atr" not in df.columns:
+    opens, highs, lows, closes, atrs = bars
+    if len(closes) < 10 or atrs is None:
         return []
 
-    blocks = []
-    closes = df["close"].values
-    opens = df["open"].values
-    highs = df["high"].values
-    lows = df["low"].values
-    atrs = df["atr"].values
-
-    start = max(3, len(df) - lookback)
-
-    for i in range(start, len(df) - 1):
-        atr_val = atrs[i]
-        if np.isnan(atr_val) or atr_val == 0:
-            continue
-
-        # Check if bar i+1 is an impulsive move (> 1.5x ATR body)
-        next_body = abs(closes[i + 1] - opens[i + 1])
-        if next_body < 1.5 * atr_val:
-            continue
-
-        is_bullish_impulse = closes[i + 1] > opens[i + 1]
-        is_bearish_candle = closes[i] < opens[i]
-        is_bullish_candle = closes[i] > opens[i]
-
-        # Bullish OB: bearish candle → bullish impulse
-        if is_bearish_candle and is_bullish_impulse:
-            blocks.append({
-                "type": "bullish_ob",
-                "bias": 1,
-                "ob_high": highs[i],
-                "ob_low": lows[i],
-                "time": df.index[i],
-                "strength": round(next_body / atr_val, 2),
-                "mitigated": False,
-            })
+    start = max(3, len(closes) - lookback)
+    end = len(closes) - 1
+    if start >= end:
+        return []
 
-        # Bearish OB: bullish candle → bearish impulse
-        if is_bullish_candle and not is_bullish_impulse:
-            blocks.append({
-                "type": "bearish_ob",
-                "bias": -1,
-                "ob_high": highs[i],
-                "ob_low": lows[i],
-                "time": df.index[i],
-                "strength": round(next_body / atr_val, 2),
-                "mitigated": False,
-            })
+    # Candidate bar i (start..end-1) against impulse bar i+1, as masks
+    atr_i = atrs[start:end]
+    next_body = np.abs(closes[start + 1:] - opens[start + 1:])
+    # "not <" keeps NaN bodies, as the scalar skip test did
+    impulse = ~(np.isnan(atr_i) | (atr_i == 0)) & ~(next_body < 1.5 * atr_i)
+    bull_impulse = closes[start + 1:] > opens[start + 1:]
+    candle_c = closes[start:end]
+    candle_o = opens[start:end]
 
-    # Mark mitigated OBs (price has already returned to the OB)
+    # Only fresh blocks survive: price must not have returned through them
     current_price = closes[-1]
-    for ob in blocks:
-        if ob["bias"] == 1 and current_price < ob["ob_low"]:
-            ob["mitigated"] = True
-        if ob["bias"] == -1 and current_price > ob["ob_high"]:
-            ob["mitigated"] = True
-
-    # Filter to unmitigated only (fresh)
-    fresh = [ob for ob in blocks if not ob["mitigated"]]
-    return fresh
+    bull_ob = (impulse & (candle_c < candle_o) & bull_impulse
+               & ~(current_price < lows[start:end]))
+    bear_ob = (impulse & (candle_c > candle_o) & ~bull_impulse
+               & ~(current_price > highs[start:end]))
+
+    # Bullish OB: last bearish candle → bullish impulse
+    # Bearish OB: last bullish candle → bearish impulse
+    # (a candle is never both, so one block per surviving bar, in bar order)
+    blocks = []
+    for k in np.flatnonzero(bull_ob | bear_ob):
+        i = start + k
+        bias = 1 if bull_ob[k] else -1
+        blocks.append({
+            "type": "bullish_ob" if bias == 1 else "bearish_ob",
+            "bias": bias,
+            "ob_high": highs[i],
+            "ob_low": lows[i],
+            "time": index[i],
+            "strength": round(next_body[k] / atr_i[k], 2),
+            "mitigated": False,
+        })
+    return blocks
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -115,68 +116,63 @@ def find_fair_value_gaps(df: pd.DataFrame) -> list[dict]:
 
     These gaps tend to get filled — price is "attracted" to them.
     """
-    if df is None or len(df) < 10 or "atr" not in df.columns:
+    if df is None:
         return []
+    return _fair_value_gaps(_bar_arrays(df), df.index)
 
-    gaps = []
-    highs = df["high"].values
-    lows = df["low"].values
-    atrs = df["atr"].values
 
-    lookback_start = max(2, len(df) - cfg.ORDER_BLOCK_LOOKBACK)
+def _fair_value_gaps(bars: tuple, index: pd.Index) -> list[dict]:
+    _, highs, lows, closes, atrs = bars
+    if len(closes) < 10 or atrs is None:
+        return []
 
-    for i in range(lookback_start, len(df) - 2):
-        atr_val = atrs[i + 1]
-        if np.isnan(atr_val) or atr_val == 0:
-            continue
+    start = max(2, len(closes) - cfg.ORDER_BLOCK_LOOKBACK)
+    end = len(closes) - 2
+    if start >= end:
+        return []
 
-        c1_high = highs[i]
-        c3_low = lows[i + 2]
+    # Candle 1 = bar i, candle 2 = bar i+1 (ATR reference), candle 3 = bar i+2
+    c1_high, c1_low = highs[start:end], lows[start:end]
+    c3_high, c3_low = highs[start + 2:], lows[start + 2:]
+    atr_2 = atrs[start + 1:end + 1]
+    valid = ~(np.isnan(atr_2) | (atr_2 == 0))
+    min_gap = cfg.FVG_MIN_GAP_ATR_MULT * atr_2
+    bull_gap = c3_low - c1_high
+    bear_gap = c1_low - c3_high
 
-        # Bullish FVG: gap between candle 1 high and candle 3 low
-        if c3_low > c1_high:
-            gap_size = c3_low - c1_high
-            if gap_size >= cfg.FVG_MIN_GAP_ATR_MULT * atr_val:
-                gaps.append({
-                    "type": "bullish_fvg",
-                    "bias": 1,
-                    "gap_high": c3_low,
-                    "gap_low": c1_high,
-                    "time": df.index[i + 1],
-                    "size_atr": round(gap_size / atr_val, 2),
-                    "filled": False,
-                })
-
-        c1_low = lows[i]
-        c3_high = highs[i + 2]
+    # Only unfilled gaps survive: price must not have come back into them
+    current_price = closes[-1]
+    bull_fvg = (valid & (c3_low > c1_high) & (bull_gap >= min_gap)
+                & ~(current_price <= c3_low))
+    bear_fvg = (valid & (c1_low > c3_high) & (bear_gap >= min_gap)
+                & ~(current_price >= c3_high))
 
+    gaps = []
+    for k in np.flatnonzero(bull_fvg | bear_fvg):
+        t = index[start + k + 1]
+        # Bullish FVG: gap between candle 1 high and candle 3 low
+        if bull_fvg[k]:
+            gaps.append({
+                "type": "bullish_fvg",
+                "bias": 1,
+                "gap_high": c3_low[k],
+                "gap_low": c1_high[k],
+                "time": t,
+                "size_atr": round(bull_gap[k] / atr_2[k], 2),
+                "filled": False,
+            })
         # Bearish FVG: gap between candle 1 low and candle 3 high
-        if c1_low > c3_high:
-            gap_size = c1_low - c3_high
-            if gap_size >= cfg.FVG_MIN_GAP_ATR_MULT * atr_val:
-                gaps.append({
-                    "type": "bearish_fvg",
-                    "bias": -1,
-                    "gap_high": c1_low,
-                    "gap_low": c3_high,
-                    "time": df.index[i + 1],
-                    "size_atr": round(gap_size / atr_val, 2),
-                    "filled": False,
-                })
-
-    # Check if gaps have been filled
-    current_price = df["close"].values[-1]
-    for gap in gaps:
-        if gap["bias"] == 1:
-            # Bullish FVG filled if price has come down into the gap
-            if current_price <= gap["gap_high"]:
-                gap["filled"] = True
-        else:
-            # Bearish FVG filled if price has risen into the gap
-            if current_price >= gap["gap_low"]:
-                gap["filled"] = True
-
-    return [g for g in gaps if not g["filled"]]
+        if bear_fvg[k]:
+            gaps.append({
+                "type": "bearish_fvg",
+                "bias": -1,
+                "gap_high": c1_low[k],
+                "gap_low": c3_high[k],
+                "time": t,
+                "size_atr": round(bear_gap[k] / atr_2[k], 2),
+                "filled": False,
+            })
+    return gaps
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -191,47 +187,69 @@ def find_liquidity_sweeps(df: pd.DataFrame, lookback: int | None = None) -> list
     This is the "trapped traders" concept from the book — traders enter on
     what looks like a breakout, but get trapped as price reverses.
     """
+    if df is None:
+        return []
+    bars = _bar_arrays(df)
+    return _liquidity_sweeps(bars, df.index, _swings(bars), lookback)
+
+
+def _liquidity_sweeps(
+    bars: tuple,
+    index: pd.Index,
+    swings: tuple[list[int], list[int]],
+    lookback: int | None = None,
+) -> list[dict]:
     lookback = lookback or cfg.LIQUIDITY_SWEEP_LOOKBACK
-    if df is None or len(df) < lookback + 5:
+    _, highs, lows, closes, _ = bars
+    if len(closes) < lookback + 5:
         return []
 
-    swing_highs, swing_lows = find_swing_points(df.iloc[:-3], lookback=cfg.SWING_LOOKBACK)
+    # Swings of the frame minus its last 3 bars are a prefix of the full
+    # frame's swings (see patterns.swing_positions); keep the last 5
+    cutoff = len(closes) - 3 - cfg.SWING_LOOKBACK
+    high_pos = np.asarray(swings[0], dtype=np.intp)
+    low_pos = np.asarray(swings[1], dtype=np.intp)
+    k_high = np.searchsorted(high_pos, cutoff)
+    k_low = np.searchsorted(low_pos, cutoff)
     sweeps = []
 
-    last_3 = df.iloc[-3:]
-    current = df.iloc[-1]
-
-    # Check if recent candles swept a swing high then reversed
-    for t, sh in swing_highs[-5:]:
-        for idx in range(len(last_3)):
-            bar = last_3.iloc[idx]
-            if bar["high"] > sh and bar["close"] < sh:
-                # Wick above swing high but closed below → bearish sweep
-                sweeps.append({
-                    "type": "bearish_sweep",
-                    "bias": -1,
-                    "level_swept": sh,
-                    "sweep_high": bar["high"],
-                    "time": last_3.index[idx],
-                    "strength": 0.8,
-                })
-                break
-
-    # Check if recent candles swept a swing low then reversed
-    for t, sl in swing_lows[-5:]:
-        for idx in range(len(last_3)):
-            bar = last_3.iloc[idx]
-            if bar["low"] < sl and bar["close"] > sl:
-                # Wick below swing low but closed above → bullish sweep
-                sweeps.append({
-                    "type": "bullish_sweep",
-                    "bias": 1,
-                    "level_swept": sl,
-                    "sweep_low": bar["low"],
-                    "time": last_3.index[idx],
-                    "strength": 0.8,
-                })
-                break
+    # Last 3 bars as flat arrays; hit[i, k] = bar k swept swing i
+    h3 = highs[-3:]
+    l3 = lows[-3:]
+    c3 = closes[-3:]
+    t3 = index[-3:]
+
+    # Check if recent candles swept a swing high then reversed:
+    # wick above swing high but closed below → bearish sweep
+    recent = highs[high_pos[max(0, k_high - 5):k_high]]
+    levels = recent.astype(np.float64, copy=False)
+    hit = (h3 > levels[:, None]) & (c3 < levels[:, None])
+    for i in np.flatnonzero(hit.any(axis=1)):
+        k = hit[i].argmax()  # first sweeping bar
+        sweeps.append({
+            "type": "bearish_sweep",
+            "bias": -1,
+            "level_swept": recent[i],
+            "sweep_high": h3[k],
+            "time": t3[k],
+            "strength": 0.8,
+        })
+
+    # Check if recent candles swept a swing low then reversed:
+    # wick below swing low but closed above → bullish sweep
+    recent = lows[low_pos[max(0, k_low - 5):k_low]]
+    levels = recent.astype(np.float64, copy=False)
+    hit = (l3 < levels[:, None]) & (c3 > levels[:, None])
+    for i in np.flatnonzero(hit.any(axis=1)):
+        k = hit[i].argmax()
+        sweeps.append({
+            "type": "bullish_sweep",
+            "bias": 1,
+            "level_swept": recent[i],
+            "sweep_low": l3[k],
+            "time": t3[k],
+            "strength": 0.8,
+        })
 
     return sweeps
 
@@ -247,20 +265,29 @@ def detect_structure_breaks(df: pd.DataFrame) -> list[dict]:
     CHoCH: Price breaks a swing high/low AGAINST the trend
            (early warning of reversal).
     """
-    if df is None or len(df) < 30:
+    if df is None:
         return []
+    bars = _bar_arrays(df)
+    return _structure_breaks(bars, _swings(bars))
+
 
-    swing_highs, swing_lows = find_swing_points(df, cfg.SWING_LOOKBACK)
+def _structure_breaks(bars: tuple, swings: tuple[list[int], list[int]]) -> list[dict]:
+    _, highs, lows, closes, _ = bars
+    if len(closes) < 30:
+        return []
+
+    swing_highs = [highs[i] for i in swings[0]]
+    swing_lows = [lows[i] for i in swings[1]]
 
     if len(swing_highs) < 3 or len(swing_lows) < 3:
         return []
 
     events = []
-    current_close = df["close"].values[-1]
+    current_close = closes[-1]
 
     # Determine prevailing structure
-    recent_highs = [p for _, p in swing_highs[-3:]]
-    recent_lows = [p for _, p in swing_lows[-3:]]
+    recent_highs = swing_highs[-3:]
+    recent_lows = swing_lows[-3:]
 
     # In uptrend: HH & HL
     was_uptrend = (
@@ -278,10 +305,10 @@ def detect_structure_breaks(df: pd.DataFrame) -> list[dict]:
         and recent_lows[-1] < recent_lows[-2]
     )
 
-    last_swing_high = swing_highs[-1][1] if swing_highs else None
-    last_swing_low = swing_lows[-1][1] if swing_lows else None
-    prev_swing_low = swing_lows[-2][1] if len(swing_lows) >= 2 else None
-    prev_swing_high = swing_highs[-2][1] if len(swing_highs) >= 2 else None
+    last_swing_high = swing_highs[-1] if swing_highs else None
+    last_swing_low = swing_lows[-1] if swing_lows else None
+    prev_swing_low = swing_lows[-2] if len(swing_lows) >= 2 else None
+    prev_swing_high = swing_highs[-2] if len(swing_highs) >= 2 else None
 
     # BOS bullish: in uptrend, price breaks above last swing high
     if was_uptrend and last_swing_high and current_close > last_swing_high:
@@ -327,13 +354,27 @@ def detect_structure_breaks(df: pd.DataFrame) -> list[dict]:
 # ═════════════════════════════════════════════════════════════════════════════
 
 def analyze_smart_money(df: pd.DataFrame) -> dict:
-    """Run all smart money detections and return a summary."""
-    result = {
-        "order_blocks": find_order_blocks(df),
-        "fair_value_gaps": find_fair_value_gaps(df),
-        "liquidity_sweeps": find_liquidity_sweeps(df),
-        "structure_breaks": detect_structure_breaks(df),
-    }
+    """
+    Run all smart money detections and return a summary.
+
+    Memoised per frame: treat the returned dict as read-only.
+    """
+    if df is None:
+        result = {"order_blocks": [], "fair_value_gaps": [],
+                  "liquidity_sweeps": [], "structure_breaks": []}
+    else:
+        cached = _SMC_CACHE.get(df)
+        if cached is not MISSING:
+            return cached
+        # Column arrays and swing points are extracted once and shared
+        bars = _bar_arrays(df)
+        swings = _swings(bars)
+        result = {
+            "order_blocks": _order_blocks(bars, df.index),
+            "fair_value_gaps": _fair_value_gaps(bars, df.index),
+            "liquidity_sweeps": _liquidity_sweeps(bars, df.index, swings),
+            "structure_breaks": _structure_breaks(bars, swings),
+        }
 
     # Derive overall smart money bias
     biases = []
@@ -359,4 +400,4 @@ def analyze_smart_money(df: pd.DataFrame) -> dict:
         result["overall_bias"] = "NEUTRAL"
         result["bias_score"] = 0.0
 
-    return result
+    return result if df is None else _SMC_CACHE.put(df, result)
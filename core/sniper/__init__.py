@@ -6,6 +6,7 @@ from .state import (  # noqa: F401
     ExecutionIntent,
     FastCandidate,
     M15Snapshot,
+    PivotArrays,
     PivotPoint,
     RBHSetupState,
     ECRSetupState,
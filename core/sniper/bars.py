@@ -0,0 +1,62 @@
+"""
+Per-symbol M15 bar cache: full history fetched once, then topped up from a short tail.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+import pandas as pd
+
+
+RatesFetch = Callable[[str, int], Optional[pd.DataFrame]]
+
+
+class ClosedBarCache:
+    """
+    Stand-in for ``get_rates(symbol, count)`` that avoids refetching history.
+
+    Each symbol keeps its closed bars from the deepest fetch so far.  A call
+    first fetches the last *recent* bars (the newest being the forming bar);
+    when that tail overlaps the cached bars, newly closed bars are appended
+    and the result is sliced from the cache.  Any gap, reset or deeper
+    request falls back to one full fetch, which re-seeds the cache.
+    """
+
+    def __init__(self, fetch: RatesFetch, recent: int = 3):
+        self._fetch = fetch
+        self._recent = recent
+        self._entries: dict[str, tuple[int, pd.DataFrame]] = {}  # symbol -> (depth, closed)
+
+    def rates(self, symbol: str, count: int) -> Optional[pd.DataFrame]:
+        """The last *count* bars of *symbol*, forming bar included."""
+        if count <= self._recent:
+            return self._fetch(symbol, count)
+
+        entry = self._entries.get(symbol)
+        if entry is not None and entry[0] >= count:
+            tail = self._fetch(symbol, self._recent)
+            if tail is not None and len(tail) == self._recent:
+                depth, closed = entry
+                last = closed.index[-1]
+                if tail.index[0] <= last < tail.index[-1]:
+                    new = tail.iloc[:-1]
+                    new = new[new.index > last]
+                    if len(new):
+                        closed = pd.concat([closed, new]).iloc[-(depth - 1):]
+                        self._entries[symbol] = (depth, closed)
+                    return pd.concat([closed.iloc[-(count - 1):], tail.iloc[-1:]])
+
+        depth = max(count, entry[0] if entry is not None else 0)
+        df = self._fetch(symbol, depth)
+        if df is None or len(df) < 2:
+            self._entries.pop(symbol, None)
+            return df
+        self._entries[symbol] = (depth, df.iloc[:-1])
+        return df.iloc[-count:]
+
+    def retain(self, symbols) -> None:
+        """Drop cached bars for every symbol not in *symbols*."""
+        keep = set(symbols)
+        for symbol in [s for s in self._entries if s not in keep]:
+            del self._entries[symbol]
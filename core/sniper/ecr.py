@@ -10,15 +10,20 @@ import numpy as np
 import pandas as pd
 
 import config as cfg
-from .levels import ema
+from utils.accel import HAVE_NUMBA, njit
+from .levels import cached_ema
 from .scoring import score_ecr
 from .state import ECRSetupState, TriggerEvent
 
 
-def _cross_count(series_a: pd.Series, series_b: pd.Series, min_gap: int) -> int:
-    diff = series_a - series_b
-    sign = np.sign(diff)
-    crosses = np.where(np.diff(sign) != 0)[0]
+def _crossings(series_a: np.ndarray, series_b: np.ndarray) -> np.ndarray:
+    """Indices i where the sign of a - b changes between bar i and i+1."""
+    sign = np.sign(series_a - series_b)
+    # != on neighbours is np.diff(sign) != 0 without the diff array (NaN != NaN)
+    return np.flatnonzero(sign[1:] != sign[:-1])
+
+
+def _gap_count(crosses: np.ndarray, min_gap: int) -> int:
     if len(crosses) == 0:
         return 0
     count = 1
@@ -30,13 +35,40 @@ def _cross_count(series_a: pd.Series, series_b: pd.Series, min_gap: int) -> int:
     return count
 
 
-def _last_cross_index(series_a: pd.Series, series_b: pd.Series) -> int:
-    diff = series_a - series_b
-    sign = np.sign(diff)
-    crosses = np.where(np.diff(sign) != 0)[0]
-    if len(crosses) == 0:
-        return -1
-    return int(crosses[-1])
+@njit(cache=True)
+def _cross_kernel(series_a, series_b, min_gap):
+    """Fused single pass: (min_gap-spaced cross count, last cross or -1)."""
+    count = 0
+    kept = 0
+    last = -1
+    prev = 0.0
+    for i in range(series_a.shape[0]):
+        d = series_a[i] - series_b[i]
+        # np.sign semantics: NaN stays NaN and never equals the previous sign
+        s = 1.0 if d > 0 else (-1.0 if d < 0 else (0.0 if d == 0 else np.nan))
+        if i > 0 and s != prev:
+            if count == 0 or i - 1 - kept >= min_gap:
+                count += 1
+                kept = i - 1
+            last = i - 1
+        prev = s
+    return count, last
+
+
+def _cross_stats(series_a: np.ndarray, series_b: np.ndarray, min_gap: int) -> tuple[int, int]:
+    """(_cross_count, _last_cross_index) of the same pair in one pass."""
+    if HAVE_NUMBA:
+        return _cross_kernel(series_a, series_b, min_gap)
+    crosses = _crossings(series_a, series_b)
+    return _gap_count(crosses, min_gap), int(crosses[-1]) if len(crosses) else -1
+
+
+def _cross_count(series_a: np.ndarray, series_b: np.ndarray, min_gap: int) -> int:
+    return _cross_stats(series_a, series_b, min_gap)[0]
+
+
+def _last_cross_index(series_a: np.ndarray, series_b: np.ndarray) -> int:
+    return _cross_stats(series_a, series_b, 1)[1]
 
 
 def evaluate_ecr(
@@ -47,6 +79,7 @@ def evaluate_ecr(
     bar_index: int,
     trend_state: str,
     params: dict | None = None,
+    ema_cache: dict | None = None,
 ) -> tuple[Optional[ECRSetupState], Optional[TriggerEvent]]:
     params = params or {}
     max_ema50_slope_atr = params.get("ecr_max_ema50_slope_atr", cfg.ECR_MAX_EMA50_SLOPE_ATR)
@@ -61,25 +94,28 @@ def evaluate_ecr(
     if atr_val <= 0:
         return None, None
 
-    close = df["close"]
-    ema5 = ema(close, cfg.ECR_FAST_EMA)
-    ema13 = ema(close, cfg.ECR_SIGNAL_EMA)
-    ema50 = ema(close, cfg.ECR_TREND_EMA)
-    ema200 = ema(close, cfg.ECR_TARGET_EMA)
+    # Use only in transition/range regimes
+    if trend_state not in ("transition", "range"):
+        return None, None
 
-    last_close = float(close.iloc[-1])
-    ema13_val = float(ema13.iloc[-1])
-    ema50_val = float(ema50.iloc[-1])
-    ema200_val = float(ema200.iloc[-1])
+    # Spread gate (stricter for ECR)
+    if spread_atr_ratio > max_spread_atr:
+        return None, None
+
+    # EMAs as plain arrays, each computed only once the gates before it pass
+    window = cfg.ECR_CROSS_WINDOW_BARS
+    close = df["close"].to_numpy(dtype=np.float64)
+    ema50 = cached_ema(ema_cache, close, cfg.ECR_TREND_EMA, bar_index)
 
     # Trend strength gate (avoid strong trends)
-    ema50_slope = (ema50.iloc[-1] - ema50.iloc[-5]) / atr_val if len(ema50) > 6 else 0
-    if abs(float(ema50_slope)) > max_ema50_slope_atr:
+    ema50_slope = (ema50[-1] - ema50[-5]) / atr_val if len(ema50) > 6 else 0
+    if abs(ema50_slope) > max_ema50_slope_atr:
         return None, None
 
-    # Use only in transition/range regimes
-    if trend_state not in ("transition", "range"):
-        return None, None
+    ema13 = cached_ema(ema_cache, close, cfg.ECR_SIGNAL_EMA, bar_index)
+    last_close = float(close[-1])
+    ema13_val = float(ema13[-1])
+    ema50_val = float(ema50[-1])
 
     # Determine counter-trend direction from 13/50 relationship
     if ema13_val < ema50_val:
@@ -90,18 +126,23 @@ def evaluate_ecr(
         return None, None
 
     # Require last 13/50 cross within window
-    last_cross = _last_cross_index(ema13.iloc[-cfg.ECR_CROSS_WINDOW_BARS:], ema50.iloc[-cfg.ECR_CROSS_WINDOW_BARS:])
+    ema13_window = ema13[-window:]
+    last_cross = _last_cross_index(ema13_window, ema50[-window:])
     if last_cross < 0:
         return None, None
-    trend_cross_time = int(df.index[-cfg.ECR_CROSS_WINDOW_BARS + last_cross].timestamp())
+    trend_cross_time = int(df.index[-window + last_cross].timestamp())
 
     # Count 5/13 cycles since trend cross
-    ema5_window = ema5.iloc[-cfg.ECR_CROSS_WINDOW_BARS:]
-    ema13_window = ema13.iloc[-cfg.ECR_CROSS_WINDOW_BARS:]
-    cycle_crosses = _cross_count(ema5_window, ema13_window, cfg.ECR_CROSS_MIN_GAP_BARS)
+    ema5 = cached_ema(ema_cache, close, cfg.ECR_FAST_EMA, bar_index)
+    ema5_window = ema5[-window:]
+    cycle_crosses, last_cycle_cross = _cross_stats(
+        ema5_window, ema13_window, cfg.ECR_CROSS_MIN_GAP_BARS,
+    )
     if cycle_crosses < cfg.ECR_CROSS_COUNT:
         return None, None
 
+    ema200_val = float(cached_ema(ema_cache, close, cfg.ECR_TARGET_EMA, bar_index)[-1])
+
     # EMA200 distance gate
     dist_to_ema200 = abs(last_close - ema200_val)
     if dist_to_ema200 > max_target_atr * atr_val:
@@ -111,29 +152,23 @@ def evaluate_ecr(
     if direction == "SELL" and ema200_val >= last_close:
         return None, None
 
-    # Spread gate (stricter for ECR)
-    if spread_atr_ratio > max_spread_atr:
-        return None, None
-
     # Entry condition: candle close beyond EMA13 with momentum
-    closed_bar = df.iloc[-1]
-    c_open = float(closed_bar["open"])
-    c_close = float(closed_bar["close"])
+    c_open = float(df["open"].to_numpy()[-1])
+    c_close = last_close
     c_body = abs(c_close - c_open)
     if c_body < entry_body_atr * atr_val:
         return None, None
 
-    if direction == "BUY" and (c_close <= ema13_val or c_close <= float(ema5.iloc[-1])):
+    if direction == "BUY" and (c_close <= ema13_val or c_close <= ema5[-1]):
         return None, None
-    if direction == "SELL" and (c_close >= ema13_val or c_close >= float(ema5.iloc[-1])):
+    if direction == "SELL" and (c_close >= ema13_val or c_close >= ema5[-1]):
         return None, None
 
     # Require last 5/13 cross to align with entry direction
-    last_cross = _last_cross_index(ema5_window, ema13_window)
-    if last_cross >= 0:
-        idx = -cfg.ECR_CROSS_WINDOW_BARS + last_cross
-        ema5_last = float(ema5.iloc[idx])
-        ema13_last = float(ema13.iloc[idx])
+    if last_cycle_cross >= 0:
+        idx = -window + last_cycle_cross
+        ema5_last = ema5[idx]
+        ema13_last = ema13[idx]
         if direction == "BUY" and ema5_last < ema13_last:
             return None, None
         if direction == "SELL" and ema5_last > ema13_last:
@@ -141,10 +176,10 @@ def evaluate_ecr(
 
     # Stop placement
     if direction == "BUY":
-        swing_low = float(df["low"].iloc[-cfg.ECR_STOP_LOOKBACK:].min())
+        swing_low = float(np.nanmin(df["low"].to_numpy()[-cfg.ECR_STOP_LOOKBACK:]))
         sl = swing_low - cfg.ECR_SL_BUFFER_ATR * atr_val
     else:
-        swing_high = float(df["high"].iloc[-cfg.ECR_STOP_LOOKBACK:].max())
+        swing_high = float(np.nanmax(df["high"].to_numpy()[-cfg.ECR_STOP_LOOKBACK:]))
         sl = swing_high + cfg.ECR_SL_BUFFER_ATR * atr_val
 
     if abs(last_close - sl) < cfg.SNIPER_MIN_STOP_ATR * atr_val:
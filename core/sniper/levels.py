@@ -11,74 +11,109 @@ import numpy as np
 import pandas as pd
 
 import config as cfg
-from .state import PivotPoint
+from utils.accel import ewm_mean, move_max, move_min
+from .state import PivotArrays, PivotPoint
 
 
 def ema(series: pd.Series, span: int) -> pd.Series:
     return series.ewm(span=span, adjust=False).mean()
 
 
+def cached_ema(
+    cache: dict | None,
+    close: np.ndarray,
+    span: int,
+    bar_index: int,
+) -> np.ndarray:
+    """EMA of *close* as an array, memoised in *cache* for bar *bar_index*.
+
+    Keys carry len(close) as well, since frames of different depth yield
+    different EMAs; entries from earlier bars are evicted on a miss.
+    """
+    if cache is None:
+        return ewm_mean(close, span)
+    key = (span, bar_index, len(close))
+    values = cache.get(key)
+    if values is None:
+        for stale in [k for k in cache if k[1] < bar_index]:
+            del cache[stale]
+        values = cache[key] = ewm_mean(close, span)
+    return values
+
+
 def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    high = df["high"]
-    low = df["low"]
-    close = df["close"].shift(1)
-    tr = pd.concat(
-        [(high - low).abs(), (high - close).abs(), (low - close).abs()],
-        axis=1,
-    ).max(axis=1)
-    return tr.rolling(period, min_periods=period).mean()
+    high = df["high"].to_numpy(dtype=np.float64)
+    low = df["low"].to_numpy(dtype=np.float64)
+    close = np.empty_like(high)
+    close[:1] = np.nan
+    close[1:] = df["close"].to_numpy(dtype=np.float64)[:-1]
+    # fmax skips NaN like DataFrame.max(axis=1): bar 0 has no previous close
+    tr = np.fmax(np.abs(high - low), np.fmax(np.abs(high - close), np.abs(low - close)))
+    return pd.Series(tr, index=df.index).rolling(period, min_periods=period).mean()
+
+
+def _as_pivot_arrays(pivots: PivotArrays | list[PivotPoint] | None) -> PivotArrays:
+    if isinstance(pivots, PivotArrays):
+        return pivots
+    return PivotArrays.from_points(pivots or [])
 
 
-def find_pivots(df: pd.DataFrame, L: int) -> list[PivotPoint]:
-    pivots: list[PivotPoint] = []
+def find_pivot_arrays(df: pd.DataFrame, L: int) -> PivotArrays:
+    """Swing pivots of *df* (centred 2L+1 window extremes) as arrays."""
     if df is None or len(df) < (L * 2 + 3):
-        return pivots
+        return _as_pivot_arrays(None)
 
     highs = df["high"].values
     lows = df["low"].values
-    times = df.index
     n = len(df)
 
-    for i in range(L, n - L):
-        hi = highs[i]
-        lo = lows[i]
-        if hi == np.max(highs[i - L:i + L + 1]):
-            pivots.append(PivotPoint(
-                type="high",
-                idx=i,
-                time=int(times[i].timestamp()),
-                price=float(hi),
-            ))
-        if lo == np.min(lows[i - L:i + L + 1]):
-            pivots.append(PivotPoint(
-                type="low",
-                idx=i,
-                time=int(times[i].timestamp()),
-                price=float(lo),
-            ))
-    return pivots
-
-
-def last_swings(pivots: list[PivotPoint]) -> dict[str, list[PivotPoint]]:
-    highs = [p for p in pivots if p.type == "high"]
-    lows = [p for p in pivots if p.type == "low"]
+    # A bar is a pivot when it equals the extreme of its centred 2L+1
+    # window.  Trailing window k ends at bar k + 2L, so it is centred on
+    # bar k + L; a NaN in the window never matches.
+    span = 2 * L
+    centre = slice(L, n - L)
+    ph = np.flatnonzero(highs[centre] == move_max(highs, span + 1)[span:]) + L
+    pl = np.flatnonzero(lows[centre] == move_min(lows, span + 1)[span:]) + L
+
+    # Chronological merge; a stable sort keeps the high before the low
+    # when one bar is both.
+    idx = np.concatenate([ph, pl]).astype(np.int64)
+    order = np.argsort(idx, kind="stable")
+    idx = idx[order]
+    is_high = order < len(ph)
+    times = df.index
+    return PivotArrays(
+        idx=idx,
+        time=np.fromiter((int(times[i].timestamp()) for i in idx.tolist()),
+                         dtype=np.int64, count=len(idx)),
+        price=np.where(is_high, highs[idx], lows[idx]).astype(np.float64),
+        is_high=is_high,
+    )
+
+
+def find_pivots(df: pd.DataFrame, L: int) -> list[PivotPoint]:
+    return find_pivot_arrays(df, L).points()
+
+
+def last_swings(pivots: PivotArrays | list[PivotPoint]) -> dict[str, list[PivotPoint]]:
+    pv = _as_pivot_arrays(pivots)
     return {
-        "highs": highs[-2:],
-        "lows": lows[-2:],
+        "highs": [pv.point(k) for k in np.flatnonzero(pv.is_high)[-2:]],
+        "lows": [pv.point(k) for k in np.flatnonzero(~pv.is_high)[-2:]],
     }
 
 
-def trend_state_from_pivots(pivots: list[PivotPoint]) -> str:
-    swings = last_swings(pivots)
-    highs = swings["highs"]
-    lows = swings["lows"]
+def trend_state_from_pivots(pivots: PivotArrays | list[PivotPoint]) -> str:
+    pv = _as_pivot_arrays(pivots)
+    highs = pv.price[pv.is_high][-2:]
+    lows = pv.price[~pv.is_high][-2:]
     if len(highs) < 2 or len(lows) < 2:
         return "transition"
 
-    hh = highs[-1].price > highs[-2].price
-    hl = lows[-1].price > lows[-2].price
-    lh = highs[-1].price < highs[-2].price
-    ll = lows[-1].price < lows[-2].price
+    hh = highs[-1] > highs[-2]
+    hl = lows[-1] > lows[-2]
+    lh = highs[-1] < highs[-2]
+    ll = lows[-1] < lows[-2]
 
     if hh and hl:
         return "trend"
@@ -92,15 +127,21 @@ def trend_state_from_pivots(pivots: list[PivotPoint]) -> str:
 def cluster_levels(values: Iterable[float], tol: float) -> list[list[float]]:
     levels = sorted([v for v in values if v > 0])
     clusters: list[list[float]] = []
+    # Values arrive ascending, so only the newest cluster can take one: each
+    # older cluster's median was already more than tol below the value that
+    # opened its successor.  Clusters stay sorted, so the running median is
+    # read off the middle instead of calling np.median.
+    current: list[float] = []
+    median = 0.0
     for v in levels:
-        placed = False
-        for c in clusters:
-            if abs(v - np.median(c)) <= tol:
-                c.append(v)
-                placed = True
-                break
-        if not placed:
-            clusters.append([v])
+        if current and abs(v - median) <= tol:
+            current.append(v)
+            mid = len(current) // 2
+            median = current[mid] if len(current) % 2 else (current[mid - 1] + current[mid]) / 2
+        else:
+            current = [v]
+            clusters.append(current)
+            median = v
     return clusters
 
 
@@ -114,17 +155,20 @@ class RangeDetection:
 
 
 def detect_range(
-    pivots: list[PivotPoint],
+    pivots: PivotArrays | list[PivotPoint],
     atr_val: float,
     lookback_bars: int,
     tol_atr: float,
 ) -> RangeDetection:
-    if atr_val <= 0 or not pivots:
+    if atr_val <= 0:
+        return RangeDetection()
+    pv = _as_pivot_arrays(pivots)
+    if not len(pv):
         return RangeDetection()
 
-    recent = [p for p in pivots if p.idx >= max(0, pivots[-1].idx - lookback_bars)]
-    highs = [p.price for p in recent if p.type == "high"]
-    lows = [p.price for p in recent if p.type == "low"]
+    recent = pv.idx >= max(0, pv.idx[-1] - lookback_bars)
+    highs = pv.price[recent & pv.is_high].tolist()
+    lows = pv.price[recent & ~pv.is_high].tolist()
     if len(highs) < 2 or len(lows) < 2:
         return RangeDetection()
 
@@ -150,20 +194,20 @@ def detect_range(
     )
 
 
-def atr_percentile(atr_series: pd.Series, lookback: int) -> float:
+def atr_percentile(atr_series: pd.Series | np.ndarray, lookback: int) -> float:
     if atr_series is None or len(atr_series) < lookback:
         return 100.0
-    window = atr_series.iloc[-lookback:]
-    current = float(window.iloc[-1])
+    window = np.asarray(atr_series, dtype=np.float64)[-lookback:]
+    current = float(window[-1])
     if current <= 0:
         return 100.0
     return float(np.sum(window <= current) / len(window) * 100.0)
 
 
-def major_levels_from_pivots(pivots: list[PivotPoint], atr_val: float) -> list[float]:
+def major_levels_from_pivots(pivots: PivotArrays | list[PivotPoint], atr_val: float) -> list[float]:
     if atr_val <= 0:
         return []
-    levels = [p.price for p in pivots]
+    levels = _as_pivot_arrays(pivots).price.tolist()
     clusters = cluster_levels(levels, atr_val * 0.25)
     majors = [float(np.median(c)) for c in clusters if len(c) >= 2]
     return sorted(set(majors))
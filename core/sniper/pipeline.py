@@ -11,7 +11,8 @@ import config as cfg
 from core.mt5_connector import MT5Connector
 from utils.logger import get_logger
 from utils import market_hours
-from .levels import atr, ema, find_pivots, trend_state_from_pivots, detect_range, atr_percentile, major_levels_from_pivots
+from .levels import atr, cached_ema, find_pivot_arrays, trend_state_from_pivots, detect_range, atr_percentile, major_levels_from_pivots
+from .bars import ClosedBarCache
 from .state import M15Snapshot, FastCandidate, SymbolState, ExecutionIntent
 from .tpr import detect_tpr_setup, check_tpr_trigger_on_close, check_tpr_trigger_intrabar
 from .rbh import initialize_rbh_state, update_rbh_state
@@ -33,9 +34,13 @@ class SniperPipeline:
         self._intrabar_symbols: list[str] = []
         self._last_signal_bar: int = 0
         self._adaptive_relax: float = 0.0
+        self._profiles: dict[str, dict] = {}  # symbol -> asset profile (read-only)
+        self._bars = ClosedBarCache(lambda symbol, count: mt5_conn.get_rates(symbol, "M15", count=count))
 
     def refresh_universe(self):
         self._universe = self.mt5.get_symbols_by_groups()
+        self._profiles = {sym: self._build_asset_profile(sym) for sym in self._universe}
+        self._bars.retain(self._universe)
         log.info(f"[SNIPER] Universe refreshed: {len(self._universe)} symbols")
 
     def _asset_class(self, symbol: str) -> str:
@@ -51,6 +56,13 @@ class SniperPipeline:
         return "fx"
 
     def _asset_profile(self, symbol: str) -> dict:
+        profile = self._profiles.get(symbol)
+        if profile is None:
+            # Symbol outside the last refreshed universe
+            profile = self._profiles[symbol] = self._build_asset_profile(symbol)
+        return profile
+
+    def _build_asset_profile(self, symbol: str) -> dict:
         profile = {
             "min_stop_atr": cfg.SNIPER_MIN_STOP_ATR,
             "no_chase_atr": cfg.SNIPER_NO_CHASE_ATR,
@@ -82,32 +94,40 @@ class SniperPipeline:
         return forming_time
 
     def _get_closed_m15(self, symbol: str, count: int) -> tuple[pd.DataFrame | None, int]:
-        df = self.mt5.get_rates(symbol, "M15", count=count)
+        df = self._bars.rates(symbol, count)
         if df is None or len(df) < 30:
             return None, 0
         forming_time = int(df.index[-1].timestamp())
-        closed = df.iloc[:-1].copy()
+        closed = df.iloc[:-1]
         return closed, forming_time
 
-    def _build_snapshot(self, symbol: str, closed: pd.DataFrame, forming_time: int) -> Optional[M15Snapshot]:
+    def _build_snapshot(
+        self,
+        symbol: str,
+        closed: pd.DataFrame,
+        forming_time: int,
+        ema_cache: dict | None = None,
+        with_major_levels: bool = True,
+    ) -> Optional[M15Snapshot]:
         if closed is None or len(closed) < 30:
             return None
-        closed = closed.copy()
-        closed["atr"] = atr(closed, period=14)
-        closed["ema20"] = ema(closed["close"], 20)
-        closed["ema50"] = ema(closed["close"], 50)
-
-        atr_val = float(closed["atr"].iloc[-1]) if not np.isnan(closed["atr"].iloc[-1]) else 0.0
-        ema20_val = float(closed["ema20"].iloc[-1])
-        ema50_val = float(closed["ema50"].iloc[-1])
-        ema20_slope = float(ema20_val - closed["ema20"].iloc[-5]) if len(closed) > 6 else 0.0
-        ema50_slope = float(ema50_val - closed["ema50"].iloc[-5]) if len(closed) > 6 else 0.0
-
-        pivots = find_pivots(closed, cfg.SNIPER_PIVOT_L)
+        atr14 = atr(closed, period=14).to_numpy()
+        close = closed["close"].to_numpy(dtype=np.float64)
+        bar_seq = int(closed.index[-1].timestamp()) // _M15_SECONDS
+        ema20 = cached_ema(ema_cache, close, 20, bar_seq)
+        ema50 = cached_ema(ema_cache, close, 50, bar_seq)
+
+        atr_val = float(atr14[-1]) if not np.isnan(atr14[-1]) else 0.0
+        ema20_val = float(ema20[-1])
+        ema50_val = float(ema50[-1])
+        ema20_slope = float(ema20_val - ema20[-5]) if len(closed) > 6 else 0.0
+        ema50_slope = float(ema50_val - ema50[-5]) if len(closed) > 6 else 0.0
+
+        pivots = find_pivot_arrays(closed, cfg.SNIPER_PIVOT_L)
         trend_state = trend_state_from_pivots(pivots)
 
         range_info = detect_range(pivots, atr_val, cfg.SNIPER_RANGE_LOOKBACK_BARS, cfg.RBH_TOUCH_TOL_ATR)
-        compression = atr_percentile(closed["atr"], cfg.SNIPER_COMPRESSION_BARS)
+        compression = atr_percentile(atr14, cfg.SNIPER_COMPRESSION_BARS)
 
         # Spread in price units
         spread_pips = self.mt5.spread_pips(symbol)
@@ -117,8 +137,10 @@ class SniperPipeline:
             spread_price = tick["ask"] - tick["bid"]
         spread_atr_ratio = spread_price / atr_val if atr_val > 0 else 0.0
 
-        major_pivots = find_pivots(closed.tail(cfg.SNIPER_MAJOR_LEVEL_BARS), cfg.SNIPER_PIVOT_L)
-        major_levels = major_levels_from_pivots(major_pivots, atr_val)
+        major_levels: list[float] = []
+        if with_major_levels:
+            major_pivots = find_pivot_arrays(closed.tail(cfg.SNIPER_MAJOR_LEVEL_BARS), cfg.SNIPER_PIVOT_L)
+            major_levels = major_levels_from_pivots(major_pivots, atr_val)
 
         return M15Snapshot(
             symbol=symbol,
@@ -194,10 +216,15 @@ class SniperPipeline:
             closed, forming_time = self._get_closed_m15(symbol, cfg.SNIPER_FAST_PASS_BARS + 2)
             if closed is None:
                 continue
-            snapshot = self._build_snapshot(symbol, closed, forming_time)
+            # Regime scoring never reads major levels; skip that pivot pass
+            snapshot = self._build_snapshot(symbol, closed, forming_time, with_major_levels=False)
             if snapshot is None or snapshot.atr14 <= 0:
                 continue
             profile = self._asset_profile(symbol)
+            # Cheapest gate first: a wide spread rejects before regime scoring
+            spread_ok = snapshot.spread_atr_ratio <= profile.get("max_spread_atr", cfg.SNIPER_MAX_SPREAD_ATR)
+            if not spread_ok:
+                continue
             compression_max = self._effective_compression_max(profile.get("compression_max_pct", cfg.SNIPER_COMPRESSION_MAX_PCT))
             regime_min_conf = self._effective_regime_min_conf(profile.get("regime_min_conf", cfg.SNIPER_REGIME_MIN_CONF))
 
@@ -215,7 +242,6 @@ class SniperPipeline:
                 elif snapshot.ema20 < snapshot.ema50 and snapshot.ema20_slope < 0:
                     bias = "short"
 
-            spread_ok = snapshot.spread_atr_ratio <= profile.get("max_spread_atr", cfg.SNIPER_MAX_SPREAD_ATR)
             atr_ok = snapshot.atr14 > 0
             session_ok = True
             major_ok = True  # placeholder for macro-level proximity gating
@@ -265,7 +291,11 @@ class SniperPipeline:
             closed, forming_time = self._get_closed_m15(cand.symbol, cfg.SNIPER_CONTEXT_BARS + 2)
             if closed is None:
                 continue
-            snapshot = self._build_snapshot(cand.symbol, closed, forming_time)
+            state = self._states.get(cand.symbol)
+            if state is None:
+                state = SymbolState(symbol=cand.symbol)
+                self._states[cand.symbol] = state
+            snapshot = self._build_snapshot(cand.symbol, closed, forming_time, state.ema_cache)
             if snapshot is None:
                 continue
             profile = self._asset_profile(cand.symbol)
@@ -275,11 +305,6 @@ class SniperPipeline:
             if current_bar_seq == 0:
                 current_bar_seq = bar_seq
 
-            state = self._states.get(cand.symbol)
-            if state is None:
-                state = SymbolState(symbol=cand.symbol)
-                self._states[cand.symbol] = state
-
             state.last_m15_bar_time = bar_seq
             state.last_fast_pass_time = bar_seq
 
@@ -423,6 +448,7 @@ class SniperPipeline:
                     bar_seq,
                     snapshot.trend_state,
                     params=profile,
+                    ema_cache=state.ema_cache,
                 )
                 if ecr_state:
                     state.active_ecr = ecr_state
@@ -6,6 +6,7 @@ from __future__ import annotations
 
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 import config as cfg
@@ -52,7 +53,7 @@ def initialize_rbh_state(
         compression_pct = atr_percentile(atr_series, cfg.SNIPER_COMPRESSION_BARS)
     compression_ok = compression_pct <= 40.0
 
-    last_close = float(df["close"].iloc[-1])
+    last_close = float(df["close"].to_numpy()[-1])
     near_high = abs(last_close - range_info.range_high) <= atr_val * 0.3
     near_low = abs(last_close - range_info.range_low) <= atr_val * 0.3
 
@@ -105,11 +106,12 @@ def update_rbh_state(
     if atr_val <= 0 or df is None or len(df) < 30:
         return state, None
 
-    closed_bar = df.iloc[-1]
-    c_open = float(closed_bar["open"])
-    c_close = float(closed_bar["close"])
-    c_high = float(closed_bar["high"])
-    c_low = float(closed_bar["low"])
+    # Last bar straight from the column arrays (no row Series)
+    bar_time = int(df.index[-1].timestamp())
+    c_open = float(df["open"].to_numpy()[-1])
+    c_close = float(df["close"].to_numpy()[-1])
+    c_high = float(df["high"].to_numpy()[-1])
+    c_low = float(df["low"].to_numpy()[-1])
     c_body = abs(c_close - c_open)
     c_range = c_high - c_low if c_high > c_low else 0.0
 
@@ -119,7 +121,7 @@ def update_rbh_state(
             if (c_close >= state.range_high + break_buffer_atr * atr_val
                     and c_body >= break_body_atr * atr_val
                     and c_close >= c_low + 0.7 * (c_range or 1)):
-                state.break_time = int(closed_bar.name.timestamp())
+                state.break_time = bar_time
                 state.break_level = state.range_high
                 state.break_candle_high = c_high
                 state.retest_window_end = bar_index + cfg.RBH_RETEST_WINDOW_BARS
@@ -127,7 +129,7 @@ def update_rbh_state(
             if (c_close <= state.range_low - break_buffer_atr * atr_val
                     and c_body >= break_body_atr * atr_val
                     and c_close <= c_high - 0.7 * (c_range or 1)):
-                state.break_time = int(closed_bar.name.timestamp())
+                state.break_time = bar_time
                 state.break_level = state.range_low
                 state.break_candle_high = c_low
                 state.retest_window_end = bar_index + cfg.RBH_RETEST_WINDOW_BARS
@@ -149,7 +151,7 @@ def update_rbh_state(
         if touched and holds:
             state.retest_confirmed = True
             entry = state.break_level + 0.05 * atr_val
-            retest_low = float(df["low"].iloc[-3:].min())
+            retest_low = float(np.nanmin(df["low"].to_numpy()[-3:]))
             sl = min(retest_low, state.break_level - break_buffer_atr * atr_val) - sl_buffer_atr * atr_val
             if abs(entry - sl) < min_stop_atr * atr_val:
                 state.break_state = "invalid"
@@ -164,7 +166,7 @@ def update_rbh_state(
                 setup_type="RBH",
                 symbol=state.symbol,
                 direction="BUY",
-                trigger_time=int(closed_bar.name.timestamp()),
+                trigger_time=bar_time,
                 trigger_price=entry,
                 momentum_score=min(1.0, c_body / (break_body_atr * atr_val)),
                 reasons=["RETEST_HOLD", "CLOSE_ABOVE_RANGE"],
@@ -178,7 +180,7 @@ def update_rbh_state(
         if touched and holds:
             state.retest_confirmed = True
             entry = state.break_level - 0.05 * atr_val
-            retest_high = float(df["high"].iloc[-3:].max())
+            retest_high = float(np.nanmax(df["high"].to_numpy()[-3:]))
             sl = max(retest_high, state.break_level + break_buffer_atr * atr_val) + sl_buffer_atr * atr_val
             if abs(entry - sl) < min_stop_atr * atr_val:
                 state.break_state = "invalid"
@@ -193,7 +195,7 @@ def update_rbh_state(
                 setup_type="RBH",
                 symbol=state.symbol,
                 direction="SELL",
-                trigger_time=int(closed_bar.name.timestamp()),
+                trigger_time=bar_time,
                 trigger_price=entry,
                 momentum_score=min(1.0, c_body / (break_body_atr * atr_val)),
                 reasons=["RETEST_HOLD", "CLOSE_BELOW_RANGE"],
@@ -7,6 +7,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Literal, Optional
 
+import numpy as np
+
 
 Direction = Literal["BUY", "SELL"]
 Regime = Literal["trend", "range", "transition"]
@@ -23,6 +25,44 @@ class PivotPoint:
     price: float
 
 
+@dataclass
+class PivotArrays:
+    """
+    Pivot sequence as parallel arrays (structure-of-arrays), chronological.
+
+    The level helpers accept either this or a list of PivotPoint;
+    points() / from_points() convert at the boundary.
+    """
+    idx: np.ndarray          # int64 bar positions
+    time: np.ndarray         # int64 epoch seconds
+    price: np.ndarray        # float64
+    is_high: np.ndarray      # bool — True = pivot high, False = pivot low
+
+    def __len__(self) -> int:
+        return len(self.idx)
+
+    def point(self, k: int) -> PivotPoint:
+        return PivotPoint(
+            type="high" if self.is_high[k] else "low",
+            idx=int(self.idx[k]),
+            time=int(self.time[k]),
+            price=float(self.price[k]),
+        )
+
+    def points(self) -> list[PivotPoint]:
+        return [self.point(k) for k in range(len(self))]
+
+    @classmethod
+    def from_points(cls, points: list[PivotPoint]) -> PivotArrays:
+        n = len(points)
+        return cls(
+            idx=np.fromiter((p.idx for p in points), dtype=np.int64, count=n),
+            time=np.fromiter((p.time for p in points), dtype=np.int64, count=n),
+            price=np.fromiter((p.price for p in points), dtype=np.float64, count=n),
+            is_high=np.fromiter((p.type == "high" for p in points), dtype=bool, count=n),
+        )
+
+
 @dataclass
 class M15Snapshot:
     symbol: str
@@ -33,7 +73,7 @@ class M15Snapshot:
     ema50: float
     ema20_slope: float
     ema50_slope: float
-    pivots: list[PivotPoint] = field(default_factory=list)
+    pivots: PivotArrays | list[PivotPoint] = field(default_factory=list)
     trend_state: Regime = "transition"
     range_high: float = 0.0
     range_low: float = 0.0
@@ -151,6 +191,8 @@ class SymbolState:
     regime: str = "transition"
     regime_streak: int = 0
     regime_confidence: float = 0.0
+    # (span, bar_index, bars) -> EMA array, shared by snapshot and setups
+    ema_cache: dict[tuple[int, int, int], np.ndarray] = field(default_factory=dict)
 
 
 @dataclass
@@ -43,6 +43,7 @@ from core.indicators import add_atr
 from core.pristine import (
     bar_by_bar_assessment,
     find_pivots,
+    find_pivot_arrays,
     classify_pivots_major_minor,
     determine_trend_from_pivots,
     classify_stage,
@@ -583,8 +584,7 @@ class PositionMonitor:
         if d1_df is not None and len(d1_df) >= 50:
             d1_df = add_atr(d1_df)
             # Stage classification (Ch. 1)
-            d1_pivots = find_pivots(d1_df)
-            d1_pivots = classify_pivots_major_minor(d1_pivots)
+            d1_pivots = classify_pivots_major_minor(find_pivot_arrays(d1_df))
             d1_pivot_trend = determine_trend_from_pivots(d1_pivots)
             d1_stage = classify_stage(d1_df, pivot_trend=d1_pivot_trend)
 
@@ -722,8 +722,8 @@ class PositionMonitor:
         Returns: "broken" | "weakening" | None
         """
         try:
-            pivots = find_pivots(h1_df)
-            if not pivots:
+            pivots = find_pivot_arrays(h1_df)
+            if not len(pivots):
                 return None
             pivots = classify_pivots_major_minor(pivots)
             trend = determine_trend_from_pivots(pivots)
@@ -0,0 +1,45 @@
+"""
+Tests for utils.frame_cache — per-frame memoisation keyed by id/len/last index.
+"""
+
+import pandas as pd
+import pytest
+from utils.frame_cache import MISSING, FrameCache
+
+
+def _frame(n: int = 5) -> pd.DataFrame:
+    return pd.DataFrame({"close": range(n)},
+                        index=pd.date_range("2025-01-01", periods=n, freq="h"))
+
+
+class TestFrameCache:
+    def test_hit_on_same_frame(self):
+        cache = FrameCache()
+        df = _frame()
+        cache.put(df, "value", "tag")
+        assert cache.get(df, "tag") == "value"
+        assert cache.get(df, "other") is MISSING
+
+    def test_equal_content_different_frame_misses(self):
+        cache = FrameCache()
+        cache.put(_frame(), "value")
+        assert cache.get(_frame()) is MISSING
+
+    def test_appended_bar_misses(self):
+        cache = FrameCache()
+        df = _frame(5)
+        cache.put(df, "value")
+        longer = _frame(6)
+        assert cache.get(longer) is MISSING
+
+    def test_lru_eviction(self):
+        cache = FrameCache(maxsize=2)
+        frames = [_frame(n) for n in (3, 4, 5)]
+        for i, df in enumerate(frames):
+            cache.put(df, i)
+        assert cache.get(frames[0]) is MISSING
+        assert cache.get(frames[2]) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -136,5 +136,16 @@ class TestComputeAll:
         assert result is not None
 
 
+class TestEwmMean:
+    def test_matches_pandas_ewm(self):
+        """ewm_mean must be bit-identical to pandas, NaN gaps included."""
+        from utils.accel import ewm_mean
+        close = _make_ohlcv(300)["close"].to_numpy(copy=True)
+        close[[0, 40, 41, 200]] = np.nan
+        for span in (5, 13, 50, 200):
+            expected = pd.Series(close).ewm(span=span, adjust=False).mean().to_numpy()
+            assert np.array_equal(ewm_mean(close, span), expected, equal_nan=True)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -2,13 +2,29 @@
 Tests for core.patterns — validates candlestick pattern detection.
 """
 
+import numpy as np
+import pandas as pd
 import pytest
 from core.patterns import (
     detect_engulfing,
     detect_tweezer,
     detect_hammer,
+    detect_inverted_hammer,
+    detect_marubozu,
+    detect_piercing_dark_cloud,
     detect_morning_evening_star,
+    detect_three_soldiers_crows,
     detect_doji,
+    detect_two_candle_patterns,
+    scan_candle_flags,
+    _scan_candles_numpy,
+    CDL_DOJI, CDL_HAMMER, CDL_INVERTED_HAMMER,
+    CDL_MARUBOZU_BULL, CDL_MARUBOZU_BEAR,
+    CDL_ENGULFING_BULL, CDL_ENGULFING_BEAR,
+    CDL_PIERCING_LINE, CDL_DARK_CLOUD_COVER,
+    CDL_TWEEZER_BOTTOM, CDL_TWEEZER_TOP,
+    CDL_MORNING_STAR, CDL_EVENING_STAR,
+    CDL_THREE_SOLDIERS, CDL_THREE_CROWS,
 )
 
 
@@ -82,5 +98,76 @@ class TestMorningEveningStar:
         assert result == -1
 
 
+def _random_ohlc(n: int = 400, seed: int = 7) -> pd.DataFrame:
+    """Coarse-tick random candles so dojis, ties and tweezers actually occur."""
+    rng = np.random.default_rng(seed)
+    opens = 1.10 + np.round(rng.normal(0, 0.004, n), 3)
+    closes = opens + np.round(rng.normal(0, 0.003, n), 3)
+    highs = np.maximum(opens, closes) + np.round(np.abs(rng.normal(0, 0.002, n)), 3)
+    lows = np.minimum(opens, closes) - np.round(np.abs(rng.normal(0, 0.002, n)), 3)
+    return pd.DataFrame({"open": opens, "high": highs, "low": lows, "close": closes})
+
+
+def _f32_rows(df: pd.DataFrame) -> list[dict]:
+    """Candles as float32 scalars — the precision the bulk scanner works in."""
+    cols = {k: df[k].to_numpy(dtype=np.float32) for k in ("open", "high", "low", "close")}
+    return [{k: v[i] for k, v in cols.items()} for i in range(len(df))]
+
+
+def _expected_flags(df: pd.DataFrame) -> np.ndarray:
+    rows = _f32_rows(df)
+    out = np.zeros(len(rows), dtype=np.uint16)
+    for i, row in enumerate(rows):
+        f = 0
+        f |= CDL_DOJI if detect_doji(row) else 0
+        f |= CDL_HAMMER if detect_hammer(row) else 0
+        f |= CDL_INVERTED_HAMMER if detect_inverted_hammer(row) else 0
+        maru = detect_marubozu(row)
+        f |= CDL_MARUBOZU_BULL if maru > 0 else CDL_MARUBOZU_BEAR if maru < 0 else 0
+        if i >= 1:
+            prev = rows[i - 1]
+            e = detect_engulfing(prev, row)
+            f |= CDL_ENGULFING_BULL if e > 0 else CDL_ENGULFING_BEAR if e < 0 else 0
+            p = detect_piercing_dark_cloud(prev, row)
+            f |= CDL_PIERCING_LINE if p > 0 else CDL_DARK_CLOUD_COVER if p < 0 else 0
+            t = detect_tweezer(prev, row)
+            f |= CDL_TWEEZER_BOTTOM if t > 0 else CDL_TWEEZER_TOP if t < 0 else 0
+        if i >= 2:
+            s = detect_morning_evening_star(rows[i - 2], rows[i - 1], row)
+            f |= CDL_MORNING_STAR if s > 0 else CDL_EVENING_STAR if s < 0 else 0
+            s = detect_three_soldiers_crows(rows[i - 2], rows[i - 1], row)
+            f |= CDL_THREE_SOLDIERS if s > 0 else CDL_THREE_CROWS if s < 0 else 0
+        out[i] = f
+    return out
+
+
+class TestBulkScanner:
+    def test_matches_row_detectors(self):
+        df = _random_ohlc()
+        flags = scan_candle_flags(df)
+        assert flags.dtype == np.uint16
+        np.testing.assert_array_equal(flags, _expected_flags(df))
+
+    def test_numpy_fallback_matches(self):
+        df = _random_ohlc(seed=11)
+        arrs = [df[k].to_numpy(dtype=np.float32) for k in ("open", "high", "low", "close")]
+        np.testing.assert_array_equal(_scan_candles_numpy(*arrs), _expected_flags(df))
+
+    def test_two_candle_columns_match_row_detectors(self):
+        df = _random_ohlc(seed=3)
+        out = detect_two_candle_patterns(df)
+        assert list(out.columns) == ["engulfing", "piercing_dark_cloud", "tweezer"]
+        assert all(out[col].dtype == np.int8 for col in out.columns)
+        rows = _f32_rows(df)
+        for i in range(1, len(rows)):
+            prev, curr = rows[i - 1], rows[i]
+            assert out["engulfing"].iloc[i] == detect_engulfing(prev, curr)
+            assert out["piercing_dark_cloud"].iloc[i] == detect_piercing_dark_cloud(prev, curr)
+            assert out["tweezer"].iloc[i] == detect_tweezer(prev, curr)
+
+    def test_empty(self):
+        assert len(scan_candle_flags(None)) == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -200,6 +200,31 @@ class TestCandleClassification:
         result = classify_candle(df, idx=-5)
         assert result["type"] in ("WRB", "NRB", "normal")
 
+    def test_classify_candles_matches_single_bar(self):
+        from core.pristine import classify_candle, classify_candles
+        df = _make_df(80, noise=0.4, seed=3)
+        out = classify_candles(df)
+        assert len(out) == len(df)
+        assert (out["type"].iloc[:10] == "normal").all()
+        assert (out["bias"].iloc[:10] == 0).all()
+        for i in range(10, len(df)):
+            single = classify_candle(df, idx=i)
+            assert out["type"].iloc[i] == single["type"]
+            assert out["cog"].iloc[i] == single["cog"]
+            assert out["tail"].iloc[i] == single["tail"]
+            assert out["bias"].iloc[i] == single["bias"]
+            assert round(out["body_ratio"].iloc[i], 2) == single["body_ratio"]
+
+    def test_candle_kernel_matches_numpy_fallback(self, monkeypatch):
+        import core.pristine as pristine
+        df = _make_df(200, noise=0.6, seed=11)
+        df.iloc[50, df.columns.get_loc("high")] = df["low"].iloc[50]  # zero-range bar
+        fast = pristine.classify_candles(df)
+        monkeypatch.setattr(pristine, "HAVE_NUMBA", False)
+        pristine._CANDLE_CACHE.clear()
+        slow = pristine.classify_candles(df)
+        pd.testing.assert_frame_equal(fast, slow)
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  TEST: Pivot Detection (Ch. 10)
@@ -238,6 +263,57 @@ class TestPivotDetection:
         # Should have at least some of each
         assert major_count > 0
 
+    def test_pivot_arrays_match_dicts(self):
+        from core.pristine import (
+            find_pivots, find_pivot_arrays, classify_pivots_major_minor,
+            determine_trend_from_pivots,
+        )
+        df = _make_uptrend_df(300)
+        dicts = classify_pivots_major_minor(find_pivots(df))
+        arrays = classify_pivots_major_minor(find_pivot_arrays(df))
+        assert arrays.to_dicts() == dicts
+        assert determine_trend_from_pivots(arrays) == determine_trend_from_pivots(dicts)
+
+    def test_pivot_kernel_matches_rolling_fallback(self, monkeypatch):
+        import core.pristine as pristine
+        df = _make_range_df(300)
+        fast = pristine.classify_pivots_major_minor(pristine.find_pivots(df, 3))
+        monkeypatch.setattr(pristine, "HAVE_NUMBA", False)
+        pristine._PIVOT_CACHE.clear()
+        slow = pristine.classify_pivots_major_minor(pristine.find_pivots(df, 3))
+        assert fast == slow
+
+    @pytest.mark.parametrize("have_numba", [True, False])
+    def test_pivots_exact_at_btc_scale(self, monkeypatch, have_numba):
+        # 0.01 ticks near 140 000 are finer than float32 spacing (0.0156),
+        # so a narrowed scan would see false ties at the window extremes
+        import core.pristine as pristine
+        monkeypatch.setattr(pristine, "HAVE_NUMBA", have_numba and pristine.HAVE_NUMBA)
+        rng = np.random.RandomState(0)
+        close = np.round(140_000 + np.cumsum(rng.randn(300) * 0.05), 2)
+        highs = np.round(close + np.abs(rng.randn(300)) * 0.03, 2)
+        lows = np.round(close - np.abs(rng.randn(300)) * 0.03, 2)
+        L = pristine.PIVOT_LOOKBACK
+        expected_high = [i for i in range(L, 300 - L) if highs[i] == highs[i - L:i + L + 1].max()]
+        expected_low = [i for i in range(L, 300 - L) if lows[i] == lows[i - L:i + L + 1].min()]
+        piv = pristine.pivots_from_arrays(highs, lows, L)
+        assert piv.idx[piv.is_high].tolist() == expected_high
+        assert piv.idx[~piv.is_high].tolist() == expected_low
+
+    def test_trend_state_reads_like_dict(self):
+        from core.pristine import determine_trend_from_pivots
+        trend = determine_trend_from_pivots([])
+        assert trend == {
+            "trend": "range", "strength": "weak",
+            "last_ph": 0.0, "last_pl": 0.0,
+            "hph_count": 0, "hpl_count": 0,
+            "lph_count": 0, "lpl_count": 0,
+        }
+        assert "trend" in trend and "get" not in trend
+        assert trend.get("missing", "x") == "x"
+        with pytest.raises(KeyError):
+            trend["missing"]
+
     def test_trend_from_pivots_uptrend(self):
         from core.pristine import find_pivots, classify_pivots_major_minor, determine_trend_from_pivots
         df = _make_uptrend_df(300)
@@ -285,6 +361,23 @@ class TestStageClassification:
         assert result["tradeable"] is True
         assert result["allowed_direction"] == "BUY"
 
+    def test_stage_series_matches_per_bar(self):
+        from core.pristine import classify_stage, classify_stage_series
+        df = _make_df(260, trend="up_then_down", noise=0.3, seed=5)
+        stages = classify_stage_series(df)
+        assert len(stages) == len(df)
+        assert (stages.iloc[:49] == 1).all()
+        for i in range(49, len(df), 7):
+            assert stages.iloc[i] == classify_stage(df.iloc[:i + 1])["stage"]
+
+    def test_indicator_bundle_shared(self):
+        from core.pristine import classify_stage, compute_indicators
+        df = _make_uptrend_df(300)
+        ind = compute_indicators(df)
+        assert compute_indicators(df) is ind
+        assert ind.sma200 is not None and ind.atr > 0
+        assert classify_stage(df, ind=ind) == classify_stage(df)
+
     def test_stage_4_downtrend(self):
         from core.pristine import classify_stage
         # Use a stronger downtrend with less noise and longer history
@@ -439,6 +532,15 @@ class TestBarByBar:
         result = bar_by_bar_assessment(df, direction=1)
         assert result["health"] == "ok"  # default
 
+    def test_supplied_last_candle_is_used(self):
+        from core.pristine import bar_by_bar_assessment, classify_candle
+        df = _make_df(100, noise=0.3, seed=5)
+        assert bar_by_bar_assessment(df, 1, last_candle=classify_candle(df, -1)) == \
+            bar_by_bar_assessment(df, 1)
+        wrb_down = {"type": "WRB", "bias": -1}
+        result = bar_by_bar_assessment(df, 1, last_candle=wrb_down)
+        assert "WRB against position — strong counter-pressure" in result["reasons"]
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  TEST: Sweet Spot / Sour Spot (Ch. 12)
@@ -521,6 +623,22 @@ class TestSweetSourSpot:
         result = detect_sweet_sour_spot({}, direction=1)
         assert result["type"] == "neutral"
 
+    def test_cached_result_is_not_shared(self):
+        from core.pristine import detect_sweet_sour_spot
+        tf = {"stage": {"stage": 2}, "pivot_trend": {"trend": "uptrend"},
+              "retracement": {"quality": "healthy"},
+              "sr_levels": [{"price": 100.5, "kind": "R"}],
+              "candle_class": [], "current_price": 100.0, "atr": 1.0}
+        tf_data = {"D1": tf, "H1": tf, "M15": tf}
+        first = detect_sweet_sour_spot(tf_data, direction=1)
+        first["reasons"].append("mutated")
+        second = detect_sweet_sour_spot(tf_data, direction=1)
+        assert "mutated" not in second["reasons"]
+        assert any("SOUR SPOT" in r for r in second["reasons"])
+        moved = dict(tf, sr_levels=[{"price": 103.0, "kind": "R"}])
+        third = detect_sweet_sour_spot({"D1": moved, "H1": tf, "M15": tf}, direction=1)
+        assert not any("resistance" in r for r in third["reasons"])
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  TEST: Breakout Bar Failure (Ch. 13)
@@ -558,6 +676,18 @@ class TestBBF:
         bullish = [r for r in results if r["bias"] == 1]
         assert len(bullish) > 0
 
+    def test_one_bbf_per_bar_at_strongest_level(self):
+        from core.pristine import detect_breakout_bar_failure
+        df = _make_df(30, noise=0.3)
+        sr_levels = [{"price": 101.2, "kind": "R", "touches": 3},
+                     {"price": 101.0, "kind": "SR", "touches": 1}]
+        last_idx = df.index[-1]
+        df.loc[last_idx, ["open", "high", "low", "close"]] = [100.8, 101.5, 100.3, 100.5]
+        newest = [r for r in detect_breakout_bar_failure(df, sr_levels)
+                  if r["bar_offset"] == 1]
+        assert len(newest) == 1
+        assert newest[0]["level"] == 101.2
+
     def test_no_bbf_normal_bar(self):
         from core.pristine import detect_breakout_bar_failure
         df = _make_df(30, noise=0.3)
@@ -572,6 +702,17 @@ class TestBBF:
         results = detect_breakout_bar_failure(df, [])
         assert len(results) == 0
 
+    def test_sr_levels_arrays_match_dicts(self):
+        from core.pristine import KIND_R, SRLevels, detect_breakout_bar_failure
+        df = _make_df(30, noise=0.3)
+        sr_levels = [{"price": 101.0, "kind": "R", "touches": 3, "strength": 0.7}]
+        last_idx = df.index[-1]
+        df.loc[last_idx, ["open", "high", "low", "close"]] = [100.8, 101.5, 100.3, 100.5]
+
+        levels = SRLevels.from_list(sr_levels)
+        assert levels.kinds.tolist() == [KIND_R]
+        assert detect_breakout_bar_failure(df, levels) == detect_breakout_bar_failure(df, sr_levels)
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  TEST: Price Voids (Ch. 3)
@@ -601,6 +742,19 @@ class TestPriceVoids:
         voids = find_price_voids(None)
         assert voids == []
 
+    def test_void_arrays_match_dicts(self, monkeypatch):
+        import core.pristine as pristine
+        df = _make_df(60, noise=0.1, trend="flat")
+        df["atr"] = 0.3
+        i = df.index[40]
+        df.loc[i, ["open", "high", "low", "close"]] = [100.9, 102.2, 100.8, 102.1]
+        df.loc[df.index[41]:, ["open", "high", "low", "close"]] += 2.0
+        arrays = pristine.find_price_void_arrays(df, 2.0)
+        assert len(arrays) >= 1
+        assert arrays.to_dicts() == pristine.find_price_voids(df, 2.0)
+        monkeypatch.setattr(pristine, "HAVE_NUMBA", False)
+        assert pristine.find_price_voids(df, 2.0) == arrays.to_dicts()
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 #  TEST: Pristine Setup Detection (PBS/PSS)
@@ -2,11 +2,14 @@
 Tests for core.signals — validates signal generation and filtering.
 """
 
+import numpy as np
 import pytest
 from core.signals import (
     TradeSignal,
     confidence_to_win_probability,
+    confidence_to_win_probability_batch,
     generate_signal,
+    generate_signals,
 )
 from core.confluence import SymbolAnalysis, TimeframeAnalysis
 
@@ -31,6 +34,11 @@ class TestConfidenceMapping:
             assert probs[i] >= probs[i - 1], \
                 f"Win prob should be monotonically increasing: {probs[i-1]} -> {probs[i]}"
 
+    def test_batch_matches_scalar(self):
+        scores = np.linspace(40, 110, 701)
+        expected = [confidence_to_win_probability(c) for c in scores]
+        assert confidence_to_win_probability_batch(scores).tolist() == expected
+
 
 class TestSignalGeneration:
     def _make_analysis(self, direction="BUY", entry=1.1, sl=1.09, tp=1.13, atr=0.005):
@@ -101,6 +109,26 @@ class TestSignalGeneration:
         signal = generate_signal(sa)
         assert signal is None
 
+    def test_batch_matches_single(self):
+        rng = np.random.RandomState(7)
+        sas = []
+        for _ in range(60):
+            direction = rng.choice(["BUY", "SELL"])
+            sign = 1 if direction == "BUY" else -1
+            sa = self._make_analysis(
+                direction, entry=1.1,
+                sl=1.1 - sign * rng.uniform(-0.005, 0.02),
+                tp=1.1 + sign * rng.uniform(-0.01, 0.06),
+                atr=rng.choice([0.0, 0.005]),
+            )
+            sa.confluence_score = rng.uniform(60, 95)
+            sas.append(sa)
+        sas[0].trade_direction = None
+        expected = [sig for sig in map(generate_signal, sas) if sig is not None]
+        batch = generate_signals(sas)
+        assert [(s.symbol, s.direction, s.entry_price, s.stop_loss) for s in batch] == \
+            [(s.symbol, s.direction, s.entry_price, s.stop_loss) for s in expected]
+
 
 class TestTradeSignalProperties:
     def test_risk_pips(self):
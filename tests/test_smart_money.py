@@ -0,0 +1,114 @@
+"""
+Tests for core.smart_money — order blocks, fair value gaps, liquidity sweeps.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from core.smart_money import (
+    analyze_smart_money,
+    detect_structure_breaks,
+    find_fair_value_gaps,
+    find_liquidity_sweeps,
+    find_order_blocks,
+)
+
+
+def _frame(rows, atr=1.0) -> pd.DataFrame:
+    """rows: (open, high, low, close) tuples; constant ATR unless given."""
+    df = pd.DataFrame(rows, columns=["open", "high", "low", "close"],
+                      index=pd.date_range("2025-01-01", periods=len(rows), freq="h"))
+    df["atr"] = atr
+    return df
+
+
+def _flat(n):
+    return [(100.0, 100.3, 99.7, 100.0)] * n
+
+
+class TestOrderBlocks:
+    def test_bullish_ob_before_impulse(self):
+        rows = _flat(8) + [(100.2, 100.3, 99.6, 99.8),    # bearish candle
+                           (99.8, 102.2, 99.7, 102.0),    # 2.2x ATR impulse
+                           (102.0, 102.3, 101.8, 102.1)]
+        obs = find_order_blocks(_frame(rows), lookback=10)
+        assert [(ob["type"], ob["ob_low"], ob["strength"]) for ob in obs] == \
+            [("bullish_ob", 99.6, 2.2)]
+
+    def test_mitigated_ob_dropped(self):
+        rows = _flat(8) + [(100.2, 100.3, 99.6, 99.8),
+                           (99.8, 102.2, 99.7, 102.0),
+                           (102.0, 102.1, 99.0, 99.2)]    # closes below OB low
+        obs = find_order_blocks(_frame(rows), lookback=10)
+        assert all(ob["type"] != "bullish_ob" for ob in obs)
+
+    def test_nan_and_zero_atr_skipped(self):
+        rows = _flat(8) + [(100.2, 100.3, 99.6, 99.8),
+                           (99.8, 102.2, 99.7, 102.0),
+                           (102.0, 102.3, 101.8, 102.1)]
+        for bad in (np.nan, 0.0):
+            atr = np.ones(len(rows))
+            atr[8] = bad
+            assert find_order_blocks(_frame(rows, atr), lookback=10) == []
+
+
+class TestFairValueGaps:
+    def test_bullish_and_bearish_gaps(self):
+        up = _flat(8) + [(100.0, 100.2, 99.9, 100.1),
+                         (100.1, 102.0, 100.1, 101.9),
+                         (101.9, 102.5, 101.0, 102.4)]    # low 101.0 > 100.2
+        gaps = find_fair_value_gaps(_frame(up))
+        assert [(g["type"], g["gap_low"], g["gap_high"]) for g in gaps] == \
+            [("bullish_fvg", 100.2, 101.0)]
+
+        down = _flat(8) + [(100.0, 100.1, 99.8, 99.9),
+                           (99.9, 99.9, 98.0, 98.1),
+                           (98.1, 99.0, 97.5, 97.6)]      # high 99.0 < 99.8
+        gaps = find_fair_value_gaps(_frame(down))
+        assert [(g["type"], g["gap_low"], g["gap_high"]) for g in gaps] == \
+            [("bearish_fvg", 99.0, 99.8)]
+
+    def test_short_frame(self):
+        assert find_fair_value_gaps(_frame(_flat(5))) == []
+
+
+class TestLiquiditySweeps:
+    def test_wick_above_swing_high_closing_below(self):
+        rows = [(100.0, 100.3, 99.7, 100.0)] * 10
+        rows[5] = (100.0, 101.0, 99.7, 100.0)              # swing high 101.0
+        rows += [(100.0, 100.3, 99.7, 100.0)] * 6
+        rows += [(100.0, 101.4, 99.8, 100.6),              # sweeps, closes below
+                 (100.6, 101.5, 100.2, 100.4),             # sweeps again
+                 (100.4, 100.5, 100.0, 100.1)]
+        sweeps = find_liquidity_sweeps(_frame(rows), lookback=5)
+        bearish = [s for s in sweeps if s["type"] == "bearish_sweep"]
+        assert [(s["level_swept"], s["sweep_high"]) for s in bearish] == [(101.0, 101.4)]
+        assert bearish[0]["time"] == _frame(rows).index[-3]
+
+
+class TestAnalyzeSmartMoney:
+    def test_matches_individual_detectors(self):
+        rng = np.random.RandomState(7)
+        close = 100 + np.cumsum(rng.randn(200) * 0.5)
+        open_ = np.r_[close[0], close[:-1]]
+        rows = [(o, max(o, c) + 0.2, min(o, c) - 0.2, c) for o, c in zip(open_, close)]
+        df = _frame(rows, atr=0.6)
+        result = analyze_smart_money(df)
+        assert result["order_blocks"] == find_order_blocks(df)
+        assert result["fair_value_gaps"] == find_fair_value_gaps(df)
+        assert result["liquidity_sweeps"] == find_liquidity_sweeps(df)
+        assert result["structure_breaks"] == detect_structure_breaks(df)
+
+    def test_memoised_per_frame(self):
+        df = _frame(_flat(40))
+        assert analyze_smart_money(df) is analyze_smart_money(df)
+        assert analyze_smart_money(df.copy()) is not analyze_smart_money(df)
+
+    def test_none_frame(self):
+        result = analyze_smart_money(None)
+        assert result["order_blocks"] == result["structure_breaks"] == []
+        assert result["overall_bias"] == "NEUTRAL"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
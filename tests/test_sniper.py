@@ -0,0 +1,184 @@
+"""
+Tests for core.sniper — M15 sniper helpers (pivots, ATR, ECR crosses, EMA and bar caches).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _bars(n: int = 120, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.RandomState(seed)
+    close = np.round(100 + np.cumsum(rng.randn(n)), 0)  # rounded → ties
+    high = close + np.round(np.abs(rng.randn(n)), 0)
+    low = close - np.round(np.abs(rng.randn(n)), 0)
+    high[[20, 70]] = np.nan
+    return pd.DataFrame({"open": close, "high": high, "low": low, "close": close},
+                        index=pd.date_range("2025-01-01", periods=n, freq="15min"))
+
+
+class TestFindPivots:
+    def _brute(self, df, L):
+        highs, lows = df["high"].values, df["low"].values
+        out = []
+        for i in range(L, len(df) - L):
+            if highs[i] == np.max(highs[i - L:i + L + 1]):
+                out.append(("high", i))
+            if lows[i] == np.min(lows[i - L:i + L + 1]):
+                out.append(("low", i))
+        return out
+
+    @pytest.mark.parametrize("bottleneck", [True, False])
+    def test_matches_window_scan(self, monkeypatch, bottleneck):
+        import utils.accel as accel
+        from core.sniper.levels import find_pivots
+        monkeypatch.setattr(accel, "HAVE_BOTTLENECK", bottleneck and accel.HAVE_BOTTLENECK)
+        df = _bars()
+        for L in (1, 3, 5):
+            got = [(p.type, p.idx) for p in find_pivots(df, L)]
+            assert got == self._brute(df, L)
+
+    def test_arrays_and_points_agree(self):
+        from core.sniper.levels import (
+            detect_range, find_pivot_arrays, find_pivots, last_swings,
+            major_levels_from_pivots, trend_state_from_pivots,
+        )
+        df = _bars(200, seed=8)
+        arrays = find_pivot_arrays(df, 2)
+        points = find_pivots(df, 2)
+        assert arrays.points() == points
+        assert last_swings(arrays) == last_swings(points)
+        assert trend_state_from_pivots(arrays) == trend_state_from_pivots(points)
+        assert detect_range(arrays, 1.0, 60, 0.5) == detect_range(points, 1.0, 60, 0.5)
+        assert major_levels_from_pivots(arrays, 1.0) == major_levels_from_pivots(points, 1.0)
+
+
+class TestClusterLevels:
+    def _first_fit(self, values, tol):
+        clusters = []
+        for v in sorted(v for v in values if v > 0):
+            for c in clusters:
+                if abs(v - np.median(c)) <= tol:
+                    c.append(v)
+                    break
+            else:
+                clusters.append([v])
+        return clusters
+
+    def test_matches_first_fit_scan(self):
+        from core.sniper.levels import cluster_levels
+        rng = np.random.RandomState(5)
+        for _ in range(50):
+            values = np.round(rng.randn(30) * 2 + 10, 1).tolist() + [0.0, -1.0]
+            for tol in (0.1, 0.5, 1.5):
+                assert cluster_levels(values, tol) == self._first_fit(values, tol)
+
+    def test_even_cluster_uses_true_median(self):
+        from core.sniper.levels import cluster_levels
+        # median of [1.0, 1.5] is 1.25, so 1.875 (0.625 away) opens a new
+        # cluster; the upper-middle element 1.5 would wrongly admit it
+        assert cluster_levels([1.0, 1.5, 1.875], 0.5) == [[1.0, 1.5], [1.875]]
+
+
+class TestCrossStats:
+    def _pair(self, seed):
+        rng = np.random.RandomState(seed)
+        a = np.round(rng.randn(60), 1)
+        b = np.round(rng.randn(60), 1)
+        a[[5, 6, 30]] = np.nan
+        b[[12, 40]] = a[[12, 40]]  # exact touches: sign 0
+        return a, b
+
+    def test_kernel_matches_numpy_fallback(self, monkeypatch):
+        import core.sniper.ecr as ecr
+        for seed in range(20):
+            a, b = self._pair(seed)
+            fast = ecr._cross_stats(a, b, 4)
+            monkeypatch.setattr(ecr, "HAVE_NUMBA", False)
+            slow = ecr._cross_stats(a, b, 4)
+            monkeypatch.undo()
+            assert fast == slow
+
+    def test_gap_filters_count_not_last_index(self):
+        from core.sniper.ecr import _cross_count, _last_cross_index
+        a = np.array([1.0, -1.0, 1.0, -1.0, -1.0, -1.0, 1.0])
+        b = np.zeros(7)
+        # crosses after bars 0, 1, 2, 5 — with min_gap 3 only 0 and 5 count
+        assert _cross_count(a, b, 3) == 2
+        assert _last_cross_index(a, b) == 5
+        assert _last_cross_index(a[:1], b[:1]) == -1
+
+
+class TestAtr:
+    def test_matches_concat_reference(self):
+        from core.sniper.levels import atr
+        df = _bars()
+        prev = df["close"].shift(1)
+        tr = pd.concat([(df["high"] - df["low"]).abs(), (df["high"] - prev).abs(),
+                        (df["low"] - prev).abs()], axis=1).max(axis=1)
+        expected = tr.rolling(14, min_periods=14).mean()
+        pd.testing.assert_series_equal(atr(df, 14), expected, check_exact=True)
+
+
+class TestCachedEma:
+    def test_hit_depth_and_eviction(self):
+        from core.sniper.levels import cached_ema, ema
+        close = _bars()["close"].to_numpy(dtype=np.float64)
+        cache = {}
+        first = cached_ema(cache, close, 13, 7)
+        np.testing.assert_array_equal(first, ema(pd.Series(close), 13).to_numpy())
+        assert cached_ema(cache, close, 13, 7) is first
+        # a shorter frame on the same bar has its own EMA
+        assert cached_ema(cache, close[10:], 13, 7) is not first
+        cached_ema(cache, close, 13, 8)
+        assert all(key[1] == 8 for key in cache)
+
+
+class TestClosedBarCache:
+    def _broker(self, n=600, now=250):
+        history = _bars(n, seed=11)
+        broker = {"now": now, "calls": []}
+
+        def fetch(symbol, count):
+            broker["calls"].append(count)
+            return history.iloc[:broker["now"]].tail(count).copy()
+        return broker, fetch
+
+    @pytest.mark.parametrize("now", [40, 250])  # 40: shorter history than asked
+    def test_matches_full_fetch_as_bars_arrive(self, now):
+        from core.sniper.bars import ClosedBarCache
+        broker, fetch = self._broker(now=now)
+        cache = ClosedBarCache(fetch)
+        rng = np.random.RandomState(0)
+        for _ in range(120):
+            broker["now"] += int(rng.choice([0, 1, 1, 2, 5]))  # 5 → gap, refetch
+            for count in (3, 98, 194):
+                got = cache.rates("X", count)
+                pd.testing.assert_frame_equal(got, fetch("X", count))
+
+    def test_tail_fetch_once_seeded(self):
+        from core.sniper.bars import ClosedBarCache
+        broker, fetch = self._broker()
+        cache = ClosedBarCache(fetch)
+        cache.rates("X", 194)
+        broker["now"] += 1
+        broker["calls"].clear()
+        cache.rates("X", 98)
+        cache.rates("X", 194)
+        assert broker["calls"] == [3, 3]
+
+    def test_retain_drops_symbols_outside_universe(self):
+        from core.sniper.bars import ClosedBarCache
+        broker, fetch = self._broker()
+        cache = ClosedBarCache(fetch)
+        cache.rates("X", 98)
+        cache.rates("Y", 98)
+        cache.retain(["Y"])
+        broker["calls"].clear()
+        cache.rates("X", 98)
+        cache.rates("Y", 98)
+        assert broker["calls"] == [98, 3]  # X refetched in full, Y topped up
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+"""
+===============================================================================
+  Optional accelerators — Numba JIT / Bottleneck with graceful fallback
+===============================================================================
+  Numba is NOT a hard dependency (MT5 boxes are often locked-down Windows
+  installs).  Hot loops are written once as plain Python over NumPy arrays
+  and decorated with ``njit``:
+
+    - Numba installed  → compiled to machine code on first call
+    - Numba missing    → the decorator is a no-op; callers check
+                         ``HAVE_NUMBA`` and take their vectorised NumPy path
+
+  Bottleneck (also optional) backs the moving-window helpers (mean, max,
+  min); without it they fall back to pandas rolling windows with the same
+  NaN semantics.
+===============================================================================
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba as _numba
+    HAVE_NUMBA = True
+except ImportError:  # optional dependency
+    _numba = None
+    HAVE_NUMBA = False
+
+try:
+    import bottleneck as _bn
+    HAVE_BOTTLENECK = True
+except ImportError:  # optional dependency
+    _bn = None
+    HAVE_BOTTLENECK = False
+
+
+def njit(*args, **kwargs):
+    """
+    ``numba.njit`` when Numba is importable, identity decorator otherwise.
+
+    Works both bare (``@njit``) and with options / signatures
+    (``@njit(cache=True)``, ``@njit("f8(f8[:])")``).
+    """
+    if HAVE_NUMBA:
+        return _numba.njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+    return lambda fn: fn
+
+
+def move_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing *window*-bar mean; NaN until the window is full.
+
+    ``bottleneck.move_mean`` when available, else ``Series.rolling().mean()``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if HAVE_BOTTLENECK:
+        return _bn.move_mean(values, window)
+    return pd.Series(values).rolling(window).mean().to_numpy()
+
+
+def move_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing *window*-bar max; NaN until the window is full or when the
+    window holds a NaN (like ``np.max`` over the slice).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if HAVE_BOTTLENECK:
+        return _bn.move_max(values, window)
+    return pd.Series(values).rolling(window).max().to_numpy()
+
+
+def move_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing *window*-bar min; NaN semantics as in move_max()."""
+    values = np.asarray(values, dtype=np.float64)
+    if HAVE_BOTTLENECK:
+        return _bn.move_min(values, window)
+    return pd.Series(values).rolling(window).min().to_numpy()
+
+
+@njit(cache=True)
+def _ewm_mean_kernel(values, alpha):
+    # pandas' ewm(adjust=False).mean() recurrence (ignore_na=False,
+    # min_periods=1), step for step, so results are bit-identical.
+    n = values.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    old_wt_factor = 1.0 - alpha
+    weighted = values[0]
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs else np.nan
+    old_wt = 1.0
+    for i in range(1, n):
+        cur = values[i]
+        is_obs = cur == cur
+        if is_obs:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_obs:
+                if weighted != cur:
+                    weighted = old_wt * weighted + alpha * cur
+                    weighted /= old_wt + alpha
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted if nobs else np.nan
+    return out
+
+
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    ``Series.ewm(span=span, adjust=False).mean()`` as a plain array.
+
+    Compiled recurrence when Numba is available, else pandas itself.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if HAVE_NUMBA:
+        return _ewm_mean_kernel(values, 1.0 / (1.0 + (span - 1) / 2))
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
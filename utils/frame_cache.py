@@ -0,0 +1,70 @@
+"""
+===============================================================================
+  Frame Cache — memoise pure functions of an OHLCV DataFrame
+===============================================================================
+  One scan asks the SAME frame for the same derived data many times
+  (candle classes, pivots, EMAs are wanted by stage, retracement, volume
+  and bar-by-bar analysis alike).  FrameCache stores those results keyed by
+
+        (id(df), len(df), df.index[-1], *extra)
+
+  with a small LRU bound.  Each entry also holds a weak reference to its
+  frame, so a recycled id() can never serve another frame's result.
+
+  Frames are treated as immutable once handed to the analysis layer; a
+  frame mutated in place after a cached call will see the stale result.
+===============================================================================
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+import pandas as pd
+
+MISSING = object()
+
+
+class FrameCache:
+    """Small thread-safe LRU of per-frame results."""
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[weakref.ref, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(df: pd.DataFrame, extra: tuple) -> tuple:
+        return (id(df), len(df), df.index[-1] if len(df) else None) + extra
+
+    def get(self, df: pd.DataFrame, *extra) -> Any:
+        """Cached value for (*df*, *extra*), or ``MISSING``."""
+        key = self._key(df, extra)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            ref, value = entry
+            if ref() is not df:
+                # id() recycled by a new frame — drop the stale entry
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, df: pd.DataFrame, value: Any, *extra) -> Any:
+        """Store *value* for (*df*, *extra*) and return it."""
+        key = self._key(df, extra)
+        with self._lock:
+            self._entries[key] = (weakref.ref(df), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()